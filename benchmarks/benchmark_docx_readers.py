@@ -0,0 +1,101 @@
+"""
+Compares the time and the peak memory it takes to read the body of docx files with the available docx readers.
+The document body cache is bypassed, i.e. every file is parsed from scratch.
+Each file is read by each reader in a fresh process, so that the peak memory (maximum resident set size) of the process
+is the peak memory needed to read the file (plus the memory of the interpreter and the imported modules).
+The peak memory is only available on Unix-like systems.
+
+Usage:
+    python benchmarks/benchmark_docx_readers.py <docx file or directory> [<docx file or directory> ...]
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from kohlrahbi.docxbodycache import read_document_body
+from kohlrahbi.enums.docxreader import DocxReader
+
+
+def get_docx_files(paths: list[Path]) -> list[Path]:
+    """
+    Returns the given docx files and all docx files in the given directories.
+    """
+    docx_files: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            docx_files.extend(sorted(path.glob("*.docx")))
+        else:
+            docx_files.append(path)
+    return docx_files
+
+
+def get_peak_memory_in_mib() -> float | None:
+    """
+    Returns the maximum resident set size of the current process in MiB or None if it is not available.
+    """
+    try:
+        import resource  # noqa: PLC0415 -- the module does not exist on Windows
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # the maximum resident set size is given in bytes on macOS and in KiB on Linux
+    return max_rss / (1 << 20) if sys.platform == "darwin" else max_rss / (1 << 10)
+
+
+def benchmark(path_to_docx_file: Path, docx_reader: DocxReader) -> tuple[float, float | None]:
+    """
+    Returns the seconds and the peak memory in MiB it takes to read the body of the given docx file with the given
+    reader. Must be called in a fresh process, see `main`.
+    """
+    start = time.perf_counter()
+    read_document_body(path_to_docx_file, docx_reader=docx_reader)
+    return time.perf_counter() - start, get_peak_memory_in_mib()
+
+
+def format_result(seconds: float, peak_memory: float | None) -> str:
+    """
+    Formats the result of a single benchmark as table cell.
+    """
+    if peak_memory is None:
+        return f"{seconds:>8.2f}s {'n/a':>9}"
+    return f"{seconds:>8.2f}s {peak_memory:>6.0f}MiB"
+
+
+def main() -> None:
+    """
+    Prints the read time and peak memory per file and reader and the total read time and maximum peak memory per
+    reader.
+    """
+    docx_files = get_docx_files([Path(argument) for argument in sys.argv[1:]])
+    if not docx_files:
+        sys.exit(__doc__)
+    total_seconds = dict.fromkeys(DocxReader, 0.0)
+    max_peak_memory: dict[DocxReader, float | None] = dict.fromkeys(DocxReader)
+    print(f"{'file':<50}" + "".join(f"{docx_reader:>20}" for docx_reader in DocxReader))
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+        for path_to_docx_file in docx_files:
+            results = {
+                docx_reader: executor.submit(benchmark, path_to_docx_file, docx_reader).result()
+                for docx_reader in DocxReader
+            }
+            for docx_reader, (seconds, peak_memory) in results.items():
+                total_seconds[docx_reader] += seconds
+                if peak_memory is not None:
+                    max_peak_memory[docx_reader] = max(max_peak_memory[docx_reader] or 0.0, peak_memory)
+            print(
+                f"{path_to_docx_file.name[:49]:<50}"
+                + "".join(f"{format_result(*results[docx_reader]):>20}" for docx_reader in DocxReader)
+            )
+    print(
+        f"{'total / max':<50}"
+        + "".join(
+            f"{format_result(total_seconds[docx_reader], max_peak_memory[docx_reader]):>20}"
+            for docx_reader in DocxReader
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@
 kohlrahbi is a package to scrape AHBs (in docx format)
 """
 
+import os
+from pathlib import Path
+from typing import Annotated
+
 import typer
 
 from kohlrahbi.ahb.command import ahb_app
@@ -30,8 +34,31 @@ def main(
     _version: bool = typer.Option(
         False, "--version", "-V", callback=version_callback, is_eager=True, help="Show version and exit."
     ),
+    document_body_cache_directory: Annotated[
+        Path | None,
+        typer.Option(
+            "--document-body-cache-directory",
+            help="The directory in which the content of the read docx files is cached "
+            "(also configurable via the environment variable KOHLRAHBI_DOCUMENT_BODY_CACHE_DIRECTORY).",
+            file_okay=False,
+            dir_okay=True,
+            resolve_path=True,
+        ),
+    ] = None,
+    no_document_body_cache: Annotated[
+        bool,
+        typer.Option("--no-document-body-cache", help="Do not cache the content of the read docx files."),
+    ] = False,
 ) -> None:
     """Kohlrahbi CLI tool"""
+    # the cache directory is passed on via the environment, so that it is inherited by the worker processes
+    # pylint: disable=import-outside-toplevel
+    from kohlrahbi.docxbodycache import DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE  # noqa: PLC0415
+
+    if no_document_body_cache:
+        os.environ[DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE] = ""
+    elif document_body_cache_directory is not None:
+        os.environ[DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE] = str(document_body_cache_directory)
 
 
 def cli() -> None:
@@ -5,26 +5,54 @@ This module contains the functions to scrape the AHBs for Pruefidentifikatoren.
 import fnmatch
 import gc
 import re
+from collections import defaultdict
+from collections.abc import Callable, Generator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 from datetime import date
 from pathlib import Path
 
-import docx
 import tomlkit
 from docx.table import Table
 from efoli import EdifactFormatVersion
+from pydantic import BaseModel, Field
 
+from kohlrahbi.ahb.outputwriter import AhbOutputWriter, write_unfolded_ahb
 from kohlrahbi.ahbtable.ahbtable import AhbTable
+from kohlrahbi.docxbody import DocumentBody, TableContent
+from kohlrahbi.docxbodycache import load_cached_document_body, load_document_body
 from kohlrahbi.docxfilefinder import DocxFileFinder
-from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.enums.ahbexportfileformat import COMBINED_OUTPUT_FILE_TYPES, AhbExportFileFormat
+from kohlrahbi.incrementalstate import (
+    IncrementalScrapingState,
+    load_incremental_scraping_state,
+    save_incremental_scraping_state,
+)
 from kohlrahbi.logger import logger
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.outputmanifest import (
+    get_manifest_file_path,
+    load_pruefi_output_manifest,
+)
+from kohlrahbi.pruefilocationindex import (
+    PruefiLocationIndex,
+    load_pruefi_location_index,
+    save_pruefi_location_index,
+)
 from kohlrahbi.read_functions import (
+    PruefiLocation,
     get_ahb_table,
-    get_all_paragraphs_and_tables,
+    get_ahb_tables,
     table_header_starts_with_text_edifact_struktur,
 )
 from kohlrahbi.seed import Seed
 from kohlrahbi.unfoldedahb import UnfoldedAhb
-from kohlrahbi.unfoldedahb.unfoldedahbtable import are_equal_except_for_guids
+from kohlrahbi.unfoldedahb.combinedoutput import (
+    PARQUET_DATASET_DIRECTORY_NAME,
+    SQLITE_BUNDLE_FILE_NAME,
+    CombinedOutputWriter,
+)
+from kohlrahbi.unfoldedahb.xlsxworkbooks import XLSX_WORKBOOK_FILE_NAME
 
 _pruefi_pattern = re.compile(r"^[1-9]\d{4}$")
 
@@ -47,44 +75,36 @@ def process_ahb_table(
     pruefi: str,
     output_path: Path,
     file_type: tuple[AhbExportFileFormat, ...],
+    source_docx_sha256: str | None = None,
+    combined_output_writers: Sequence[CombinedOutputWriter] = (),
 ) -> None:
     """
     Process the ahb table.
+    A file is only (re)written if it is missing or if it is not in sync with the content of the ahb table anymore,
+    according to the output manifest of the pruefi (see `kohlrahbi.outputmanifest`).
+    The ahb table is always added to the given combined outputs (e.g. the xlsx workbook of its format).
     """
     unfolded_ahb = UnfoldedAhb.from_ahb_table(ahb_table=ahb_table, pruefi=pruefi)
-
-    try:
-        json_file_path = unfolded_ahb.get_flatahb_json_file_path(output_path)
-        excel_file_path = unfolded_ahb.get_xlsx_file_path(output_path)
-        csv_file_path = unfolded_ahb.get_csv_file_path(output_path)
-    except ValueError:
-        logger.warning("Error while determining file paths for pruefi '%s'. Skipping saving files.", pruefi)
-        return
-    pruefi_did_change_since_last_scraping: bool = True  # we assume it yes, if we can't compare or unless we know better
-    if AhbExportFileFormat.FLATAHB in file_type and json_file_path.exists():
-        # the flat ahb is the only file format from which we can READ to compare our current with previous results
-        pruefi_did_change_since_last_scraping = not are_equal_except_for_guids(unfolded_ahb, json_file_path)
-        logger.info("Pruefi '%s' did change since last scraping: %s", pruefi, pruefi_did_change_since_last_scraping)
-    # ⚠ here we assume that the csv/json/xlsx files are in sync, if they exist.
-    # this means: if the json file didn't change and a csv file exists, we expect the csv file to also be unchanged
-    excel_needs_to_be_dumped = AhbExportFileFormat.XLSX in file_type and (
-        (not excel_file_path.exists()) or pruefi_did_change_since_last_scraping
-    )
-    json_needs_to_be_dumped = AhbExportFileFormat.FLATAHB in file_type and (
-        (not json_file_path.exists()) or pruefi_did_change_since_last_scraping
-    )
-    csv_needs_to_be_dumped = AhbExportFileFormat.CSV in file_type and (
-        (not csv_file_path.exists()) or pruefi_did_change_since_last_scraping
-    )
-    if excel_needs_to_be_dumped:
-        unfolded_ahb.dump_xlsx(output_path)
-    if json_needs_to_be_dumped:
-        unfolded_ahb.dump_flatahb_json(output_path)
-    if csv_needs_to_be_dumped:
-        unfolded_ahb.dump_csv(output_path)
+    flat_ahb = _add_to_combined_outputs(unfolded_ahb, combined_output_writers)
+    write_unfolded_ahb(unfolded_ahb, output_path, file_type, source_docx_sha256, flat_ahb)
     del unfolded_ahb
 
 
+def _add_to_combined_outputs(
+    unfolded_ahb: UnfoldedAhb, combined_output_writers: Sequence[CombinedOutputWriter]
+) -> FlatAnwendungshandbuch | None:
+    """
+    Adds the unfolded ahb to the given combined outputs. Its flat ahb is converted only once for all of them; it is
+    returned (if it has been converted), so that it is not converted again for the flatahb file.
+    """
+    if not combined_output_writers:
+        return None
+    flat_ahb = unfolded_ahb.convert_to_flat_ahb()
+    for combined_output_writer in combined_output_writers:
+        combined_output_writer.add_unfolded_ahb(unfolded_ahb, flat_ahb)
+    return flat_ahb
+
+
 # pylint:disable=anomalous-backslash-in-string
 def get_valid_pruefis(list_of_pruefis: list[str], all_known_pruefis: list[str] | None = None) -> list[str]:
     """
@@ -126,8 +146,8 @@ def process_pruefi(
     Therefore, we only access that file.
     """
 
-    # TODO try to cache document objects cause it is slow to read them from disk # pylint: disable=fixme
-    doc = docx.Document(str(path_to_ahb_docx_file))
+    cached_document_body = load_cached_document_body(path_to_ahb_docx_file)
+    doc = cached_document_body.body
 
     if not doc:
         return
@@ -136,13 +156,277 @@ def process_pruefi(
     if not ahb_table:
         return
 
-    process_ahb_table(ahb_table, pruefi, output_path, file_type)
-    del ahb_table.table
+    process_ahb_table(ahb_table, pruefi, output_path, file_type, cached_document_body.sha256)
+    del ahb_table.rows
     del ahb_table
     del doc
     gc.collect()
 
 
+class AhbDocxFileScrapingResult(BaseModel):
+    """
+    Summarizes which of the requested Prüfidentifikatoren of a single AHB docx file were processed successfully
+    and which ones failed (together with the respective error message).
+    """
+
+    processed: list[str] = Field(default_factory=list)
+    errors: list[tuple[str, str]] = Field(default_factory=list)
+    source_docx_sha256: str | None = Field(default=None, description="the hash of the docx file content")
+
+
+def group_pruefis_by_file(pruefi_to_file_mapping: dict[str, str]) -> dict[str, list[str]]:
+    """
+    Inverts the pruefi to file mapping, such that each AHB docx file is mapped to all of its Prüfidentifikatoren.
+    Pruefis without a filename are omitted.
+    """
+    file_to_pruefis_mapping: dict[str, list[str]] = defaultdict(list)
+    for pruefi, filename in pruefi_to_file_mapping.items():
+        if filename:
+            file_to_pruefis_mapping[filename].append(pruefi)
+    return dict(file_to_pruefis_mapping)
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+def process_pruefis_of_docx_file(
+    pruefis: list[str],
+    path_to_ahb_docx_file: Path,
+    output_path: Path,
+    file_type: tuple[AhbExportFileFormat, ...],
+    pruefi_locations: dict[str, PruefiLocation] | None = None,
+    combined_output_writers: Sequence[CombinedOutputWriter] = (),
+    output_writer: AhbOutputWriter | None = None,
+    on_extracted: Callable[[str], None] | None = None,
+) -> AhbDocxFileScrapingResult:
+    """
+    Process all given pruefis of one AHB docx file.
+    Other than calling `process_pruefi` for each pruefi, the docx file is opened and read only once.
+    If the locations of the pruefis inside the docx file are known, only the relevant part of the document is read.
+    The files of each pruefi are written by the output writer while the next pruefi is extracted; if no output writer
+    is given, one is used for this docx file only. All files are written when this function returns.
+    If given, `on_extracted` is called with each pruefi once it has been extracted from the docx file.
+    Errors while reading the document are raised; errors while processing a single pruefi are collected in the result.
+    """
+    if output_writer is None:
+        with AhbOutputWriter(output_path, file_type) as docx_file_output_writer:
+            return process_pruefis_of_docx_file(
+                pruefis,
+                path_to_ahb_docx_file,
+                output_path,
+                file_type,
+                pruefi_locations,
+                combined_output_writers,
+                docx_file_output_writer,
+                on_extracted,
+            )
+    return _get_scraping_result(
+        _submit_pruefis_of_docx_file(
+            pruefis, path_to_ahb_docx_file, pruefi_locations, combined_output_writers, output_writer, on_extracted
+        )
+    )
+
+
+#: the hash of a docx file and the pending writes of its pruefis (by pruefi), see `_submit_pruefis_of_docx_file`
+_SubmittedDocxFile = tuple[str, dict[str, Future[None]]]
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+def _submit_pruefis_of_docx_file(
+    pruefis: list[str],
+    path_to_ahb_docx_file: Path,
+    pruefi_locations: dict[str, PruefiLocation] | None,
+    combined_output_writers: Sequence[CombinedOutputWriter],
+    output_writer: AhbOutputWriter,
+    on_extracted: Callable[[str], None] | None,
+) -> _SubmittedDocxFile:
+    """
+    Extracts all given pruefis of one AHB docx file and submits them to the output writer without waiting for their
+    files to be written. The errors while extracting a pruefi are set as result of its future, too.
+    Errors while reading the document are raised.
+    """
+    cached_document_body = load_cached_document_body(path_to_ahb_docx_file)
+    doc = cached_document_body.body
+    source_docx_sha256 = cached_document_body.sha256
+
+    ahb_tables = get_ahb_tables(document=doc, pruefis=pruefis, locations=pruefi_locations)
+    written_futures: dict[str, Future[None]] = {}
+    for pruefi in pruefis:
+        ahb_table = ahb_tables.pop(pruefi, None)
+        try:
+            if ahb_table is None:
+                written_futures[pruefi] = Future()
+                written_futures[pruefi].set_result(None)
+            else:
+                unfolded_ahb = UnfoldedAhb.from_ahb_table(ahb_table=ahb_table, pruefi=pruefi)
+                flat_ahb = _add_to_combined_outputs(unfolded_ahb, combined_output_writers)
+                written_futures[pruefi] = output_writer.submit(unfolded_ahb, source_docx_sha256, flat_ahb)
+                del unfolded_ahb, flat_ahb
+        # sorry for the pokemon catch
+        except Exception as e:  # pylint: disable=broad-except
+            written_futures[pruefi] = Future()
+            written_futures[pruefi].set_exception(e)
+        if on_extracted is not None:
+            on_extracted(pruefi)
+        del ahb_table
+    del cached_document_body, doc
+    gc.collect()
+    return source_docx_sha256, written_futures
+
+
+def _get_scraping_result(submitted_docx_file: _SubmittedDocxFile) -> AhbDocxFileScrapingResult:
+    """
+    Waits until the files of all pruefis of the submitted docx file are written and summarizes the outcome.
+    """
+    source_docx_sha256, written_futures = submitted_docx_file
+    result = AhbDocxFileScrapingResult(source_docx_sha256=source_docx_sha256)
+    for pruefi, written_future in written_futures.items():
+        try:
+            written_future.result()
+            result.processed.append(pruefi)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("Error processing pruefi '%s': %s", pruefi, str(e))
+            result.errors.append((pruefi, str(e)))
+    return result
+
+
+def process_docx_files(
+    pruefis_by_docx_file: dict[Path, list[str]],
+    output_path: Path,
+    file_type: tuple[AhbExportFileFormat, ...],
+    workers: int = 1,
+    pruefi_location_index: PruefiLocationIndex | None = None,
+    combined_output_writers: Sequence[CombinedOutputWriter] = (),
+    on_extracted: Callable[[str], None] | None = None,
+    on_written: Callable[[str], None] | None = None,
+) -> Generator[tuple[Path, AhbDocxFileScrapingResult | Exception], None, None]:
+    """
+    Process all given AHB docx files and yield the result of each file as soon as it is finished.
+    The docx files are independent of each other, so with more than one worker they are distributed to a process pool
+    and the results are yielded in the order of completion.
+    With a single worker, the files of a docx file are written while the next docx file is read and extracted; the
+    result of a docx file is yielded once all of its files are written.
+    Exceptions raised while processing a file (e.g. a FileNotFoundError) are yielded instead of the result.
+    The combined outputs are written in the current process, so they can only be written with a single worker.
+    With a single worker, `on_extracted` and `on_written` are called with each pruefi once it has been extracted and
+    once its files have been written (`on_written` is called from a thread of the output writer).
+    The worker processes cannot report single pruefis, so the callbacks are not called with more than one worker.
+    """
+    if pruefi_location_index is None:
+        pruefi_location_index = PruefiLocationIndex()
+    if combined_output_writers and workers > 1:
+        raise ValueError("The combined outputs (e.g. the xlsx workbooks per format) need a single worker.")
+    if workers <= 1:
+        with AhbOutputWriter(output_path, file_type, on_written=on_written) as output_writer:
+            # the docx file whose files are being written while the next docx file is extracted
+            pending: tuple[Path, _SubmittedDocxFile | Exception] | None = None
+            for path_to_ahb_docx_file, pruefis in pruefis_by_docx_file.items():
+                submitted: _SubmittedDocxFile | Exception
+                try:
+                    submitted = _submit_pruefis_of_docx_file(
+                        pruefis,
+                        path_to_ahb_docx_file,
+                        pruefi_location_index.get_locations(path_to_ahb_docx_file),
+                        combined_output_writers,
+                        output_writer,
+                        on_extracted,
+                    )
+                except Exception as e:  # pylint: disable=broad-except
+                    submitted = e
+                if pending is not None:
+                    yield _resolve_pending_docx_file(*pending)
+                pending = (path_to_ahb_docx_file, submitted)
+            if pending is not None:
+                yield _resolve_pending_docx_file(*pending)
+        return
+
+    # the worker processes inherit the log level, so that e.g. `--verbose` still has an effect
+    with ProcessPoolExecutor(max_workers=workers, initializer=logger.setLevel, initargs=(logger.level,)) as executor:
+        future_to_path = {
+            executor.submit(
+                process_pruefis_of_docx_file,
+                pruefis,
+                path_to_ahb_docx_file,
+                output_path,
+                file_type,
+                pruefi_location_index.get_locations(path_to_ahb_docx_file),
+            ): path_to_ahb_docx_file
+            for path_to_ahb_docx_file, pruefis in pruefis_by_docx_file.items()
+        }
+        for future in as_completed(future_to_path):
+            outcome: AhbDocxFileScrapingResult | Exception
+            try:
+                outcome = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                outcome = e
+            yield future_to_path[future], outcome
+
+
+def _resolve_pending_docx_file(
+    path_to_ahb_docx_file: Path, submitted: _SubmittedDocxFile | Exception
+) -> tuple[Path, AhbDocxFileScrapingResult | Exception]:
+    """
+    Returns the outcome of a docx file once all of its files are written (or the error while reading it).
+    """
+    if isinstance(submitted, Exception):
+        return path_to_ahb_docx_file, submitted
+    return path_to_ahb_docx_file, _get_scraping_result(submitted)
+
+
+def get_unchanged_docx_files(
+    pruefis_by_docx_file: dict[Path, list[str]],
+    output_path: Path,
+    file_type: tuple[AhbExportFileFormat, ...],
+    incremental_scraping_state: IncrementalScrapingState,
+) -> list[Path]:
+    """
+    Returns the AHB docx files which do not have to be scraped again in an incremental run: The content of the docx
+    file has not changed since its Prüfidentifikatoren were scraped from it and, according to their output manifests,
+    the files of all requested formats have been written from this content and have not changed since.
+    """
+    unchanged_docx_files: list[Path] = []
+    for path_to_ahb_docx_file, pruefis in pruefis_by_docx_file.items():
+        source_docx_file = incremental_scraping_state.get_unchanged_source_docx_file(path_to_ahb_docx_file, pruefis)
+        if source_docx_file is not None and all(
+            _are_outputs_of_pruefi_in_sync(pruefi, source_docx_file.sha256, output_path, file_type)
+            for pruefi in pruefis
+        ):
+            unchanged_docx_files.append(path_to_ahb_docx_file)
+    return unchanged_docx_files
+
+
+def _are_outputs_of_pruefi_in_sync(
+    pruefi: str, source_docx_sha256: str, output_path: Path, file_type: tuple[AhbExportFileFormat, ...]
+) -> bool:
+    """
+    Checks if the files of the pruefi have been written from the docx file with the given hash and are unchanged.
+    """
+    try:
+        manifest = load_pruefi_output_manifest(get_manifest_file_path(output_path, pruefi))
+    except ValueError:
+        return False
+    return (
+        manifest is not None
+        and manifest.source_docx_sha256 == source_docx_sha256
+        and manifest.has_valid_files(file_type, output_path)
+    )
+
+
+def update_incremental_scraping_state(
+    incremental_scraping_state: IncrementalScrapingState,
+    path_to_ahb_docx_file: Path,
+    outcome: AhbDocxFileScrapingResult | Exception,
+) -> None:
+    """
+    Records the outcome of scraping the given docx file in the incremental scraping state.
+    Docx files which could not be scraped completely are forgotten, so that they are scraped again in the next run.
+    """
+    if isinstance(outcome, Exception) or outcome.errors:
+        incremental_scraping_state.remove_source_docx_file(path_to_ahb_docx_file)
+    else:
+        incremental_scraping_state.add_source_docx_file(
+            path_to_ahb_docx_file, outcome.processed, outcome.source_docx_sha256
+        )
+
+
 def get_ahb_documents_path(base_path: Path, version: str) -> Path:
     """Returns the path to the AHB documents for the specified format version."""
     path = base_path / f"edi_energy_de/{version}"
@@ -151,28 +435,30 @@ def get_ahb_documents_path(base_path: Path, version: str) -> Path:
     return path
 
 
-def find_pruefidentifikatoren(path: Path) -> dict[str, str]:
-    """finds pruefis in given dir"""
+def find_pruefidentifikatoren(path: Path, pruefi_location_index: PruefiLocationIndex | None = None) -> dict[str, str]:
+    """
+    finds pruefis in given dir.
+    If a pruefi location index is given, the locations of the pruefis inside the docx files are added to it.
+    """
     pruefis = {}
 
     ahb_file_finder = DocxFileFinder.from_input_path(input_path=path)
     ahb_file_finder.filter_for_latest_ahb_docx_files()
 
     for docx_path in ahb_file_finder.docx_files:
-        pruefis.update(extract_pruefis_from_docx(docx_path))
+        cached_document_body = load_cached_document_body(docx_path)
+        pruefis.update(extract_pruefis_from_docx(docx_path, document_body=cached_document_body.body))
+        if pruefi_location_index is not None:
+            pruefi_location_index.add_docx_file(docx_path, cached_document_body.body, cached_document_body.sha256)
     return dict(sorted(pruefis.items()))
 
 
-def extract_pruefis_from_docx(docx_path: Path) -> dict[str, str]:
-    """Extracts the Prüfidentifikatoren from the given docx file."""
-    doc = docx.Document(str(docx_path))
+def extract_pruefis_from_docx(docx_path: Path, document_body: DocumentBody | None = None) -> dict[str, str]:
+    """Extracts the Prüfidentifikatoren from the given docx file (or its already loaded body)."""
+    doc = document_body if document_body is not None else load_document_body(docx_path)
     pruefis: dict[str, str] = {}
-    for item in get_all_paragraphs_and_tables(doc):
-        if (
-            isinstance(item, Table)
-            and table_header_starts_with_text_edifact_struktur(item)
-            and table_header_contains_text_pruefidentifikator(item)
-        ):
+    for item in doc.tables:
+        if table_header_starts_with_text_edifact_struktur(item) and table_header_contains_text_pruefidentifikator(item):
             # pylint:disable=not-an-iterable
             pruefis.update({pruefi: docx_path.name for pruefi in extract_pruefis_from_table(item)})
     return pruefis
@@ -200,14 +486,14 @@ def get_default_pruefi_map(path: Path) -> dict[str, str]:
     return {"⚠️ No Prüfidentifikatoren found": f"No AHB documents found in {path}."}
 
 
-def extract_pruefis_from_table(table: Table) -> list[str]:
+def extract_pruefis_from_table(table: Table | TableContent) -> list[str]:
     """Extracts the Prüfidentifikatoren from given table."""
     seed = Seed.from_table(docx_table=table)
     logger.info("Found a table with the following pruefis: %s", seed.pruefidentifikatoren)
     return seed.pruefidentifikatoren
 
 
-def table_header_contains_text_pruefidentifikator(table: Table) -> bool:
+def table_header_contains_text_pruefidentifikator(table: Table | TableContent) -> bool:
     """Checks if the table header contains the text 'Prüfidentifikator'."""
     pattern = r"Prüfidentifikator(?:\t){0,10}\t\d+"
     # "matches "Prüfidentifikator" followed by at least 1 tab separated numbers, max 11 pruefis is chosen arbitrarily
@@ -234,6 +520,7 @@ def get_pruefi_to_file_mapping(
     (e.g. a later error-correction version), a stale cache would silently omit their pruefis forever.
     Therefore, if any explicitly requested pruefi is missing from the cache, the mapping is rebuilt
     from the AHB documents and the cache file is overwritten.
+    Whenever the mapping is rebuilt, the pruefi location index (see `kohlrahbi.pruefilocationindex`) is rebuilt, too.
     """
     default_path_to_cache_file = Path(__file__).parents[1] / "cache" / f"{format_version}_pruefi_docx_filename_map.toml"
 
@@ -253,8 +540,10 @@ def get_pruefi_to_file_mapping(
         )
 
     path_to_docx_files = basic_input_path / Path(f"edi_energy_de/{format_version}")
-    pruefi_to_file_mapping = find_pruefidentifikatoren(path_to_docx_files)
+    pruefi_location_index = PruefiLocationIndex()
+    pruefi_to_file_mapping = find_pruefidentifikatoren(path_to_docx_files, pruefi_location_index)
     save_pruefi_map_to_toml(pruefi_to_file_mapping, format_version.value)
+    save_pruefi_location_index(pruefi_location_index, format_version.value)
     return pruefi_to_file_mapping
 
 
@@ -295,16 +584,39 @@ def is_parent_dir_empty(file_path: Path) -> bool:
 def list_files_in_subdirs(path: Path) -> list[tuple[str, Path]]:
     """
     Find all files in a given subdir.
+    The combined outputs of all pruefis (the xlsx workbooks, the sqlite bundle and the parquet dataset) are omitted.
     """
+    excluded_stems = {"conditions", "packages", Path(XLSX_WORKBOOK_FILE_NAME).stem, Path(SQLITE_BUNDLE_FILE_NAME).stem}
+    parquet_dataset_path = path / PARQUET_DATASET_DIRECTORY_NAME
     files_list = []
     for file_path in path.rglob("*"):
-        if file_path.is_file():
+        if file_path.is_file() and not file_path.is_relative_to(parquet_dataset_path):
             file_name_without_ext = file_path.stem
-            if file_name_without_ext not in ["conditions", "packages"]:
+            if file_name_without_ext not in excluded_stems:
                 files_list.append((file_name_without_ext, file_path))
     return files_list
 
 
+def get_combined_output_writers(
+    file_type: Sequence[AhbExportFileFormat], output_path: Path, format_version: EdifactFormatVersion
+) -> list[CombinedOutputWriter]:
+    """
+    Returns the writers of the combined outputs among the given file types (see `COMBINED_OUTPUT_FILE_TYPES`).
+    Their optional dependencies are only imported if they are requested; raises an ImportError if they are missing.
+    """
+    # pylint: disable=import-outside-toplevel
+    combined_output_writers: list[CombinedOutputWriter] = []
+    if AhbExportFileFormat.PARQUET in file_type:
+        from kohlrahbi.unfoldedahb.parquetdataset import ParquetDatasetWriter  # noqa: PLC0415 -- optional dependency
+
+        combined_output_writers.append(ParquetDatasetWriter(output_path, format_version))
+    if AhbExportFileFormat.SQLITE in file_type:
+        from kohlrahbi.unfoldedahb.sqlitebundle import SqliteBundleWriter  # noqa: PLC0415 -- optional dependency
+
+        combined_output_writers.append(SqliteBundleWriter(output_path, format_version))
+    return combined_output_writers
+
+
 # pylint: disable=too-many-arguments, too-many-positional-arguments
 def scrape_pruefis(
     pruefis: list[str],
@@ -313,10 +625,20 @@ def scrape_pruefis(
     file_type: tuple[AhbExportFileFormat, ...],
     format_version: EdifactFormatVersion,
     clear_output_path: bool,
+    workers: int = 1,
+    incremental: bool = False,
 ) -> None:
     """
     starts the scraping process for provided pruefi_to_file_mappings
+    In an incremental run, the AHB docx files which did not change since the last incremental run (and whose outputs
+    are still present) are skipped.
+    The parquet dataset and the sqlite bundle contain all pruefis, so they can neither be written incrementally nor by
+    several workers.
     """
+    if incremental and any(file_format in COMBINED_OUTPUT_FILE_TYPES for file_format in file_type):
+        raise ValueError("The parquet dataset and the sqlite bundle cannot be written incrementally.")
+    combined_output_writers = get_combined_output_writers(file_type, output_path, format_version)
+    file_type = tuple(file_format for file_format in file_type if file_format not in COMBINED_OUTPUT_FILE_TYPES)
     pruefi_to_file_mapping = get_pruefi_to_file_mapping(
         basic_input_path=basic_input_path, format_version=format_version, pruefis=pruefis
     )
@@ -326,17 +648,43 @@ def scrape_pruefis(
     if clear_output_path:
         remove_vanished_pruefis(pruefi_to_file_mapping, output_path)
     for pruefi, filename in pruefi_to_file_mapping.items():
-        try:
-            logger.info("start looking for pruefi '%s'", pruefi)
-            if not filename:
-                logger.warning("No filename for pruefi '%s' provided", pruefi)
-                continue
-            path_to_ahb_docx_file = (
-                basic_input_path / Path("edi_energy_de") / Path(format_version.name) / Path(filename)
-            )
-            process_pruefi(pruefi, path_to_ahb_docx_file, output_path, file_type)
-        except FileNotFoundError:
-            logger.exception("File not found for pruefi '%s'", pruefi)
-        # sorry for the pokemon catch
-        except Exception as e:  # pylint: disable=broad-except
-            logger.exception("Error processing pruefi '%s': %s", pruefi, str(e))
+        if not filename:
+            logger.warning("No filename for pruefi '%s' provided", pruefi)
+    pruefis_by_docx_file = {
+        basic_input_path / Path("edi_energy_de") / Path(format_version.name) / Path(filename): pruefis_of_file
+        for filename, pruefis_of_file in group_pruefis_by_file(pruefi_to_file_mapping).items()
+    }
+    incremental_state = (
+        load_incremental_scraping_state("ahb", format_version.value, output_path) if incremental else None
+    )
+    if incremental_state is not None:
+        if clear_output_path:
+            incremental_state.retain_source_docx_files({path.name for path in pruefis_by_docx_file})
+        for path_to_unchanged_docx_file in get_unchanged_docx_files(
+            pruefis_by_docx_file, output_path, file_type, incremental_state
+        ):
+            logger.info("Skipping '%s', which did not change since the last run.", path_to_unchanged_docx_file.name)
+            del pruefis_by_docx_file[path_to_unchanged_docx_file]
+    pruefi_location_index = load_pruefi_location_index(format_version.value)
+    # the combined outputs are completed at the end, or discarded if the run is aborted
+    with ExitStack() as combined_outputs:
+        for combined_output_writer in combined_output_writers:
+            combined_outputs.enter_context(combined_output_writer)
+        for path_to_ahb_docx_file, outcome in process_docx_files(
+            pruefis_by_docx_file, output_path, file_type, workers, pruefi_location_index, combined_output_writers
+        ):
+            if incremental_state is not None:
+                update_incremental_scraping_state(incremental_state, path_to_ahb_docx_file, outcome)
+            if isinstance(outcome, FileNotFoundError):
+                logger.error(
+                    "File not found for pruefis '%s'",
+                    ", ".join(pruefis_by_docx_file[path_to_ahb_docx_file]),
+                    exc_info=outcome,
+                )
+            # sorry for the pokemon catch
+            elif isinstance(outcome, Exception):
+                logger.error(
+                    "Error processing file '%s': %s", path_to_ahb_docx_file.name, str(outcome), exc_info=outcome
+                )
+    if incremental_state is not None:
+        save_incremental_scraping_state(incremental_state, "ahb", format_version.value)
@@ -5,6 +5,7 @@ Command line interface for the pruefis module.
 # pylint: disable=import-outside-toplevel
 # Heavy submodules are imported lazily inside the command functions so that `--help` stays fast.
 
+from contextlib import ExitStack
 from pathlib import Path
 from typing import Annotated
 
@@ -13,7 +14,7 @@ from rich.console import Console
 from rich.panel import Panel
 
 from kohlrahbi.cli_utils import bar_progress, prepare_command, spinner_progress
-from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.enums.ahbexportfileformat import COMBINED_OUTPUT_FILE_TYPES, AhbExportFileFormat
 
 console = Console()
 
@@ -87,6 +88,29 @@ def ahb(
             help="Clear old removed files from existing output path.",
         ),
     ] = False,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help="Skip AHB documents which did not change since the last incremental run and whose outputs exist.",
+        ),
+    ] = False,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "-w",
+            "--workers",
+            help="Number of processes which scrape different AHB documents in parallel.",
+            min=1,
+        ),
+    ] = 1,
+    xlsx_workbook_per_format: Annotated[
+        bool,
+        typer.Option(
+            "--xlsx-workbook-per-format",
+            help="Write the xlsx files of all pruefis of a format into one workbook with one sheet per pruefi.",
+        ),
+    ] = False,
     verbose: Annotated[
         bool,
         typer.Option(
@@ -102,8 +126,31 @@ def ahb(
     output_path, efv = prepare_command(
         console=console, verbose=verbose, output_path=output_path, assume_yes=assume_yes, format_version=format_version
     )
+    xlsx_workbook_per_format = xlsx_workbook_per_format and AhbExportFileFormat.XLSX in file_type
+    if xlsx_workbook_per_format and (workers > 1 or incremental):
+        # the workbooks are written by the main process and have to contain the sheets of all pruefis
+        console.print("[red]--xlsx-workbook-per-format can be combined neither with --workers nor --incremental.[/red]")
+        raise typer.Exit(code=1)
+    combined_output_file_types = [file_format for file_format in file_type if file_format in COMBINED_OUTPUT_FILE_TYPES]
+    if combined_output_file_types and (workers > 1 or incremental):
+        # like the workbooks, these outputs are written by the main process and contain all pruefis
+        console.print(
+            f"[red]--file-type {' / '.join(combined_output_file_types)} can be combined neither with --workers nor "
+            "--incremental.[/red]"
+        )
+        raise typer.Exit(code=1)
 
-    from kohlrahbi.ahb import get_pruefi_to_file_mapping, process_pruefi, remove_vanished_pruefis, validate_pruefis
+    from kohlrahbi.ahb import (
+        get_pruefi_to_file_mapping,
+        get_unchanged_docx_files,
+        group_pruefis_by_file,
+        process_docx_files,
+        remove_vanished_pruefis,
+        update_incremental_scraping_state,
+        validate_pruefis,
+    )
+    from kohlrahbi.incrementalstate import load_incremental_scraping_state, save_incremental_scraping_state
+    from kohlrahbi.pruefilocationindex import load_pruefi_location_index
 
     with spinner_progress(console) as progress:
         progress.add_task("Loading pruefi mapping...", total=None)
@@ -132,26 +179,89 @@ def ahb(
 
     total = len(pruefi_to_file_mapping)
     processed = 0
-    skipped_no_filename: list[str] = []
+    skipped_no_filename = [pruefi for pruefi, filename in pruefi_to_file_mapping.items() if not filename]
     skipped_not_found: list[str] = []
     skipped_errors: list[tuple[str, str]] = []
 
-    with bar_progress(console) as progress:
-        task = progress.add_task("Scraping AHB documents...", total=total)
-        for pruefi, filename in pruefi_to_file_mapping.items():
-            progress.update(task, description=f"Processing pruefi {pruefi}...")
-            try:
-                if not filename:
-                    skipped_no_filename.append(pruefi)
-                    continue
-                path_to_ahb_docx_file = edi_energy_mirror_path / Path("edi_energy_de") / Path(efv.name) / Path(filename)
-                process_pruefi(pruefi, path_to_ahb_docx_file, output_path, tuple(file_type))
-                processed += 1
-            except FileNotFoundError:
-                skipped_not_found.append(pruefi)
-            except Exception as e:  # pylint: disable=broad-except
-                skipped_errors.append((pruefi, str(e)))
-            progress.advance(task)
+    pruefis_by_docx_file = {
+        edi_energy_mirror_path / Path("edi_energy_de") / Path(efv.name) / Path(filename): pruefis_of_file
+        for filename, pruefis_of_file in group_pruefis_by_file(pruefi_to_file_mapping).items()
+    }
+    incremental_state = load_incremental_scraping_state("ahb", efv.value, output_path) if incremental else None
+    unchanged_docx_files: list[Path] = []
+    if incremental_state is not None:
+        if clear_output_path:
+            incremental_state.retain_source_docx_files({path.name for path in pruefis_by_docx_file})
+        unchanged_docx_files = get_unchanged_docx_files(
+            pruefis_by_docx_file, output_path, tuple(file_type), incremental_state
+        )
+    unchanged = sum(len(pruefis_by_docx_file[path]) for path in unchanged_docx_files)
+    processed += unchanged
+
+    from kohlrahbi.ahb import get_combined_output_writers
+
+    try:
+        combined_output_writers = get_combined_output_writers(file_type, output_path, efv)
+    except ImportError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1) from e
+    file_type = [file_format for file_format in file_type if file_format not in COMBINED_OUTPUT_FILE_TYPES]
+    if xlsx_workbook_per_format:
+        from kohlrahbi.unfoldedahb.xlsxworkbooks import XlsxWorkbookPerFormatWriter
+
+        combined_output_writers.append(XlsxWorkbookPerFormatWriter(output_path))
+        file_type = [file_format for file_format in file_type if file_format != AhbExportFileFormat.XLSX]
+
+    # the combined outputs are completed at the end, or discarded if the run is aborted
+    with ExitStack() as combined_outputs, bar_progress(console) as progress:
+        for combined_output_writer in combined_output_writers:
+            combined_outputs.enter_context(combined_output_writer)
+        # the files of a pruefi are written in the background while the next pruefis are extracted
+        extracted_task = progress.add_task("Extracted", total=total)
+        written_task = progress.add_task("Written", total=total)
+        extracted_pruefis: set[str] = set()
+        written_pruefis: set[str] = set()
+
+        def on_extracted(pruefi: str) -> None:
+            extracted_pruefis.add(pruefi)
+            progress.update(extracted_task, advance=1, description=f"Extracted {pruefi}")
+
+        def on_written(pruefi: str) -> None:
+            written_pruefis.add(pruefi)
+            progress.update(written_task, advance=1, description=f"Written {pruefi}")
+
+        for task in (extracted_task, written_task):
+            progress.advance(task, len(skipped_no_filename) + unchanged)
+        # each docx file is opened and read only once for all of its pruefis
+        for path_to_ahb_docx_file, outcome in process_docx_files(
+            {path: pruefis for path, pruefis in pruefis_by_docx_file.items() if path not in unchanged_docx_files},
+            output_path,
+            tuple(file_type),
+            workers,
+            load_pruefi_location_index(efv.value),
+            combined_output_writers,
+            on_extracted,
+            on_written,
+        ):
+            if incremental_state is not None:
+                update_incremental_scraping_state(incremental_state, path_to_ahb_docx_file, outcome)
+            pruefis_of_file = pruefis_by_docx_file[path_to_ahb_docx_file]
+            if isinstance(outcome, FileNotFoundError):
+                skipped_not_found.extend(pruefis_of_file)
+            elif isinstance(outcome, Exception):
+                skipped_errors.extend((pruefi, str(outcome)) for pruefi in pruefis_of_file)
+            else:
+                processed += len(outcome.processed)
+                skipped_errors.extend(outcome.errors)
+            # pruefis which have not been reported (e.g. by worker processes or of a missing file) are done, too
+            progress.advance(extracted_task, len(set(pruefis_of_file) - extracted_pruefis))
+            progress.advance(written_task, len(set(pruefis_of_file) - written_pruefis))
+            progress.update(
+                extracted_task,
+                description=f"Extracted {len(pruefis_of_file)} pruefi(s) of {path_to_ahb_docx_file.name}",
+            )
+    if incremental_state is not None:
+        save_incremental_scraping_state(incremental_state, "ahb", efv.value)
 
     from kohlrahbi.docxfiledescriptor import summarize_version_tiers
 
@@ -159,6 +269,8 @@ def ahb(
     tier_summary = summarize_version_tiers(list(set(used_filenames)))
 
     details = ""
+    if unchanged_docx_files:
+        details += f"\n[cyan]Unchanged:[/cyan]    {unchanged} pruefi(s) in {len(unchanged_docx_files)} document(s)"
     if skipped_no_filename:
         details += f"\n[yellow]No filename mapped:[/yellow] {', '.join(skipped_no_filename)}"
     if skipped_not_found:
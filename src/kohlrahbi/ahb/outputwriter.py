@@ -0,0 +1,186 @@
+"""
+This module provides the output stage of the AHB scraping: the change detection of the output files of a pruefi
+(see `kohlrahbi.outputmanifest`) and the dumps of all requested file formats.
+The `AhbOutputWriter` runs this stage in a small thread pool, such that the next pruefi can already be extracted from
+the docx file while the files of the previous ones are written. Most of the writing is I/O and (de)serialization in
+pandas, pydantic-core and the xlsx writer, which does not block the extraction for the whole time.
+The number of unfolded AHBs which wait to be written is bounded, so that the memory does not grow if the extraction is
+faster than the writing.
+"""
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.logger import logger
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.outputmanifest import (
+    OutputFile,
+    PruefiOutputManifest,
+    load_pruefi_output_manifest,
+    save_pruefi_output_manifest,
+)
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+from kohlrahbi.unfoldedahb.unfoldedahbtable import are_equal_except_for_guids
+
+#: the default number of threads which write the output files
+DEFAULT_WRITER_THREADS = 2
+#: the default number of unfolded AHBs which may be submitted to the writer but not yet written
+DEFAULT_MAX_PENDING_UNFOLDED_AHBS = 4
+
+
+def write_unfolded_ahb(
+    unfolded_ahb: UnfoldedAhb,
+    output_path: Path,
+    file_type: tuple[AhbExportFileFormat, ...],
+    source_docx_sha256: str | None = None,
+    flat_ahb: FlatAnwendungshandbuch | None = None,
+) -> None:
+    """
+    Writes the files of the given file types for the unfolded ahb.
+    A file is only (re)written if it is missing or if it is not in sync with the content of the unfolded ahb anymore,
+    according to the output manifest of the pruefi (see `kohlrahbi.outputmanifest`).
+    If the flat ahb of the unfolded ahb has been converted already, it can be passed to be written as flatahb file.
+    """
+    pruefi = unfolded_ahb.meta_data.pruefidentifikator
+    try:
+        output_file_paths = {
+            AhbExportFileFormat.FLATAHB: unfolded_ahb.get_flatahb_json_file_path(output_path),
+            AhbExportFileFormat.XLSX: unfolded_ahb.get_xlsx_file_path(output_path),
+            AhbExportFileFormat.CSV: unfolded_ahb.get_csv_file_path(output_path),
+        }
+        manifest_file_path = unfolded_ahb.get_manifest_file_path(output_path)
+    except ValueError:
+        logger.warning("Error while determining file paths for pruefi '%s'. Skipping saving files.", pruefi)
+        return
+    content_digest = unfolded_ahb.get_content_digest()
+    saved_manifest = load_pruefi_output_manifest(manifest_file_path)
+    manifest = saved_manifest
+    if manifest is None and output_file_paths[AhbExportFileFormat.FLATAHB].exists():
+        manifest = _create_manifest_for_output_without_manifest(
+            unfolded_ahb, content_digest, output_file_paths, source_docx_sha256
+        )
+    if manifest is not None:
+        logger.info("Pruefi '%s' did change since last scraping: %s", pruefi, manifest.content_digest != content_digest)
+
+    updated_manifest = PruefiOutputManifest(
+        pruefidentifikator=pruefi, content_digest=content_digest, source_docx_sha256=source_docx_sha256
+    )
+    for file_format, output_file_path in output_file_paths.items():
+        if manifest is not None and manifest.is_in_sync(content_digest, file_format, output_file_path):
+            updated_manifest.files[file_format] = manifest.files[file_format]
+            continue
+        if file_format not in file_type:
+            continue
+        match file_format:
+            case AhbExportFileFormat.FLATAHB:
+                unfolded_ahb.dump_flatahb_json(output_path, flat_ahb)
+            case AhbExportFileFormat.XLSX:
+                unfolded_ahb.dump_xlsx(output_path)
+            case AhbExportFileFormat.CSV:
+                unfolded_ahb.dump_csv(output_path)
+        updated_manifest.files[file_format] = OutputFile.from_path(output_file_path)
+    if updated_manifest != saved_manifest:
+        save_pruefi_output_manifest(updated_manifest, manifest_file_path)
+
+
+def _create_manifest_for_output_without_manifest(
+    unfolded_ahb: UnfoldedAhb,
+    content_digest: str,
+    output_file_paths: dict[AhbExportFileFormat, Path],
+    source_docx_sha256: str | None,
+) -> PruefiOutputManifest | None:
+    """
+    Creates the output manifest for the files which have been written before output manifests were introduced.
+    The flat ahb is the only file format from which we can READ to compare our current with previous results.
+    If the flat ahb is unchanged, we assume that the other existing files are in sync with it (and unchanged, too).
+    Returns None if the flat ahb did change.
+    """
+    if not are_equal_except_for_guids(unfolded_ahb, output_file_paths[AhbExportFileFormat.FLATAHB]):
+        return None
+    return PruefiOutputManifest(
+        pruefidentifikator=unfolded_ahb.meta_data.pruefidentifikator,
+        content_digest=content_digest,
+        source_docx_sha256=source_docx_sha256,
+        files={
+            file_format: OutputFile.from_path(output_file_path)
+            for file_format, output_file_path in output_file_paths.items()
+            if output_file_path.exists()
+        },
+    )
+
+
+class AhbOutputWriter:
+    """
+    Writes the files of unfolded AHBs (see `write_unfolded_ahb`) in background threads.
+    `submit` blocks as long as `max_pending` unfolded AHBs are waiting to be written. Errors while writing are raised
+    by the result of the returned future. All submitted unfolded AHBs are written after `shutdown` has been called,
+    so use the writer as context manager.
+    If given, `on_written` is called with the pruefidentifikator once its files are written (or failed to be written),
+    in the thread which wrote them.
+    """
+
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    def __init__(
+        self,
+        output_path: Path,
+        file_type: tuple[AhbExportFileFormat, ...],
+        threads: int = DEFAULT_WRITER_THREADS,
+        max_pending: int = DEFAULT_MAX_PENDING_UNFOLDED_AHBS,
+        on_written: Callable[[str], None] | None = None,
+    ) -> None:
+        if threads < 1 or max_pending < 1:
+            raise ValueError("The output writer needs at least one thread and one pending unfolded ahb.")
+        self.output_path = output_path
+        self.file_type = file_type
+        self._on_written = on_written
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="kohlrahbi-writer")
+
+    def __enter__(self) -> "AhbOutputWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.shutdown()
+
+    def submit(
+        self,
+        unfolded_ahb: UnfoldedAhb,
+        source_docx_sha256: str | None = None,
+        flat_ahb: FlatAnwendungshandbuch | None = None,
+    ) -> Future[None]:
+        """
+        Submits the unfolded ahb (and its flat ahb, if it has been converted already) to be written.
+        Blocks until less than `max_pending` unfolded AHBs are pending.
+        """
+        self._pending.acquire()  # pylint: disable=consider-using-with
+        try:
+            return self._executor.submit(self._write, unfolded_ahb, source_docx_sha256, flat_ahb)
+        except BaseException:
+            self._pending.release()
+            raise
+
+    def _write(
+        self, unfolded_ahb: UnfoldedAhb, source_docx_sha256: str | None, flat_ahb: FlatAnwendungshandbuch | None
+    ) -> None:
+        # other than a done callback of the future, this is guaranteed to have finished once the result is available
+        try:
+            write_unfolded_ahb(unfolded_ahb, self.output_path, self.file_type, source_docx_sha256, flat_ahb)
+        finally:
+            self._pending.release()
+            if self._on_written is not None:
+                self._on_written(unfolded_ahb.meta_data.pruefidentifikator)
+
+    def shutdown(self) -> None:
+        """
+        Waits until all submitted unfolded AHBs are written and stops the threads.
+        """
+        self._executor.shutdown(wait=True)
@@ -8,6 +8,7 @@ from docx.table import Table as DocxTable
 from efoli import EdifactFormat
 from pydantic import BaseModel, ConfigDict, Field
 
+from kohlrahbi.docxbody import TableContent, as_table_content
 from kohlrahbi.logger import logger
 
 
@@ -21,15 +22,17 @@ class AhbConditions(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @classmethod
-    def from_docx_table(cls, docx_tables: list[DocxTable], edifact_format: EdifactFormat) -> "AhbConditions":
+    def from_docx_table(
+        cls, docx_tables: list[DocxTable | TableContent], edifact_format: EdifactFormat
+    ) -> "AhbConditions":
         """
         Create an AhbPackageTable object from a docx table.
         """
         table_data = []
         for table in docx_tables:
-            for row in table.rows:
-                if row.cells[-1].text and row.cells[0].text != "EDIFACT Struktur":
-                    row_data = row.cells[-1].text
+            for row in as_table_content(table).iter_rows():
+                if row[-1].text and row[0].text != "EDIFACT Struktur":
+                    row_data = row[-1].text
                     table_data.append(row_data)
 
         conditions_dict = {}
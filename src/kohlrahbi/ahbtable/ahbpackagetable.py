@@ -12,6 +12,7 @@ from efoli import EdifactFormat
 from pydantic import BaseModel, ConfigDict, Field
 
 from kohlrahbi.ahbtable.ahbcondtions import parse_conditions_from_string
+from kohlrahbi.docxbody import TableContent, as_table_content
 from kohlrahbi.logger import logger
 
 
@@ -27,14 +28,14 @@ class AhbPackageTable(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @classmethod
-    def from_docx_table(cls, docx_tables: list[DocxTable]) -> "AhbPackageTable":
+    def from_docx_table(cls, docx_tables: list[DocxTable | TableContent]) -> "AhbPackageTable":
         """
         Create an AhbPackageTable object from a docx table.
         """
         table_data = []
         for table in docx_tables:
-            for row in table.rows:
-                row_data = [cell.text for cell in row.cells]
+            for row in as_table_content(table).iter_rows():
+                row_data = [cell.text for cell in row]
                 table_data.append(row_data)
 
         headers = table_data[0]
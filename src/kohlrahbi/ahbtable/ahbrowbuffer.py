@@ -0,0 +1,110 @@
+"""
+This module contains the AhbRowBuffer class
+"""
+
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class AhbRowBuffer:
+    """
+    The rows of an AHB table as plain lists of strings, one value per column.
+    The whole extraction (parsing the docx tables, sanitizing and unfolding the AHB table) works on these rows.
+    Pandas is only needed at the edge, when an AHB table is exported to CSV or Excel, and is imported lazily.
+    """
+
+    __slots__ = ("_column_indices", "columns", "rows")
+
+    def __init__(self, columns: list[str], rows: list[list[str]] | None = None) -> None:
+        self.columns = columns
+        self.rows: list[list[str]] = rows if rows is not None else []
+        self._column_indices = {column: index for index, column in enumerate(columns)}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column_index(self, column: str) -> int:
+        """
+        Returns the position of the given column.
+        """
+        return self._column_indices[column]
+
+    def append_empty_row(self) -> None:
+        """
+        Appends a row in which all values are empty strings.
+        """
+        self.rows.append([""] * len(self.columns))
+
+    @property
+    def last_row_index(self) -> int:
+        """
+        The index of the last row, the same as `index.max()` of the DataFrame.
+        """
+        return len(self.rows) - 1
+
+    def get(self, row_index: int, column: str) -> str:
+        """
+        Returns the value of the given column in the given row.
+        """
+        return self.rows[row_index][self._column_indices[column]]
+
+    def set(self, row_index: int, column: str, value: str) -> None:
+        """
+        Sets the value of the given column in the given row.
+        """
+        self.rows[row_index][self._column_indices[column]] = value
+
+    def iter_records(self) -> Iterator[dict[str, str]]:
+        """
+        Yields each row as a dictionary with the column names as keys.
+        """
+        for row in self.rows:
+            yield dict(zip(self.columns, row, strict=True))
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """
+        Creates the DataFrame which contains all rows of this buffer.
+        """
+        import pandas as pd  # noqa: PLC0415 -- pandas is only needed for the export
+
+        return pd.DataFrame(self.rows, columns=self.columns, dtype="str")
+
+    @classmethod
+    def concat(cls, ahb_row_buffers: list["AhbRowBuffer"]) -> "AhbRowBuffer":
+        """
+        Creates a buffer which contains (a copy of) the rows of all given buffers.
+        All buffers must have the same columns.
+        """
+        columns = ahb_row_buffers[0].columns
+        rows: list[list[str]] = []
+        for ahb_row_buffer in ahb_row_buffers:
+            if ahb_row_buffer.columns != columns:
+                raise ValueError(f"Cannot concat rows with columns {ahb_row_buffer.columns} to rows with {columns}")
+            rows.extend(list(row) for row in ahb_row_buffer.rows)
+        return cls(columns=list(columns), rows=rows)
+
+    @classmethod
+    def from_dataframe(cls, dataframe: "pd.DataFrame") -> "AhbRowBuffer":
+        """
+        Creates a buffer which contains (a copy of) the rows of the given DataFrame.
+        """
+        return cls(
+            columns=[str(column) for column in dataframe.columns],
+            rows=[list(row) for row in dataframe.itertuples(index=False, name=None)],
+        )
+
+
+def get_rows_from_rows_or_table(rows: AhbRowBuffer | None, table: "pd.DataFrame | None") -> AhbRowBuffer | None:
+    """
+    Returns the given rows or, if the rows are given as DataFrame `table`, the rows of the DataFrame.
+    The AHB (sub) tables used to store their rows in a DataFrame `table`, such that e.g. `AhbTable(table=...)` still
+    works. Returns None if neither is given.
+    """
+    if table is None:
+        return rows
+    if rows is not None:
+        raise ValueError("Either the rows or the table must be given, not both.")
+    return AhbRowBuffer.from_dataframe(table)
@@ -3,22 +3,24 @@ This module contains the AhbSubTable class.
 """
 
 from collections.abc import Generator
-from typing import cast
+from typing import TYPE_CHECKING, Any
 
-import numpy as np
-import pandas as pd
 from docx.table import Table as DocxTable
 from docx.table import _Cell, _Row
 from docx.text.paragraph import Paragraph
-from numpy.typing import NDArray
 from pydantic import BaseModel, ConfigDict
 
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer, get_rows_from_rows_or_table
 from kohlrahbi.ahbtable.ahbtablerow import AhbTableRow
+from kohlrahbi.docxbody import CellContent, ParagraphContent, TableContent, as_table_content
 from kohlrahbi.docxtablecells.bodycell import INDEX_OF_CODES_AND_QUALIFIER_COLUMN, KNOW_SUFFIXES
 from kohlrahbi.enums import RowType
 from kohlrahbi.row_type_checker import get_row_type
 from kohlrahbi.seed import Seed
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class AhbSubTable(BaseModel):
     """
@@ -27,18 +29,33 @@ class AhbSubTable(BaseModel):
     """
 
     table_meta_data: Seed
-    table: pd.DataFrame
+    rows: AhbRowBuffer
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    @staticmethod
-    def _parse_docx_table(
-        table_meta_data: Seed, ahb_table_dataframe: pd.DataFrame, docx_table: DocxTable
-    ) -> pd.DataFrame:
-        """Parse the docx table and add the information to the dataframe."""
-        for row in docx_table.rows:
-            sanitized_cells = list(AhbSubTable.iter_visible_cells(row=row))
+    def __init__(
+        self, *, table_meta_data: Seed, rows: AhbRowBuffer | None = None, table: "pd.DataFrame | None" = None
+    ) -> None:
+        """
+        Either the rows or the rows as DataFrame `table` (see `get_rows_from_rows_or_table`) have to be given.
+        """
+        data: dict[str, Any] = {"table_meta_data": table_meta_data}
+        rows = get_rows_from_rows_or_table(rows, table)
+        if rows is not None:
+            data["rows"] = rows
+        super().__init__(**data)
+
+    @property
+    def table(self) -> "pd.DataFrame":
+        """
+        The rows of this sub table as DataFrame.
+        """
+        return self.rows.to_dataframe()
 
+    @staticmethod
+    def _parse_docx_table(table_meta_data: Seed, ahb_rows: AhbRowBuffer, docx_table: TableContent) -> None:
+        """Parse the docx table and add the information to the row buffer."""
+        for sanitized_cells in docx_table.iter_visible_rows():
             current_edifact_struktur_cell = sanitized_cells[0]
 
             # check for row type
@@ -60,10 +77,10 @@ class AhbSubTable(BaseModel):
                     bedingung_cell=bedingung_cell,
                 )
 
-                ahb_table_row_dataframe = ahb_table_row.parse(row_type=current_row_type)
+                parsed_rows = ahb_table_row.parse(row_type=current_row_type)
 
-                if ahb_table_row_dataframe is not None:
-                    ahb_table_dataframe = pd.concat([ahb_table_dataframe, ahb_table_row_dataframe], ignore_index=True)
+                if parsed_rows is not None:
+                    ahb_rows.rows.extend(parsed_rows.rows)
             else:
                 # this case covers the page break situation
 
@@ -72,7 +89,7 @@ class AhbSubTable(BaseModel):
                 # conditions are always at the top of a dataelement
                 # add condition texts
                 if contains_condition_texts:
-                    AhbSubTable.combine_condition_text(ahb_table_dataframe, bedingung_cell)
+                    AhbSubTable.combine_condition_text(ahb_rows, bedingung_cell)
 
                 # add new row regularly
                 ahb_table_row = AhbTableRow(
@@ -81,28 +98,22 @@ class AhbSubTable(BaseModel):
                     middle_cell=middle_cell,
                     bedingung_cell=bedingung_cell,
                 )
-                ahb_table_row_dataframe = ahb_table_row.parse(row_type=current_row_type)
+                parsed_rows = ahb_table_row.parse(row_type=current_row_type)
 
                 # look at first line to determine if it is broken
                 first_paragraph = middle_cell.paragraphs[0]
 
-                if ahb_table_row_dataframe is not None:
+                if parsed_rows is not None:
                     if AhbSubTable.is_broken_line(
-                        table=ahb_table_dataframe,
+                        table=ahb_rows,
                         table_meta_data=table_meta_data,
                         paragraph=first_paragraph,
                     ):
-                        AhbSubTable.add_broken_line(ahb_table_dataframe, ahb_table_row_dataframe)
+                        AhbSubTable.add_broken_line(ahb_rows, parsed_rows)
                         # we have a broken line
-                        ahb_table_dataframe = pd.concat(
-                            [ahb_table_dataframe, ahb_table_row_dataframe.iloc[1:]],
-                            ignore_index=True,
-                        )
+                        ahb_rows.rows.extend(parsed_rows.rows[1:])
                     else:
-                        ahb_table_dataframe = pd.concat(
-                            [ahb_table_dataframe, ahb_table_row_dataframe],
-                            ignore_index=True,
-                        )
+                        ahb_rows.rows.extend(parsed_rows.rows)
 
             # An AhbSubTable can span over two pages.
             # But after every page break, even if we're still in the same subtable,
@@ -111,51 +122,42 @@ class AhbSubTable(BaseModel):
             # the last two row types.
             table_meta_data.last_two_row_types[1] = table_meta_data.last_two_row_types[0]
             table_meta_data.last_two_row_types[0] = current_row_type
-        return ahb_table_dataframe
-
-    @staticmethod
-    def initialize_dataframe_with_columns(columns: list[str]) -> pd.DataFrame:
-        """
-        Initialize a new dataframe with the given columns
-        """
-        return pd.DataFrame(
-            columns=columns,
-            dtype="str",
-        )
 
     @classmethod
-    def from_table_with_header(cls, docx_table: DocxTable) -> "AhbSubTable":
+    def from_table_with_header(cls, docx_table: DocxTable | TableContent) -> "AhbSubTable":
         """
         Create a new AhbSubTable instance from a docx table WITH header
         """
+        docx_table = as_table_content(docx_table)
 
         ahb_table_meta_data = Seed.from_table(docx_table=docx_table)
 
-        ahb_table_dataframe = AhbSubTable.initialize_dataframe_with_columns(columns=ahb_table_meta_data.column_headers)
+        ahb_rows = AhbRowBuffer(columns=ahb_table_meta_data.column_headers)
 
-        ahb_table_dataframe = cls._parse_docx_table(
+        cls._parse_docx_table(
             table_meta_data=ahb_table_meta_data,
-            ahb_table_dataframe=ahb_table_dataframe,
+            ahb_rows=ahb_rows,
             docx_table=docx_table,
         )
 
-        return cls(table_meta_data=ahb_table_meta_data, table=ahb_table_dataframe)
+        return cls(table_meta_data=ahb_table_meta_data, rows=ahb_rows)
 
     @classmethod
-    def from_headless_table(cls, tmd: Seed, docx_table: DocxTable) -> "AhbSubTable":
+    def from_headless_table(cls, tmd: Seed, docx_table: DocxTable | TableContent) -> "AhbSubTable":
         """
         Create a new AhbSubTable instance from a docx table WITHOUT header
         """
+        docx_table = as_table_content(docx_table)
 
-        ahb_table_dataframe = AhbSubTable.initialize_dataframe_with_columns(columns=tmd.column_headers)
+        ahb_rows = AhbRowBuffer(columns=tmd.column_headers)
 
-        ahb_table_dataframe = cls._parse_docx_table(
+        cls._parse_docx_table(
             table_meta_data=tmd,
-            ahb_table_dataframe=ahb_table_dataframe,
+            ahb_rows=ahb_rows,
             docx_table=docx_table,
         )
 
-        return cls(table_meta_data=tmd, table=ahb_table_dataframe)
+        return cls(table_meta_data=tmd, rows=ahb_rows)
 
     @staticmethod
     def iter_visible_cells(row: _Row) -> Generator[_Cell, None, None]:
@@ -168,72 +170,70 @@ class AhbSubTable(BaseModel):
             yield _Cell(table_column, row.table)
 
     @staticmethod
-    def add_text_to_last_row(ahb_table_dataframe: pd.DataFrame, row_index: int, column_index: int, text: str) -> None:
-        """Add a text to the last row of the dataframe."""
+    def add_text_to_last_row(ahb_rows: AhbRowBuffer, row_index: int, column_index: int, text: str) -> None:
+        """Add a text to the last row of the row buffer."""
         starts_with_known_suffix = any(text.startswith(suffix + " ") for suffix in KNOW_SUFFIXES)
         if len(text) > 0:
-            existing_text = cast(str, ahb_table_dataframe.iat[row_index, column_index])
+            row = ahb_rows.rows[row_index]
+            existing_text = row[column_index]
             if len(existing_text) > 0 and not starts_with_known_suffix:
                 text = " " + text
-            ahb_table_dataframe.iat[row_index, column_index] = existing_text + text
+            row[column_index] = existing_text + text
 
     @staticmethod
-    def add_broken_line(ahb_table_dataframe: pd.DataFrame, broken_line: pd.DataFrame) -> None:
-        """Add a broken line to the dataframe."""
-        for col_index in range(INDEX_OF_CODES_AND_QUALIFIER_COLUMN, len(ahb_table_dataframe.columns)):
+    def add_broken_line(ahb_rows: AhbRowBuffer, broken_line: AhbRowBuffer) -> None:
+        """Add a broken line to the row buffer."""
+        for col_index in range(INDEX_OF_CODES_AND_QUALIFIER_COLUMN, len(ahb_rows.columns)):
             AhbSubTable.add_text_to_last_row(
-                ahb_table_dataframe, ahb_table_dataframe.index.max(), col_index, str(broken_line.iat[0, col_index])
+                ahb_rows, ahb_rows.last_row_index, col_index, str(broken_line.rows[0][col_index])
             )
 
     @staticmethod
-    def combine_condition_text(ahb_table_dataframe: pd.DataFrame, bedingung_cell: _Cell) -> None:
-        """Add the condition text to the dataframe."""
+    def combine_condition_text(ahb_rows: AhbRowBuffer, bedingung_cell: CellContent) -> None:
+        """Add the condition text to the row buffer."""
         conditions_text = " " + " ".join(
             paragraph.text for paragraph in bedingung_cell.paragraphs if paragraph.text != ""
         )
-        last_valid_row = ahb_table_dataframe["Bedingung"].last_valid_index()
-        conditions_text = cast(str, ahb_table_dataframe.at[last_valid_row, "Bedingung"]) + conditions_text
+        # all values in the buffer are strings, so the last valid row is simply the last row
+        last_valid_row = ahb_rows.last_row_index
+        conditions_text = ahb_rows.get(last_valid_row, "Bedingung") + conditions_text
         # remove existing text
-        ahb_table_dataframe.at[last_valid_row, "Bedingung"] = ""
+        ahb_rows.set(last_valid_row, "Bedingung", "")
         # remove remaining text to avoid misplacements
-        for paragraph in bedingung_cell.paragraphs:
-            paragraph.text = ""
-        bedingung_cell.paragraphs[-1].text = conditions_text
+        for paragraph_index in range(len(bedingung_cell.paragraphs)):
+            bedingung_cell.set_paragraph_text(paragraph_index, "")
+        bedingung_cell.set_paragraph_text(-1, conditions_text)
 
     @staticmethod
     def is_broken_line(
-        table: pd.DataFrame,
+        table: AhbRowBuffer,
         table_meta_data: Seed,
-        paragraph: Paragraph,
+        paragraph: Paragraph | ParagraphContent,
     ) -> bool:
         """
         Check for broken lines in the middle cell.
         """
         tabsplit_text = paragraph.text.split("\t")
 
-        loc: int | slice | NDArray[np.bool_] = table.columns.get_loc("Beschreibung")
-
-        # Ensure loc is an int
-        if isinstance(loc, int):
-            beschreibung_index: int = loc
-        else:
-            raise ValueError("The location of the column 'Beschreibung' is not an integer.")
+        beschreibung_index = table.column_index("Beschreibung")
 
+        left_indent = (
+            paragraph.left_indent if isinstance(paragraph, ParagraphContent) else paragraph.paragraph_format.left_indent
+        )
         is_empty_middle_line = all(text == "" for text in tabsplit_text)
         is_broken_code_qualifier = (
-            paragraph.paragraph_format.left_indent is not None
-            and paragraph.paragraph_format.left_indent != table_meta_data.middle_cell_left_indent_position
-            and table.iat[-1, beschreibung_index] != ""
-            and table.iloc[-1, beschreibung_index + 1 :].ne("").any()
+            left_indent is not None
+            and left_indent != table_meta_data.middle_cell_left_indent_position
+            and table.rows[-1][beschreibung_index] != ""
+            and any(value != "" for value in table.rows[-1][beschreibung_index + 1 :])
         )
         if is_broken_code_qualifier and len(tabsplit_text) == 1:
             # only broken code / qualifier
-            assert table.iat[-1, beschreibung_index] != "" and table.iloc[-1, beschreibung_index + 1 :].ne("").any(), (
-                "no condition expected in broken line"
-            )
+            assert table.rows[-1][beschreibung_index] != "" and any(
+                value != "" for value in table.rows[-1][beschreibung_index + 1 :]
+            ), "no condition expected in broken line"
         there_are_conditions = (
-            len(tabsplit_text) > 1
-            and paragraph.paragraph_format.left_indent != table_meta_data.middle_cell_left_indent_position
+            len(tabsplit_text) > 1 and left_indent != table_meta_data.middle_cell_left_indent_position
         )
 
         return bool(is_empty_middle_line or there_are_conditions or is_broken_code_qualifier)
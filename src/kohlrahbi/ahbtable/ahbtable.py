@@ -2,17 +2,22 @@
 This module provides the AhbTable class
 """
 
+from collections.abc import Mapping
+from itertools import compress
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 from efoli import get_format_of_pruefidentifikator
-from more_itertools import peekable
 from pydantic import BaseModel, ConfigDict, Field
 
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer, get_rows_from_rows_or_table
 from kohlrahbi.ahbtable.ahbsubtable import AhbSubTable
 from kohlrahbi.logger import logger
 from kohlrahbi.table_header import PruefiMetaData
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 _column_letter_width_mapping: dict[str, float | int] = {
     "A": 3.5,
     "B": 47,
@@ -30,11 +35,43 @@ class AhbTable(BaseModel):
     This class contains the AHB table as you see it in the AHB documents, but in a machine readable format.
     """
 
-    table: pd.DataFrame
+    rows: AhbRowBuffer
     metadata: list[PruefiMetaData] = Field(default_factory=list)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    def __init__(
+        self,
+        *,
+        rows: AhbRowBuffer | None = None,
+        metadata: list[PruefiMetaData] | None = None,
+        table: "pd.DataFrame | None" = None,
+    ) -> None:
+        """
+        Either the rows or the rows as DataFrame `table` (see `get_rows_from_rows_or_table`) have to be given.
+        """
+        data: dict[str, Any] = {}
+        rows = get_rows_from_rows_or_table(rows, table)
+        if rows is not None:
+            data["rows"] = rows
+        if metadata is not None:
+            data["metadata"] = metadata
+        super().__init__(**data)
+
+    @property
+    def table(self) -> "pd.DataFrame":
+        """
+        The rows of this AHB table as DataFrame, e.g. for the export to CSV or Excel.
+        """
+        return self.rows.to_dataframe()
+
+    @classmethod
+    def from_dataframe(cls, table: "pd.DataFrame", metadata: list[PruefiMetaData] | None = None) -> "AhbTable":
+        """
+        Create an AHB table from a DataFrame
+        """
+        return cls(rows=AhbRowBuffer.from_dataframe(table), metadata=metadata or [])
+
     def fill_segment_gruppe_segment_dataelement(self) -> None:
         """
         For easier readability this functions adds the segment
@@ -58,39 +95,52 @@ class AhbTable(BaseModel):
         latest_segement: str = ""
         latest_datenelement: str = ""
 
-        for idx, row in self.table.iterrows():
-            if row["Segment Gruppe"] != "":
-                latest_segement_gruppe = row["Segment Gruppe"]
+        segment_gruppe_index = self.rows.column_index("Segment Gruppe")
+        segment_index = self.rows.column_index("Segment")
+        datenelement_index = self.rows.column_index("Datenelement")
+        codes_und_qualifier_index = self.rows.column_index("Codes und Qualifier")
+
+        for row in self.rows.rows:
+            if row[segment_gruppe_index] != "":
+                latest_segement_gruppe = row[segment_gruppe_index]
 
-            if row["Segment"] != "":
-                latest_segement = row["Segment"]
+            if row[segment_index] != "":
+                latest_segement = row[segment_index]
 
-            if row["Datenelement"] != "":
-                latest_datenelement = row["Datenelement"]
+            if row[datenelement_index] != "":
+                latest_datenelement = row[datenelement_index]
 
-            if (row["Segment Gruppe"] == "" and row["Codes und Qualifier"] != "") or row["Segment"] != "":
-                self.table.at[idx, "Segment Gruppe"] = latest_segement_gruppe
-                self.table.at[idx, "Segment"] = latest_segement
-                self.table.at[idx, "Datenelement"] = latest_datenelement
+            if (row[segment_gruppe_index] == "" and row[codes_und_qualifier_index] != "") or row[segment_index] != "":
+                row[segment_gruppe_index] = latest_segement_gruppe
+                row[segment_index] = latest_segement
+                row[datenelement_index] = latest_datenelement
 
     @classmethod
     def from_ahb_sub_table(cls, ahb_sub_table: AhbSubTable) -> "AhbTable":
         """
         Create an AHB table from an AHB sub table
         """
-        return cls(table=ahb_sub_table.table, metadata=ahb_sub_table.table_meta_data.metadata)
+        return cls(rows=AhbRowBuffer.concat([ahb_sub_table.rows]), metadata=ahb_sub_table.table_meta_data.metadata)
+
+    @classmethod
+    def from_ahb_sub_tables(cls, ahb_sub_tables: list[AhbSubTable]) -> "AhbTable":
+        """
+        Create an AHB table from all AHB sub tables of a Prüfidentifikator.
+        The resulting table does not share its rows with the sub tables.
+        """
+        return cls(
+            rows=AhbRowBuffer.concat([ahb_sub_table.rows for ahb_sub_table in ahb_sub_tables]),
+            metadata=ahb_sub_tables[0].table_meta_data.metadata,
+        )
 
     def append_ahb_sub_table(self, ahb_sub_table: AhbSubTable) -> None:
         """
         Append an AHB sub table to this AHB table instance
         """
-        if self.table is None:
-            self.table = ahb_sub_table.table
-        else:
-            self.table = pd.concat([self.table, ahb_sub_table.table], ignore_index=True)
+        self.rows.rows.extend(AhbRowBuffer.concat([ahb_sub_table.rows]).rows)
 
     @staticmethod
-    def line_contains_only_segment_gruppe(raw_line: pd.Series) -> bool:
+    def line_contains_only_segment_gruppe(raw_line: Mapping[str, str | None]) -> bool:
         """
         Returns true if the given raw line only contains some meaningful data in the "Segment Gruppe" key
         """
@@ -106,50 +156,38 @@ class AhbTable(BaseModel):
         In some cases there is the content of one cell splits in two.
         We need to merge the content into one cell and delete the deprecated cell afterwards.
         """
-        index_of_lines_to_drop: list[int] = []
-
-        self.table.reset_index(drop=True, inplace=True)
-        iterable_ahb_table = peekable(self.table.iterrows())
-        for current_index, row in iterable_ahb_table:
-            # pylint: disable=unpacking-non-sequence # it is a tuple indeed
-            index_of_next_row, next_row = iterable_ahb_table.peek(
-                (
-                    0,
-                    pd.Series(
-                        {
-                            "Segment Gruppe": "",
-                            "Segment": "",
-                            "Codes und Qualifier": "",
-                            "Beschreibung": "",
-                            "Bedingung": "",
-                        }
-                    ),
-                )
-            )
-
-            segment_gruppe_contains_multiple_lines = (
-                "Segment Gruppe" in row
-                and row["Segment Gruppe"]
-                and AhbTable.line_contains_only_segment_gruppe(row)
-                and not next_row["Segment Gruppe"].startswith("SG")
-                and not next_row["Segment"]
+        if "Segment Gruppe" not in self.rows.columns:
+            return
+        rows = self.rows.rows
+        if not rows:
+            return
+        segment_gruppe_index = self.rows.column_index("Segment Gruppe")
+        segment_index = self.rows.column_index("Segment")
+
+        # all comparisons are made with the original values; the last row is followed by an empty row
+        segment_gruppen = [row[segment_gruppe_index] for row in rows]
+        next_segment_gruppen = [*segment_gruppen[1:], ""]
+        next_segmente = [*(row[segment_index] for row in rows[1:]), ""]
+        segment_gruppe_contains_multiple_lines = [
+            bool(segment_gruppe)
+            and not next_segment_gruppe.startswith("SG")
+            and not next_segment
+            and not any(value.strip() for value in row[:segment_gruppe_index])
+            and not any(value.strip() for value in row[segment_gruppe_index + 1 :])
+            for row, segment_gruppe, next_segment_gruppe, next_segment in zip(
+                rows, segment_gruppen, next_segment_gruppen, next_segmente, strict=True
             )
-            if segment_gruppe_contains_multiple_lines:
-                merged_segment_gruppe_content = " ".join([row["Segment Gruppe"], next_row["Segment Gruppe"]])
-                self.table.at[current_index, "Segment Gruppe"] = merged_segment_gruppe_content.strip()
-
-                if not isinstance(index_of_next_row, int):
-                    raise TypeError(
-                        f"The 'index_of_next_row' must by of type `int` but it is '{type(index_of_next_row)}'"
-                    )
-
-                if index_of_next_row == 0:
-                    # this case is only for the first and last row. These lines should not get deleted.
-                    continue
-                index_of_lines_to_drop.append(index_of_next_row)
-
-        self.table.drop(index_of_lines_to_drop, inplace=True)
-        self.table.reset_index(drop=True, inplace=True)
+        ]
+        for row, segment_gruppe, next_segment_gruppe in compress(
+            zip(rows, segment_gruppen, next_segment_gruppen, strict=True), segment_gruppe_contains_multiple_lines
+        ):
+            row[segment_gruppe_index] = " ".join([segment_gruppe, next_segment_gruppe]).strip()
+        # the row after a merged row is dropped (there is none after the last row)
+        rows_to_keep = [
+            True,
+            *(not contains_multiple_lines for contains_multiple_lines in segment_gruppe_contains_multiple_lines[:-1]),
+        ]
+        self.rows.rows = list(compress(rows, rows_to_keep))
 
     def to_csv(self, pruefi: str, path_to_output_directory: Path) -> None:
         """
@@ -167,7 +205,7 @@ class AhbTable(BaseModel):
 
         self.fill_segment_gruppe_segment_dataelement()
 
-        columns_to_export = [*list(self.table.columns)[:5], pruefi]
+        columns_to_export = [*self.rows.columns[:5], pruefi]
         columns_to_export.append("Bedingung")
         df_to_export = self.table[columns_to_export]
 
@@ -191,7 +229,9 @@ class AhbTable(BaseModel):
 
         excel_file_name = f"{pruefi}.xlsx"
 
-        columns_to_export = [*list(self.table.columns)[:5], pruefi]
+        import pandas as pd  # noqa: PLC0415 -- pandas is only needed for the export
+
+        columns_to_export = [*self.rows.columns[:5], pruefi]
         columns_to_export.append("Bedingung")
         df_to_export = self.table[columns_to_export]
 
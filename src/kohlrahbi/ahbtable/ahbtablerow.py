@@ -2,10 +2,11 @@
 This module contains the class AhbTableRow
 """
 
-import pandas as pd
 from docx.table import _Cell
 from pydantic import BaseModel, ConfigDict
 
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer
+from kohlrahbi.docxbody import CellContent
 from kohlrahbi.docxtablecells import BedingungCell, BodyCell, EdifactStrukturCell
 from kohlrahbi.enums import RowType
 from kohlrahbi.seed import Seed
@@ -19,15 +20,16 @@ class AhbTableRow(BaseModel):
     """
 
     seed: Seed
-    edifact_struktur_cell: _Cell
-    middle_cell: _Cell
-    bedingung_cell: _Cell
+    edifact_struktur_cell: _Cell | CellContent
+    middle_cell: _Cell | CellContent
+    bedingung_cell: _Cell | CellContent
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def parse(self, row_type: RowType) -> pd.DataFrame | None:
+    def parse(self, row_type: RowType) -> AhbRowBuffer | None:
         """
-        Writes the current row of the current table into the DataFrame depending on the type of the row.
+        Writes the current row of the current table into a row buffer depending on the type of the row.
+        A single docx row may result in multiple rows, e.g. if the middle cell contains multiple codes.
         If the row is a header row, it will be skipped and None will be returned.
         """
 
@@ -35,15 +37,9 @@ class AhbTableRow(BaseModel):
             # we skip the header rows because we scraped it already and there are no new information
             return None
 
-        ahb_row_dataframe = pd.DataFrame(
-            # pylint: disable=no-member
-            columns=self.seed.column_headers,
-            dtype="str",
-        )
-        # pylint: disable=unsubscriptable-object, no-member
-        empty_row: pd.Series = pd.Series(len(ahb_row_dataframe.columns) * [""], index=self.seed.column_headers)
-
-        ahb_row_dataframe = pd.concat([ahb_row_dataframe, empty_row.to_frame().T], ignore_index=True)
+        # pylint: disable=no-member
+        ahb_rows = AhbRowBuffer(columns=self.seed.column_headers)
+        ahb_rows.append_empty_row()
 
         # EDIFACT STRUKTUR
         esc: EdifactStrukturCell = EdifactStrukturCell(
@@ -51,7 +47,7 @@ class AhbTableRow(BaseModel):
             table_cell=self.edifact_struktur_cell,
             edifact_struktur_cell_left_indent_position=self.seed.edifact_struktur_left_indent_position,
         )
-        ahb_row_dataframe = esc.parse(ahb_row_dataframe=ahb_row_dataframe)
+        esc.parse_into(ahb_rows)
 
         # BODY
         boc: BodyCell = BodyCell(
@@ -60,10 +56,10 @@ class AhbTableRow(BaseModel):
             left_indent_position=self.seed.middle_cell_left_indent_position,
             indicator_tabstop_positions=self.seed.tabstop_positions,
         )
-        ahb_row_dataframe = boc.parse(ahb_row_dataframe=ahb_row_dataframe)
+        boc.parse_into(ahb_rows)
 
         # BEDINGUNG
         bec: BedingungCell = BedingungCell(table_cell=self.bedingung_cell)
-        ahb_row_dataframe = bec.parse(ahb_row_dataframe)
+        bec.parse_into(ahb_rows)
 
-        return ahb_row_dataframe
+        return ahb_rows
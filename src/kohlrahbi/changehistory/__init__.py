@@ -13,19 +13,19 @@ import re
 from datetime import UTC, datetime
 from pathlib import Path
 
-import docx
 import pandas as pd
 from docx.document import Document
 from docx.table import Table
 from efoli import EdifactFormatVersion
 
 from kohlrahbi.changehistory.changehistorytable import ChangeHistoryTable
+from kohlrahbi.docxbody import DocumentBody, TableContent, as_document_body
+from kohlrahbi.docxbodycache import load_document_body
 from kohlrahbi.docxfilefinder import DocxFileFinder
 from kohlrahbi.logger import logger
-from kohlrahbi.read_functions import get_all_paragraphs_and_tables
 
 
-def is_change_history_table(table: Table) -> bool:
+def is_change_history_table(table: Table | TableContent) -> bool:
     """
     Checks if the given table is change history table.
     """
@@ -37,7 +37,7 @@ def is_change_history_table(table: Table) -> bool:
         return False
 
 
-def get_change_history_table(document: Document) -> ChangeHistoryTable | None:
+def get_change_history_table(document: Document | DocumentBody) -> ChangeHistoryTable | None:
     """
     Reads a docx file and extracts the change history.
     Returns None if no such table was found.
@@ -45,8 +45,8 @@ def get_change_history_table(document: Document) -> ChangeHistoryTable | None:
 
     # Iterate through the whole word document
     logger.info("🔁 Start iterating through paragraphs and tables")
-    for item in get_all_paragraphs_and_tables(parent=document):
-        if isinstance(item, Table) and is_change_history_table(table=item):
+    for item in as_document_body(document).tables:
+        if is_change_history_table(table=item):
             change_history_table = ChangeHistoryTable.from_docx_change_history_table(docx_table=item)
             return change_history_table
 
@@ -161,7 +161,7 @@ def process_docx_file(file_path: Path) -> pd.DataFrame | None:
     """
     Read and process change history from a .docx file.
     """
-    doc = docx.Document(str(file_path))
+    doc = load_document_body(file_path)
     logger.info("🤓 Start reading docx file '%s'", str(file_path))
     change_history_table = get_change_history_table(document=doc)
 
@@ -6,7 +6,7 @@ import pandas as pd
 from docx.table import Table
 from pydantic import BaseModel, ConfigDict
 
-from kohlrahbi.ahbtable.ahbsubtable import AhbSubTable
+from kohlrahbi.docxbody import TableContent, as_table_content
 
 
 class ChangeHistoryTable(BaseModel):
@@ -19,16 +19,14 @@ class ChangeHistoryTable(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @classmethod
-    def from_docx_change_history_table(cls, docx_table: Table) -> "ChangeHistoryTable":
+    def from_docx_change_history_table(cls, docx_table: Table | TableContent) -> "ChangeHistoryTable":
         """
         Create a ChangeHistorySubTable object from a change history table.
         """
 
         change_history_rows: list[list[str]] = []
 
-        for row in docx_table.rows:
-            sanitized_cells = list(AhbSubTable.iter_visible_cells(row=row))
-
+        for sanitized_cells in as_table_content(docx_table).iter_visible_rows():
             is_header_row = sanitized_cells[0].text == "Änd-ID" or sanitized_cells[2].text == "Bisher"
             if is_header_row:
                 continue
@@ -5,13 +5,18 @@ This module contains the function to write the collected conditions to a json fi
 from collections.abc import Callable
 from pathlib import Path
 
-import docx
 from efoli import EdifactFormat, EdifactFormatVersion, get_format_of_pruefidentifikator
 
-from kohlrahbi.ahb import get_pruefi_to_file_mapping
+from kohlrahbi.ahb import get_pruefi_to_file_mapping, group_pruefis_by_file
 from kohlrahbi.ahbtable.ahbcondtions import AhbConditions
 from kohlrahbi.ahbtable.ahbpackagetable import AhbPackageTable
 from kohlrahbi.conditions.allgemeine_festlegungen import time_conditions
+from kohlrahbi.docxbodycache import load_cached_document_body
+from kohlrahbi.incrementalstate import (
+    IncrementalScrapingState,
+    load_incremental_scraping_state,
+    save_incremental_scraping_state,
+)
 from kohlrahbi.logger import logger
 from kohlrahbi.read_functions import get_all_conditions_from_doc
 
@@ -30,6 +35,46 @@ def find_all_files_from_all_pruefis(pruefi_to_file_mapping: dict[str, str]) -> d
     return format_to_files_mapping
 
 
+def get_unchanged_edifact_formats(
+    format_to_files_mapping: dict[EdifactFormat, list[str]],
+    pruefis_by_file: dict[str, list[str]],
+    path_to_files: Path,
+    output_path: Path,
+    incremental_scraping_state: IncrementalScrapingState,
+) -> list[EdifactFormat]:
+    """
+    Returns the edifact formats whose conditions do not have to be scraped again in an incremental run: The formats
+    are (still) described by the same docx files, none of these files has changed since the last incremental run and
+    the conditions.json (and packages.json) files which have been written then have not changed since.
+    """
+    unchanged_edifact_formats: list[EdifactFormat] = []
+    for edifact_format, files in format_to_files_mapping.items():
+        previous_files = {
+            name
+            for name, source_docx_file in incremental_scraping_state.source_docx_files.items()
+            if any(get_format_of_pruefidentifikator(pruefi) == edifact_format for pruefi in source_docx_file.pruefis)
+        }
+        if previous_files != set(files):
+            continue
+        if any(
+            incremental_scraping_state.get_unchanged_source_docx_file(path_to_files / file, pruefis_by_file[file])
+            is None
+            for file in files
+        ):
+            continue
+        path_to_format_output = output_path / str(edifact_format)
+        if not incremental_scraping_state.has_valid_output_file(path_to_format_output / "conditions.json"):
+            continue
+        # not every format has packages
+        if not incremental_scraping_state.has_valid_output_file(
+            path_to_format_output / "packages.json", required=False
+        ):
+            continue
+        unchanged_edifact_formats.append(edifact_format)
+    return unchanged_edifact_formats
+
+
+# pylint: disable=too-many-locals
 def scrape_conditions(
     basic_input_path: Path,
     output_path: Path,
@@ -37,6 +82,8 @@ def scrape_conditions(
     *,
     on_start: Callable[[int], None] | None = None,
     on_file: Callable[[str], None] | None = None,
+    incremental: bool = False,
+    sqlite_bundle: bool = False,
 ) -> None:
     """
     starts the scraping process for conditions of all formats
@@ -44,20 +91,40 @@ def scrape_conditions(
     ``on_start`` is invoked once with the total number of files to scrape and ``on_file`` with each
     file name once it has been processed, so a caller can advance a determinate progress bar as
     work completes.
+    In an incremental run, the formats whose docx files did not change since the last incremental run (and whose
+    outputs are still present) are skipped.
+    If `sqlite_bundle` is set, the conditions and packages are written into the sqlite bundle, too (see
+    `kohlrahbi.unfoldedahb.sqlitebundle`). Like in the AHB scraping, the sqlite bundle cannot be written incrementally.
     """
+    if incremental and sqlite_bundle:
+        raise ValueError("The sqlite bundle cannot be written incrementally.")
     path_to_file = basic_input_path / Path("edi_energy_de") / Path(format_version.value)
     pruefi_to_file_mapping = get_pruefi_to_file_mapping(basic_input_path, format_version)
 
     collected_conditions: AhbConditions = AhbConditions()
     collected_packages: AhbPackageTable = AhbPackageTable()
     all_format_files = find_all_files_from_all_pruefis(pruefi_to_file_mapping)
+    pruefis_by_file = group_pruefis_by_file(pruefi_to_file_mapping)
+    incremental_state = (
+        load_incremental_scraping_state("conditions", format_version.value, output_path) if incremental else None
+    )
+    if incremental_state is not None:
+        for edifact_format in get_unchanged_edifact_formats(
+            all_format_files, pruefis_by_file, path_to_file, output_path, incremental_state
+        ):
+            logger.info("Skipping the conditions for %s, which did not change since the last run.", edifact_format)
+            del all_format_files[edifact_format]
     if on_start is not None:
         on_start(sum(len(files) for files in all_format_files.values()))
+    # the hashes of the scraped docx files (by file name), which are recorded in the incremental state
+    source_docx_sha256s: dict[str, str] = {}
     for edifact_format, files in all_format_files.items():
         for file in files:
             # pylint: disable=too-many-function-args
             path: Path = basic_input_path / path_to_file / Path(file)
-            doc = docx.Document(str(path.absolute()))
+            cached_document_body = load_cached_document_body(path.absolute())
+            source_docx_sha256s[file] = cached_document_body.sha256
+            doc = cached_document_body.body
             logger.info("Start scraping conditions for %s in %s", edifact_format, file)
             if not doc:
                 logger.error("Could not open file %s as docx", Path(file))
@@ -71,3 +138,22 @@ def scrape_conditions(
         collected_conditions.include_condition_dict({edifact_format: time_conditions})
     collected_conditions.dump_as_json(output_path)
     collected_packages.dump_as_json(output_path)
+    if sqlite_bundle:
+        from kohlrahbi.unfoldedahb.sqlitebundle import (  # noqa: PLC0415 -- sqlmodel is an optional dependency
+            write_conditions_to_sqlite_bundle,
+        )
+
+        write_conditions_to_sqlite_bundle(
+            output_path, format_version, collected_conditions.conditions_dict, collected_packages.package_dict
+        )
+    if incremental_state is not None:
+        incremental_state.retain_source_docx_files(set(pruefis_by_file))
+        for edifact_format, files in all_format_files.items():
+            for file in files:
+                incremental_state.add_source_docx_file(
+                    path_to_file / file, pruefis_by_file[file], source_docx_sha256s[file]
+                )
+            incremental_state.add_output_file(output_path / str(edifact_format) / "conditions.json")
+            if edifact_format in collected_packages.package_dict:
+                incremental_state.add_output_file(output_path / str(edifact_format) / "packages.json")
+        save_incremental_scraping_state(incremental_state, "conditions", format_version.value)
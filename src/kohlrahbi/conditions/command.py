@@ -59,6 +59,20 @@ def conditions(
             help="Confirm all prompts automatically.",
         ),
     ] = False,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help="Skip formats whose AHB documents did not change since the last incremental run.",
+        ),
+    ] = False,
+    sqlite_bundle: Annotated[
+        bool,
+        typer.Option(
+            "--sqlite-bundle",
+            help="Also write the conditions and packages into the SQLite file of `kohlrahbi ahb --file-type sqlite`.",
+        ),
+    ] = False,
     verbose: Annotated[
         bool,
         typer.Option(
@@ -75,6 +89,17 @@ def conditions(
         console=console, verbose=verbose, output_path=output_path, assume_yes=assume_yes, format_version=format_version
     )
 
+    if sqlite_bundle and incremental:
+        console.print("[red]--sqlite-bundle cannot be combined with --incremental.[/red]")
+        raise typer.Exit(code=1)
+    if sqlite_bundle:
+        # fail before scraping if the optional dependencies are missing
+        try:
+            from kohlrahbi.unfoldedahb import sqlitebundle  # noqa: F401 # pylint: disable=unused-import
+        except ImportError as e:
+            console.print(f"[red]{e}[/red]")
+            raise typer.Exit(code=1) from e
+
     from kohlrahbi.conditions import scrape_conditions
 
     with bar_progress(console) as progress:
@@ -93,6 +118,8 @@ def conditions(
             format_version=efv,
             on_start=on_start,
             on_file=on_file,
+            incremental=incremental,
+            sqlite_bundle=sqlite_bundle,
         )
 
     console.print(
@@ -0,0 +1,214 @@
+"""
+This module contains a compact representation of the body of a docx file.
+It holds only the information which the scrapers need (texts, left indents, tab stops, ...) and does not depend on
+python-docx once it has been created. Hence, it can be serialized to JSON and cached on disk.
+"""
+
+from collections.abc import Generator
+from functools import cached_property
+from typing import Annotated, Literal
+
+from docx.document import Document
+from docx.table import Table, _Cell
+from docx.text.paragraph import Paragraph
+from pydantic import BaseModel, Field
+
+
+class ParagraphContent(BaseModel):
+    """
+    The content of a single paragraph, either from the top level of the document body or from inside a table cell.
+    """
+
+    kind: Literal["paragraph"] = "paragraph"
+    text: str = ""
+    #: the style name is only collected for paragraphs on the top level of the document body
+    style_name: str | None = None
+    left_indent: int | None = None
+    tab_stops: list[int] = Field(default_factory=list)
+    #: the colour of the first run as hex string, e.g. '808080', or None if there is no run or no explicit colour
+    first_run_color: str | None = None
+
+    @classmethod
+    def from_docx_paragraph(cls, paragraph: Paragraph, with_style_name: bool = False) -> "ParagraphContent":
+        """
+        Create a ParagraphContent from a python-docx paragraph.
+        Resolving the style name is quite expensive, therefore it is only done if `with_style_name` is set.
+        """
+        paragraph_format = paragraph.paragraph_format
+        runs = paragraph.runs
+        first_run_rgb = runs[0].font.color.rgb if runs else None
+        style_name: str | None = None
+        if with_style_name:
+            style_name = paragraph.style.name if paragraph.style else "None"
+        return cls(
+            text=paragraph.text,
+            style_name=style_name,
+            left_indent=paragraph_format.left_indent,
+            tab_stops=[tab_stop.position for tab_stop in paragraph_format.tab_stops],
+            first_run_color=str(first_run_rgb) if first_run_rgb is not None else None,
+        )
+
+
+class CellContent(BaseModel):
+    """
+    The content of a single table cell.
+    """
+
+    paragraphs: list[ParagraphContent] = Field(default_factory=list)
+
+    @cached_property
+    def text(self) -> str:
+        """
+        The text of all paragraphs joined by line breaks, the same as `_Cell.text` of python-docx.
+        The text is read many times while the type of a row is determined, so it is joined only once.
+        Use `set_paragraph_text` to change the text of a paragraph, otherwise the cached text gets outdated.
+        """
+        return "\n".join(paragraph.text for paragraph in self.paragraphs)
+
+    def set_paragraph_text(self, paragraph_index: int, text: str) -> None:
+        """
+        Sets the text of the paragraph at the given index and resets the cached text of the cell.
+        """
+        self.paragraphs[paragraph_index].text = text
+        self.__dict__.pop("text", None)
+
+    @classmethod
+    def from_docx_cell(cls, cell: _Cell) -> "CellContent":
+        """
+        Create a CellContent from a python-docx table cell.
+        """
+        return cls(paragraphs=[ParagraphContent.from_docx_paragraph(paragraph) for paragraph in cell.paragraphs])
+
+
+def as_cell_content(cell: _Cell | CellContent) -> CellContent:
+    """
+    Returns the given cell as CellContent; python-docx cells are converted.
+    """
+    if isinstance(cell, CellContent):
+        return cell
+    return CellContent.from_docx_cell(cell)
+
+
+class TableContent(BaseModel):
+    """
+    The content of a table.
+    Each cell (i.e. each `w:tc` element) is stored only once; the different views on the table which python-docx
+    offers (layout grid, row cells and visible cells) reference the cells by their index.
+    """
+
+    kind: Literal["table"] = "table"
+    cells: list[CellContent] = Field(default_factory=list)
+    column_count: int = 0
+    #: the cell indices of the layout grid, row by row; the same as `Table._cells` of python-docx
+    grid_cell_indices: list[int] = Field(default_factory=list)
+    #: the cell indices of each row; the same as `_Row.cells` of python-docx
+    row_cell_indices: list[list[int]] = Field(default_factory=list)
+    #: the cell indices of the cells you actually see in each row of the word document
+    visible_cell_indices: list[list[int]] = Field(default_factory=list)
+
+    def cell(self, row_idx: int, col_idx: int) -> CellContent:
+        """
+        The cell at the given position of the layout grid; the same as `Table.cell` of python-docx.
+        """
+        return self.cells[self.grid_cell_indices[col_idx + (row_idx * self.column_count)]]
+
+    def row_cells(self, row_idx: int) -> list[CellContent]:
+        """
+        The cells of the given row of the layout grid; the same as `Table.row_cells` of python-docx.
+        """
+        start = row_idx * self.column_count
+        return [self.cells[index] for index in self.grid_cell_indices[start : start + self.column_count]]
+
+    def iter_rows(self) -> Generator[list[CellContent], None, None]:
+        """
+        Yields the cells of each row; the same as `row.cells` for each row of a python-docx table.
+        """
+        for row in self.row_cell_indices:
+            yield [self.cells[index] for index in row]
+
+    def iter_visible_rows(self) -> Generator[list[CellContent], None, None]:
+        """
+        Yields the visible cells of each row, see `AhbSubTable.iter_visible_cells`.
+        """
+        for row in self.visible_cell_indices:
+            yield [self.cells[index] for index in row]
+
+    @classmethod
+    def from_docx_table(cls, table: Table) -> "TableContent":
+        """
+        Create a TableContent from a python-docx table.
+        """
+        cells: list[CellContent] = []
+        index_by_tc: dict[object, int] = {}
+
+        def get_index(cell: _Cell) -> int:
+            table_cell = cell._tc  # pylint:disable=protected-access
+            if table_cell not in index_by_tc:
+                index_by_tc[table_cell] = len(cells)
+                cells.append(CellContent.from_docx_cell(cell))
+            return index_by_tc[table_cell]
+
+        rows = table.rows
+        visible_cell_indices = [
+            [get_index(_Cell(tc, table)) for tc in row._tr.tc_lst]  # pylint:disable=protected-access
+            for row in rows
+        ]
+        row_cell_indices = [[get_index(cell) for cell in row.cells] for row in rows]
+        try:
+            grid_cell_indices = [get_index(cell) for cell in table._cells]  # pylint:disable=protected-access
+        except IndexError:
+            # python-docx fails to build the layout grid of some broken tables; accessing `cell` raises then, too
+            grid_cell_indices = []
+        return cls(
+            cells=cells,
+            column_count=table._column_count,  # pylint:disable=protected-access
+            grid_cell_indices=grid_cell_indices,
+            row_cell_indices=row_cell_indices,
+            visible_cell_indices=visible_cell_indices,
+        )
+
+
+def as_table_content(table: Table | TableContent) -> TableContent:
+    """
+    Returns the given table as TableContent; python-docx tables are converted.
+    """
+    if isinstance(table, TableContent):
+        return table
+    return TableContent.from_docx_table(table)
+
+
+class DocumentBody(BaseModel):
+    """
+    The paragraphs and tables of a docx file in document order.
+    """
+
+    items: list[Annotated[ParagraphContent | TableContent, Field(discriminator="kind")]] = Field(default_factory=list)
+
+    @property
+    def tables(self) -> list[TableContent]:
+        """
+        All tables on the top level of the document body.
+        """
+        return [item for item in self.items if isinstance(item, TableContent)]
+
+    @classmethod
+    def from_docx_document(cls, document: Document) -> "DocumentBody":
+        """
+        Create a DocumentBody from a python-docx document.
+        """
+        items: list[ParagraphContent | TableContent] = []
+        for item in document.iter_inner_content():
+            if isinstance(item, Paragraph):
+                items.append(ParagraphContent.from_docx_paragraph(item, with_style_name=True))
+            else:
+                items.append(TableContent.from_docx_table(item))
+        return cls(items=items)
+
+
+def as_document_body(document: Document | DocumentBody) -> DocumentBody:
+    """
+    Returns the given document as DocumentBody; python-docx documents are converted.
+    """
+    if isinstance(document, DocumentBody):
+        return document
+    return DocumentBody.from_docx_document(document)
@@ -0,0 +1,176 @@
+"""
+This module provides an on-disk cache for the bodies of docx files.
+Reading a docx file with python-docx is slow, and every command reads the same files of the edi_energy_mirror again.
+Therefore, the extracted DocumentBody of each docx file is stored, keyed by the name and the SHA-256 hash of the file.
+A cache entry is used only if it was written by the same kohlrahbi version; otherwise it is rebuilt.
+The entries are stored in a directory per kohlrahbi version. Whenever an entry is written, the entries of other
+kohlrahbi versions and the entries of previous contents of the same docx file are removed, so that the cache does not
+grow with every change of the edi_energy_mirror.
+The cache directory can be changed with the environment variable `KOHLRAHBI_DOCUMENT_BODY_CACHE_DIRECTORY` (e.g. if the
+package directory is read-only); if the variable is set to an empty string, the cache is disabled.
+"""
+
+import glob
+import gzip
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+import docx
+from pydantic import BaseModel, ValidationError
+
+from kohlrahbi.docxbody import DocumentBody
+from kohlrahbi.docxxmlreader import read_document_body_from_xml, read_document_body_streaming
+from kohlrahbi.enums.docxreader import DocxReader
+from kohlrahbi.logger import logger
+from kohlrahbi.version import version
+
+DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY = Path(__file__).parent / "cache" / "document_bodies"
+#: the environment variable which overrides the default cache directory (an empty value disables the cache)
+DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = "KOHLRAHBI_DOCUMENT_BODY_CACHE_DIRECTORY"
+
+
+class CachedDocumentBody(BaseModel):
+    """
+    A cache entry: the body of a docx file together with the information needed to validate it.
+    """
+
+    kohlrahbi_version: str
+    sha256: str
+    body: DocumentBody
+
+
+def get_sha256_of_file(path: Path) -> str:
+    """
+    Returns the hex digest of the SHA-256 hash of the content of the given file.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_document_body_cache_directory() -> Path | None:
+    """
+    Returns the configured cache directory, i.e. the value of the environment variable
+    `KOHLRAHBI_DOCUMENT_BODY_CACHE_DIRECTORY` or, if it is not set, the default cache directory inside the package.
+    Returns None if the cache is disabled.
+    The environment variable is read on every call, so that it is inherited by the worker processes of a run.
+    """
+    configured_cache_directory = os.environ.get(DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+    if configured_cache_directory is None:
+        return DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY
+    if not configured_cache_directory:
+        return None
+    return Path(configured_cache_directory)
+
+
+def get_cache_file_path(cache_directory: Path, path_to_docx_file: Path, sha256: str) -> Path:
+    """
+    Returns the path of the cache entry for the given content of the given docx file.
+    """
+    return cache_directory / version / f"{path_to_docx_file.name}.{sha256}.json.gz"
+
+
+def _prune_cache_directory(cache_directory: Path, cache_file_path: Path, path_to_docx_file: Path) -> None:
+    """
+    Removes the entries of other kohlrahbi versions and the entries of other contents of the given docx file, i.e.
+    all entries which would never be used again once the entry at the given path has been written.
+    """
+    for other_path in cache_directory.iterdir():
+        if other_path == cache_file_path.parent:
+            continue
+        # the directories of other kohlrahbi versions (or the entries of older kohlrahbi versions without one)
+        logger.info("Removing the outdated cache entries '%s'.", other_path.name)
+        if other_path.is_dir():
+            shutil.rmtree(other_path, ignore_errors=True)
+        else:
+            other_path.unlink(missing_ok=True)
+    for outdated_cache_file_path in cache_file_path.parent.glob(f"{glob.escape(path_to_docx_file.name)}.*.json.gz"):
+        if outdated_cache_file_path != cache_file_path:
+            logger.info("Removing the outdated cache entry '%s'.", outdated_cache_file_path.name)
+            outdated_cache_file_path.unlink(missing_ok=True)
+
+
+def read_document_body(path_to_docx_file: Path, docx_reader: DocxReader = DocxReader.STREAMING) -> DocumentBody:
+    """
+    Reads the body of the given docx file, bypassing the cache.
+    All readers return the same DocumentBody; the python-docx reader is kept as reference implementation.
+    """
+    if docx_reader == DocxReader.STREAMING:
+        return read_document_body_streaming(path_to_docx_file)
+    document = docx.Document(str(path_to_docx_file))
+    if docx_reader == DocxReader.PYTHON_DOCX:
+        return DocumentBody.from_docx_document(document)
+    return read_document_body_from_xml(document)
+
+
+def _resolve_cache_directory(cache_directory: Path | None) -> Path | None:
+    """
+    Replaces the default cache directory by the configured one (see `get_document_body_cache_directory`).
+    """
+    if cache_directory == DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY:
+        return get_document_body_cache_directory()
+    return cache_directory
+
+
+def load_document_body(
+    path_to_docx_file: Path,
+    cache_directory: Path | None = DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY,
+    docx_reader: DocxReader = DocxReader.STREAMING,
+) -> DocumentBody:
+    """
+    Returns the body of the given docx file.
+    If there is a valid cache entry for the file content in the cache directory, python-docx is not invoked at all.
+    Otherwise, the docx file is read with the given reader and the cache entry is (re)written.
+    The default cache directory can be overridden by the environment variable `KOHLRAHBI_DOCUMENT_BODY_CACHE_DIRECTORY`.
+    Pass `cache_directory=None` to disable the cache.
+    """
+    cache_directory = _resolve_cache_directory(cache_directory)
+    if cache_directory is None:
+        return read_document_body(path_to_docx_file, docx_reader)
+    return load_cached_document_body(path_to_docx_file, cache_directory, docx_reader).body
+
+
+def load_cached_document_body(
+    path_to_docx_file: Path,
+    cache_directory: Path | None = DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY,
+    docx_reader: DocxReader = DocxReader.STREAMING,
+) -> CachedDocumentBody:
+    """
+    Like `load_document_body`, but returns the body together with the SHA-256 hash of the docx file, so that callers
+    which need the hash (e.g. to detect changes of the file) do not have to read the file again.
+    With `cache_directory=None`, the file is hashed and read, but no cache entry is used or written.
+    """
+    sha256 = get_sha256_of_file(path_to_docx_file)
+    cache_directory = _resolve_cache_directory(cache_directory)
+    if cache_directory is None:
+        document_body = read_document_body(path_to_docx_file, docx_reader)
+        return CachedDocumentBody(kohlrahbi_version=version, sha256=sha256, body=document_body)
+
+    cache_file_path = get_cache_file_path(cache_directory, path_to_docx_file, sha256)
+    if cache_file_path.exists():
+        try:
+            cached_document_body = CachedDocumentBody.model_validate_json(gzip.decompress(cache_file_path.read_bytes()))
+        except (OSError, ValidationError):
+            logger.warning("The cache entry '%s' is broken and will be rebuilt.", cache_file_path)
+        else:
+            if cached_document_body.kohlrahbi_version == version and cached_document_body.sha256 == sha256:
+                logger.info("Using the cached body of '%s'", path_to_docx_file.name)
+                return cached_document_body
+            logger.info("The cached body of '%s' is outdated and will be rebuilt.", path_to_docx_file.name)
+
+    document_body = read_document_body(path_to_docx_file, docx_reader)
+    cached_document_body = CachedDocumentBody(kohlrahbi_version=version, sha256=sha256, body=document_body)
+    # write to a temporary file first, so that parallel workers never read a partially written cache entry
+    temporary_file_path = cache_file_path.with_name(f"{cache_file_path.name}.{os.getpid()}.tmp")
+    try:
+        cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file_path.write_bytes(gzip.compress(cached_document_body.model_dump_json().encode("utf-8")))
+        os.replace(temporary_file_path, cache_file_path)
+        _prune_cache_directory(cache_directory, cache_file_path, path_to_docx_file)
+    except OSError:
+        logger.warning("Could not write the cache entry '%s'.", cache_file_path, exc_info=True)
+    return cached_document_body
@@ -3,12 +3,17 @@ This module contains the class BedingungCell
 """
 
 import re
-from typing import cast
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from docx.table import _Cell
 from pydantic import BaseModel, ConfigDict
 
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer
+from kohlrahbi.docxbody import CellContent
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class BedingungCell(BaseModel):
     """
@@ -16,21 +21,27 @@ class BedingungCell(BaseModel):
     to extract the Bedingungen of an AHB Bedingung cell.
     """
 
-    table_cell: _Cell
+    table_cell: _Cell | CellContent
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def parse(self, ahb_row_dataframe: pd.DataFrame) -> pd.DataFrame:
+    def parse(self, ahb_row_dataframe: "pd.DataFrame") -> "pd.DataFrame":
         """
         Parses a cell in the Bedingung column and puts the information into the appropriate column of the dataframe.
         """
+        ahb_rows = AhbRowBuffer.from_dataframe(ahb_row_dataframe)
+        self.parse_into(ahb_rows)
+        return ahb_rows.to_dataframe()
+
+    def parse_into(self, ahb_rows: AhbRowBuffer) -> None:
+        """
+        Same as `parse` but writes into the last row of the given row buffer.
+        """
         bedingung = self.table_cell.text
         bedingung = self.beautify_bedingungen(bedingung)
 
-        row_index = ahb_row_dataframe.index.max()
-        existing_bedingung = cast(str, ahb_row_dataframe.at[row_index, "Bedingung"])
-        ahb_row_dataframe.at[row_index, "Bedingung"] = existing_bedingung + bedingung
-        return ahb_row_dataframe
+        row_index = ahb_rows.last_row_index
+        ahb_rows.set(row_index, "Bedingung", ahb_rows.get(row_index, "Bedingung") + bedingung)
 
     # pylint: disable=line-too-long
     @staticmethod
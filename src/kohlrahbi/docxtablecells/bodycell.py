@@ -2,16 +2,20 @@
 This module contains the class BodyCell
 """
 
-from typing import cast
+from typing import TYPE_CHECKING, cast
 
-import pandas as pd
 from docx.table import _Cell
 from docx.text.paragraph import Paragraph
 from pydantic import BaseModel, ConfigDict
 
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer
+from kohlrahbi.docxbody import CellContent, ParagraphContent, as_cell_content
 from kohlrahbi.models.flat_ahb_reader import FlatAhbCsvReader
 from kohlrahbi.table_header import get_tabstop_positions
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 INDEX_OF_CODES_AND_QUALIFIER_COLUMN = 4
 KNOW_SUFFIXES = {
     "g",
@@ -33,14 +37,13 @@ class BodyCell(BaseModel):
     as well as the conditions for each Prüfidentifikator.
     """
 
-    table_cell: _Cell
+    table_cell: _Cell | CellContent
     left_indent_position: int
     indicator_tabstop_positions: list[int]
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    # This function has a lot of branches; that's inherent to the parsing logic, not easily avoidable.
-    def parse(self, ahb_row_dataframe: pd.DataFrame) -> pd.DataFrame:
+    def parse(self, ahb_row_dataframe: "pd.DataFrame") -> "pd.DataFrame":
         """Parses a paragraph in the middle column and puts the information into the appropriate columns
 
         Args:
@@ -49,14 +52,24 @@ class BodyCell(BaseModel):
             left_indent_position (int): Position of the left indent from the indicator middle cell
             tabstop_positions (list[int]): All tabstop positions of the indicator middle cell
         """
+        ahb_rows = AhbRowBuffer.from_dataframe(ahb_row_dataframe)
+        self.parse_into(ahb_rows)
+        return ahb_rows.to_dataframe()
+
+    # This function has a lot of branches; that's inherent to the parsing logic, not easily avoidable.
+    def parse_into(self, ahb_rows: AhbRowBuffer) -> None:
+        """
+        Same as `parse` but writes into the given row buffer, starting with its last row.
+        """
 
         def add_text_to_column(row_index: int, column_index: int, text: str) -> None:
             starts_with_known_suffix = any(text.startswith(suffix + " ") for suffix in KNOW_SUFFIXES)
             if len(text) > 0:
-                existing_text = cast(str, ahb_row_dataframe.iat[row_index, column_index])
+                row = ahb_rows.rows[row_index]
+                existing_text = row[column_index]
                 if len(existing_text) > 0 and not starts_with_known_suffix and len(text) > 1:
                     text = " " + text
-                ahb_row_dataframe.iat[row_index, column_index] = existing_text + text
+                row[column_index] = existing_text + text
 
         def handle_code_or_qualifier_entry(
             splitted_text_at_tabs: list[str], row_index: int, is_first_iteration: bool
@@ -66,19 +79,19 @@ class BodyCell(BaseModel):
                 and len(splitted_text_at_tabs) >= 2
             ):
                 if not is_first_iteration:
-                    ahb_row_dataframe.loc[ahb_row_dataframe.index.max() + 1, :] = ""
+                    ahb_rows.append_empty_row()
                     row_index += 1
             add_text_to_column(row_index, INDEX_OF_CODES_AND_QUALIFIER_COLUMN, splitted_text_at_tabs.pop(0))
             return row_index
 
         def handle_tab_stops(
-            paragraph: Paragraph, splitted_text_at_tabs: list[str], row_index: int, column_indezes: list[int]
+            paragraph: ParagraphContent, splitted_text_at_tabs: list[str], row_index: int, column_indezes: list[int]
         ) -> None:
             tab_stops_in_current_paragraph = get_tabstop_positions(paragraph=paragraph)
             if len(tab_stops_in_current_paragraph) == len(splitted_text_at_tabs) - 1:
                 # we have remaining parts from a qualifier or code
                 tab_stops_in_current_paragraph = [
-                    paragraph.paragraph_format.left_indent,
+                    cast(int, paragraph.left_indent),
                     *tab_stops_in_current_paragraph,
                 ]
             for tabstop in tab_stops_in_current_paragraph:
@@ -90,22 +103,22 @@ class BodyCell(BaseModel):
 
         def handle_no_tab_stops(splitted_text_at_tabs: list[str], row_index: int) -> None:
             if splitted_text_at_tabs:
-                column_index = ahb_row_dataframe.columns.get_loc("Beschreibung")
-                assert isinstance(column_index, int)
+                column_index = ahb_rows.column_index("Beschreibung")
                 add_text_to_column(row_index, column_index, splitted_text_at_tabs.pop(0))
 
-        cell_is_empty = self.table_cell.paragraphs[0].text == ""
+        table_cell = as_cell_content(self.table_cell)
+        cell_is_empty = table_cell.paragraphs[0].text == ""
         if cell_is_empty:
-            return ahb_row_dataframe
+            return
 
         is_first_iteration = True
 
-        for paragraph in self.table_cell.paragraphs:
-            row_index = ahb_row_dataframe.index.max()
-            paragraph.text = paragraph.text.replace("\xa0", "")
+        for paragraph_index, paragraph in enumerate(table_cell.paragraphs):
+            row_index = ahb_rows.last_row_index
+            table_cell.set_paragraph_text(paragraph_index, paragraph.text.replace("\xa0", ""))
             splitted_text_at_tabs = paragraph.text.split("\t")
 
-            if paragraph.paragraph_format.left_indent == self.left_indent_position:
+            if paragraph.left_indent == self.left_indent_position:
                 row_index = handle_code_or_qualifier_entry(splitted_text_at_tabs, row_index, is_first_iteration)
                 column_indezes = list(
                     range(
@@ -130,11 +143,8 @@ class BodyCell(BaseModel):
 
             is_first_iteration = False
 
-        return ahb_row_dataframe
-
-    def has_paragraph_tabstops(self, paragraph: Paragraph) -> bool:
+    def has_paragraph_tabstops(self, paragraph: Paragraph | ParagraphContent) -> bool:
         """
         Checks if the given paragraph contains tabstops
         """
-        tab_stops = list(paragraph.paragraph_format.tab_stops)
-        return any(tab_stops)
+        return len(get_tabstop_positions(paragraph=paragraph)) > 0
@@ -3,11 +3,17 @@ This module contains the class EdifactStrukturCell
 """
 
 import re
+from typing import TYPE_CHECKING
 
-import pandas as pd
 from docx.table import _Cell
 from pydantic import BaseModel, ConfigDict
 
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer
+from kohlrahbi.docxbody import CellContent
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 _segment_group_pattern = re.compile(r"^SG\d+$")
 _segment_pattern = re.compile(r"^[A-Z]{3}$")
 _data_element_pattern = re.compile(r"^\d{4}$")
@@ -21,12 +27,12 @@ class EdifactStrukturCell(BaseModel):
     to extract the segment name, segment group, segment and data element.
     """
 
-    table_cell: _Cell
+    table_cell: _Cell | CellContent
     edifact_struktur_cell_left_indent_position: int
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def parse(self, ahb_row_dataframe: pd.DataFrame) -> pd.DataFrame:
+    def parse(self, ahb_row_dataframe: "pd.DataFrame") -> "pd.DataFrame":
         """Parses a paragraph in the edifact struktur column and puts the information into the appropriate columns
 
         Args:
@@ -36,21 +42,27 @@ class EdifactStrukturCell(BaseModel):
             edifact_struktur_cell_left_indent_position (int): Position of the left indent from the indicator edifact
                 struktur cell
         """
+        ahb_rows = AhbRowBuffer.from_dataframe(ahb_row_dataframe)
+        self.parse_into(ahb_rows)
+        return ahb_rows.to_dataframe()
 
+    def parse_into(self, ahb_rows: AhbRowBuffer) -> None:
+        """
+        Same as `parse` but writes into the last row of the given row buffer.
+        """
         joined_text = " ".join(p.text for p in self.table_cell.paragraphs)
         splitted_text_at_tabs = joined_text.split("\t")
 
-        row_index = ahb_row_dataframe.index.max()
+        row_index = ahb_rows.last_row_index
 
         for text in splitted_text_at_tabs:
             if _segment_group_pattern.match(text):
-                ahb_row_dataframe.at[row_index, "Segment Gruppe"] = text
+                ahb_rows.set(row_index, "Segment Gruppe", text)
             elif _segment_pattern.match(text):
-                ahb_row_dataframe.at[row_index, "Segment"] = text
+                ahb_rows.set(row_index, "Segment", text)
             elif _data_element_pattern.match(text):
-                ahb_row_dataframe.at[row_index, "Datenelement"] = text
+                ahb_rows.set(row_index, "Datenelement", text)
             elif _segment_id_pattern.match(text):
-                ahb_row_dataframe.at[row_index, "Segment ID"] = text
+                ahb_rows.set(row_index, "Segment ID", text)
             elif text != "":
-                ahb_row_dataframe.at[row_index, "Segment Gruppe"] = text
-        return ahb_row_dataframe
+                ahb_rows.set(row_index, "Segment Gruppe", text)
@@ -0,0 +1,360 @@
+"""
+This module reads the body of a docx file directly from the XML elements of the document.
+It creates the same DocumentBody as `DocumentBody.from_docx_document`, but it walks the `w:tbl/w:tr/w:tc/w:p` elements
+with plain lxml calls instead of creating python-docx proxy objects (Paragraph, Table, _Cell, ParagraphFormat,
+TabStops, ...) for each of them, which is several times faster.
+python-docx is still used to open the docx package and to resolve the (few distinct) paragraph styles.
+`iter_document_body_items` does not even load the whole document: it streams the body of `word/document.xml` with
+`lxml.etree.iterparse` and discards each paragraph and table as soon as it has been read, so that the XML tree of a
+large AHB never has to be held in memory.
+
+Like python-docx, only the direct formatting of the paragraphs is read, i.e. left indents and tab stops which are
+inherited from a style are not resolved. This is what the scrapers have always relied on.
+"""
+
+import posixpath
+import zipfile
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from docx.document import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.constants import NAMESPACE, RELATIONSHIP_TYPE
+from docx.oxml.exceptions import InvalidXmlError
+from docx.oxml.ns import nsdecls, qn
+from docx.oxml.parser import parse_xml
+from docx.oxml.simpletypes import ST_SignedTwipsMeasure
+from docx.shared import RGBColor
+from docx.styles.styles import Styles
+from lxml import etree  # type: ignore[import-untyped]
+
+from kohlrahbi.docxbody import CellContent, DocumentBody, ParagraphContent, TableContent
+
+# lxml elements are not typed
+XmlElement = Any
+
+_BODY = qn("w:body")
+_P = qn("w:p")
+_P_PR = qn("w:pPr")
+_P_STYLE = qn("w:pStyle")
+_IND = qn("w:ind")
+_LEFT = qn("w:left")
+_TABS = qn("w:tabs")
+_TAB = qn("w:tab")
+_POS = qn("w:pos")
+_R = qn("w:r")
+_R_PR = qn("w:rPr")
+_COLOR = qn("w:color")
+_HYPERLINK = qn("w:hyperlink")
+_T = qn("w:t")
+_BR = qn("w:br")
+_CR = qn("w:cr")
+_NO_BREAK_HYPHEN = qn("w:noBreakHyphen")
+_PTAB = qn("w:ptab")
+_TYPE = qn("w:type")
+_VAL = qn("w:val")
+_TBL = qn("w:tbl")
+_TBL_GRID = qn("w:tblGrid")
+_GRID_COL = qn("w:gridCol")
+_TR = qn("w:tr")
+_TR_PR = qn("w:trPr")
+_GRID_BEFORE = qn("w:gridBefore")
+_TC = qn("w:tc")
+_TC_PR = qn("w:tcPr")
+_GRID_SPAN = qn("w:gridSpan")
+_V_MERGE = qn("w:vMerge")
+_RELATIONSHIP = f"{{{NAMESPACE.OPC_RELATIONSHIPS}}}Relationship"
+
+
+def _get_run_text(run: XmlElement) -> str:
+    """
+    Returns the text of a `w:r` element, the same as `Run.text` of python-docx.
+    """
+    texts: list[str] = []
+    for child in run:
+        tag = child.tag
+        if tag == _T:
+            texts.append(child.text or "")
+        elif tag in (_TAB, _PTAB):
+            texts.append("\t")
+        elif tag == _BR:
+            # only line breaks are text, page and column breaks are not
+            texts.append("\n" if child.get(_TYPE, "textWrapping") == "textWrapping" else "")
+        elif tag == _CR:
+            texts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            texts.append("-")
+    return "".join(texts)
+
+
+def _get_paragraph_text(paragraph: XmlElement) -> str:
+    """
+    Returns the text of a `w:p` element including the text of its hyperlinks, the same as `Paragraph.text`.
+    """
+    texts: list[str] = []
+    for child in paragraph:
+        if child.tag == _R:
+            texts.append(_get_run_text(child))
+        elif child.tag == _HYPERLINK:
+            texts.extend(_get_run_text(run) for run in child.iterchildren(_R))
+    return "".join(texts)
+
+
+def _get_int_value(element: XmlElement | None, child_tag: str, default: int) -> int:
+    """
+    Returns the integer `w:val` of the given child element, e.g. `w:gridSpan`, or the default if there is no child.
+    """
+    if element is None:
+        return default
+    child = element.find(child_tag)
+    if child is None:
+        return default
+    return int(child.get(_VAL))
+
+
+def _get_first_run_color(paragraph: XmlElement) -> str | None:
+    """
+    Returns the explicit colour of the first run as hex string, the same as `runs[0].font.color.rgb`.
+    """
+    run = paragraph.find(_R)
+    if run is None:
+        return None
+    run_properties = run.find(_R_PR)
+    if run_properties is None:
+        return None
+    color = run_properties.find(_COLOR)
+    if color is None:
+        return None
+    value = color.get(_VAL)
+    if value is None:
+        raise InvalidXmlError("required 'w:val' attribute not present")
+    if value == "auto":
+        return None
+    return str(RGBColor.from_string(value))
+
+
+def read_paragraph(paragraph: XmlElement, style_name: str | None = None) -> ParagraphContent:
+    """
+    Creates a ParagraphContent from a `w:p` element.
+    """
+    left_indent: int | None = None
+    tab_stops: list[int] = []
+    paragraph_properties = paragraph.find(_P_PR)
+    if paragraph_properties is not None:
+        indentation = paragraph_properties.find(_IND)
+        if indentation is not None and indentation.get(_LEFT) is not None:
+            left_indent = ST_SignedTwipsMeasure.convert_from_xml(indentation.get(_LEFT))
+        tabs = paragraph_properties.find(_TABS)
+        if tabs is not None:
+            tab_stops = [ST_SignedTwipsMeasure.convert_from_xml(tab.get(_POS)) for tab in tabs.iterchildren(_TAB)]
+    return ParagraphContent(
+        text=_get_paragraph_text(paragraph),
+        style_name=style_name,
+        left_indent=left_indent,
+        tab_stops=tab_stops,
+        first_run_color=_get_first_run_color(paragraph),
+    )
+
+
+def read_cell(table_cell: XmlElement) -> CellContent:
+    """
+    Creates a CellContent from a `w:tc` element.
+    """
+    return CellContent(paragraphs=[read_paragraph(paragraph) for paragraph in table_cell.iterchildren(_P)])
+
+
+def _get_grid_span(table_cell: XmlElement) -> int:
+    return _get_int_value(table_cell.find(_TC_PR), _GRID_SPAN, default=1)
+
+
+def _is_vertical_merge_continuation(table_cell: XmlElement) -> bool:
+    """
+    Returns true if the cell continues a vertically merged cell of the row above.
+    A `w:vMerge` element without value means "continue".
+    """
+    cell_properties = table_cell.find(_TC_PR)
+    if cell_properties is None:
+        return False
+    vertical_merge = cell_properties.find(_V_MERGE)
+    return vertical_merge is not None and vertical_merge.get(_VAL, "continue") == "continue"
+
+
+def read_table(table: XmlElement) -> TableContent:
+    """
+    Creates a TableContent from a `w:tbl` element.
+    The views on the table (layout grid, row cells, visible cells) are built the same way as by python-docx, including
+    the handling of horizontally (`w:gridSpan`) and vertically (`w:vMerge`) merged cells.
+    """
+    table_grid = table.find(_TBL_GRID)
+    if table_grid is None:
+        raise InvalidXmlError("required `w:tblGrid` child element not present")
+    column_count = len(table_grid.findall(_GRID_COL))
+    rows: list[list[XmlElement]] = [list(row.iterchildren(_TC)) for row in table.iterchildren(_TR)]
+    grid_before_of_rows = [_get_int_value(row.find(_TR_PR), _GRID_BEFORE, default=0) for row in table.iterchildren(_TR)]
+
+    cells: list[CellContent] = []
+    index_by_tc: dict[XmlElement, int] = {}
+    grid_offsets: dict[XmlElement, int] = {}
+    row_index_by_tc: dict[XmlElement, int] = {}
+    for row_index, row in enumerate(rows):
+        grid_offset = grid_before_of_rows[row_index]
+        for table_cell in row:
+            index_by_tc[table_cell] = len(cells)
+            cells.append(read_cell(table_cell))
+            grid_offsets[table_cell] = grid_offset
+            row_index_by_tc[table_cell] = row_index
+            grid_offset += _get_grid_span(table_cell)
+
+    def get_tc_above(table_cell: XmlElement) -> XmlElement:
+        """the same as `CT_Tc._tc_above` of python-docx"""
+        row_index = row_index_by_tc[table_cell]
+        if row_index == 0:
+            raise ValueError("no tr above topmost tr in w:tbl")
+        grid_offset = grid_offsets[table_cell]
+        remaining_offset = grid_offset - grid_before_of_rows[row_index - 1]
+        for tc_above in rows[row_index - 1]:
+            if remaining_offset < 0:
+                break
+            if remaining_offset == 0:
+                return tc_above
+            remaining_offset -= _get_grid_span(tc_above)
+        raise ValueError(f"no `tc` element at grid_offset={grid_offset}")
+
+    def get_row_cell_indices(table_cell: XmlElement) -> list[int]:
+        if _is_vertical_merge_continuation(table_cell):
+            return get_row_cell_indices(get_tc_above(table_cell))
+        return [index_by_tc[table_cell]] * _get_grid_span(table_cell)
+
+    row_cell_indices = [[index for tc in row for index in get_row_cell_indices(tc)] for row in rows]
+
+    grid_cell_indices: list[int] = []
+    try:
+        for row in rows:
+            for table_cell in row:
+                for grid_span_index in range(_get_grid_span(table_cell)):
+                    if _is_vertical_merge_continuation(table_cell):
+                        grid_cell_indices.append(grid_cell_indices[-column_count])
+                    elif grid_span_index > 0:
+                        grid_cell_indices.append(grid_cell_indices[-1])
+                    else:
+                        grid_cell_indices.append(index_by_tc[table_cell])
+    except IndexError:
+        # python-docx fails to build the layout grid of some broken tables, see `TableContent.from_docx_table`
+        grid_cell_indices = []
+
+    return TableContent(
+        cells=cells,
+        column_count=column_count,
+        grid_cell_indices=grid_cell_indices,
+        row_cell_indices=row_cell_indices,
+        visible_cell_indices=[[index_by_tc[table_cell] for table_cell in row] for row in rows],
+    )
+
+
+def _create_style_name_getter(styles: Styles) -> Callable[[str | None], str | None]:
+    """
+    Returns a function which returns the name of a paragraph style by its id, the same as `paragraph.style.name`.
+    Resolving a style with python-docx is expensive, but there are only a few distinct styles in a document.
+    """
+    style_names: dict[str | None, str | None] = {}
+
+    def get_style_name(style_id: str | None) -> str | None:
+        if style_id not in style_names:
+            style = styles.get_by_id(style_id, WD_STYLE_TYPE.PARAGRAPH)
+            style_names[style_id] = style.name if style else "None"
+        return style_names[style_id]
+
+    return get_style_name
+
+
+def _get_style_id(paragraph: XmlElement) -> str | None:
+    paragraph_properties = paragraph.find(_P_PR)
+    if paragraph_properties is None:
+        return None
+    paragraph_style = paragraph_properties.find(_P_STYLE)
+    if paragraph_style is None:
+        return None
+    style_id: str = paragraph_style.get(_VAL)
+    return style_id
+
+
+def read_document_body_from_xml(document: Document) -> DocumentBody:
+    """
+    Create a DocumentBody from the XML elements of a python-docx document.
+    """
+    get_style_name = _create_style_name_getter(document.styles)
+    items: list[ParagraphContent | TableContent] = []
+    for element in document.element.body.iterchildren(_P, _TBL):
+        if element.tag == _P:
+            items.append(read_paragraph(element, style_name=get_style_name(_get_style_id(element))))
+        else:
+            items.append(read_table(element))
+    return DocumentBody(items=items)
+
+
+def _get_related_part_name(docx_zip: zipfile.ZipFile, source_part_name: str, relationship_type: str) -> str | None:
+    """
+    Returns the name of the zip member which is related to the given part (or to the package, if the source part name
+    is empty) by a relationship of the given type, e.g. `word/document.xml` for the office document of the package.
+    """
+    source_directory, source_file_name = posixpath.split(source_part_name)
+    relationships_part_name = posixpath.join(source_directory, "_rels", f"{source_file_name}.rels")
+    if relationships_part_name not in docx_zip.namelist():
+        return None
+    for relationship in etree.fromstring(docx_zip.read(relationships_part_name)).iterchildren(_RELATIONSHIP):
+        if relationship.get("Type") != relationship_type or relationship.get("TargetMode") == "External":
+            continue
+        target: str = relationship.get("Target")
+        if target.startswith("/"):
+            return target[1:]
+        return posixpath.normpath(posixpath.join(source_directory, target))
+    return None
+
+
+def _read_styles(docx_zip: zipfile.ZipFile, document_part_name: str) -> Styles:
+    """
+    Reads the styles part of the document. A document without styles part is treated as if it had no styles.
+    """
+    styles_part_name = _get_related_part_name(docx_zip, document_part_name, RELATIONSHIP_TYPE.STYLES)
+    if styles_part_name is None:
+        return Styles(parse_xml(f"<w:styles {nsdecls('w')}/>"))
+    return Styles(parse_xml(docx_zip.read(styles_part_name)))
+
+
+def iter_document_body_items(path_to_docx_file: Path) -> Iterator[ParagraphContent | TableContent]:
+    """
+    Yields the paragraphs and tables of the body of the given docx file one at a time, in document order.
+    The main document part is parsed incrementally; every body-level paragraph and table is removed from the partial
+    XML tree as soon as it has been read. Hence, the memory needed does not depend on the size of the document but
+    only on the size of its largest table.
+    The items are the same as the items of `read_document_body_from_xml`.
+    """
+    with zipfile.ZipFile(path_to_docx_file) as docx_zip:
+        document_part_name = _get_related_part_name(docx_zip, "", RELATIONSHIP_TYPE.OFFICE_DOCUMENT)
+        if document_part_name is None:
+            raise ValueError(f"'{path_to_docx_file}' does not contain a main document part")
+        get_style_name = _create_style_name_getter(_read_styles(docx_zip, document_part_name))
+        with docx_zip.open(document_part_name) as document_xml:
+            # same parser options as python-docx, so that whitespace only text is handled the same way
+            for _, element in etree.iterparse(
+                document_xml, events=("end",), tag=(_P, _TBL), remove_blank_text=True, resolve_entities=False
+            ):
+                body = element.getparent()
+                if body is None or body.tag != _BODY:
+                    # paragraphs and tables nested in a table are read together with the outermost table
+                    continue
+                if element.tag == _P:
+                    yield read_paragraph(element, style_name=get_style_name(_get_style_id(element)))
+                else:
+                    yield read_table(element)
+                element.clear()
+                while element.getprevious() is not None:
+                    del body[0]
+
+
+def read_document_body_streaming(path_to_docx_file: Path) -> DocumentBody:
+    """
+    Create a DocumentBody from the given docx file without loading its whole XML tree, see `iter_document_body_items`.
+    """
+    return DocumentBody(items=list(iter_document_body_items(path_to_docx_file)))
@@ -13,8 +13,16 @@ class AhbExportFileFormat(StrEnum):
         FLATAHB (str): The FLATAHB file format.
         CSV (str): The CSV file format.
         XLSX (str): The XLSX file format.
+        PARQUET (str): One Parquet dataset with the lines of all pruefis (needs kohlrahbi[parquet]).
+        SQLITE (str): One SQLite file with the flat AHBs of all pruefis (needs kohlrahbi[sqlmodels]).
     """
 
     FLATAHB = "flatahb"
     CSV = "csv"
     XLSX = "xlsx"
+    PARQUET = "parquet"
+    SQLITE = "sqlite"
+
+
+#: the file types which are not written per pruefi but into one combined output of all pruefis
+COMBINED_OUTPUT_FILE_TYPES = (AhbExportFileFormat.PARQUET, AhbExportFileFormat.SQLITE)
@@ -0,0 +1,21 @@
+"""
+This module defines an enum class representing the available readers for the body of docx files.
+"""
+
+from enum import StrEnum
+
+
+class DocxReader(StrEnum):
+    """
+    Enum class representing the available readers for the body of docx files.
+
+    Attributes:
+        PYTHON_DOCX (str): Read the body via the proxy objects of python-docx (Paragraph, Table, _Cell, ...).
+        XML (str): Read the body directly from the XML elements, see `kohlrahbi.docxxmlreader`. This is much faster.
+        STREAMING (str): Like XML, but the body is parsed incrementally instead of loading the whole XML tree of the
+            document, see `kohlrahbi.docxxmlreader.iter_document_body_items`. This needs the least memory.
+    """
+
+    PYTHON_DOCX = "python-docx"
+    XML = "xml"
+    STREAMING = "streaming"
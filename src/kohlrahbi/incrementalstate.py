@@ -0,0 +1,157 @@
+"""
+This module provides the state of incremental scraping runs (see the `--incremental` option of the commands).
+For each command and format version, the state stores the hash of each source docx file together with the
+Prüfidentifikatoren which have been scraped from it (and, if the command writes files which are derived from several
+docx files, the files it has written).
+In the next incremental run, a docx file whose content has not changed and whose outputs are still present is not
+opened again. Like the pruefi location index, the state is stored in the cache directory. It also stores the output
+path it belongs to, because the outputs of different output paths are independent of each other.
+"""
+
+from pathlib import Path
+from typing import Literal
+
+import tomlkit
+from pydantic import BaseModel, Field
+
+from kohlrahbi.logger import logger
+from kohlrahbi.outputmanifest import OutputFile
+from kohlrahbi.version import version
+
+DEFAULT_INCREMENTAL_STATE_DIRECTORY = Path(__file__).parent / "cache"
+
+#: the commands which support incremental scraping
+IncrementalCommand = Literal["ahb", "conditions"]
+
+
+class SourceDocxFile(OutputFile):
+    """
+    A docx file which has been scraped, together with the information needed to detect changes of its content.
+    """
+
+    pruefis: list[str] = Field(default_factory=list, description="the Prüfidentifikatoren scraped from the file")
+
+
+class IncrementalScrapingState(BaseModel):
+    """
+    The docx files of a format version which have been scraped into an output path (by docx file name) and the files
+    which have been written from them (by their path relative to the output path).
+    """
+
+    kohlrahbi_version: str = version
+    output_path: str
+    source_docx_files: dict[str, SourceDocxFile] = Field(default_factory=dict)
+    output_files: dict[str, OutputFile] = Field(default_factory=dict)
+
+    def add_source_docx_file(self, path_to_docx_file: Path, pruefis: list[str], sha256: str | None = None) -> None:
+        """
+        Records that the given Prüfidentifikatoren have been scraped from the current content of the given docx file.
+        The Prüfidentifikatoren which have been scraped from the same content before (e.g. in a run which was restricted
+        to other Prüfidentifikatoren) are kept.
+        If given, `sha256` is the hash of the docx file content which has been calculated while scraping it.
+        """
+        source_docx_file = SourceDocxFile.from_path(path_to_docx_file, sha256)
+        previous_source_docx_file = self.source_docx_files.get(path_to_docx_file.name)
+        if previous_source_docx_file is not None and previous_source_docx_file.sha256 == source_docx_file.sha256:
+            pruefis = [*previous_source_docx_file.pruefis, *pruefis]
+        source_docx_file.pruefis = sorted(set(pruefis))
+        self.source_docx_files[path_to_docx_file.name] = source_docx_file
+
+    def remove_source_docx_file(self, path_to_docx_file: Path) -> None:
+        """
+        Forgets the given docx file, such that it is scraped again in the next run.
+        """
+        self.source_docx_files.pop(path_to_docx_file.name, None)
+
+    def retain_source_docx_files(self, docx_file_names: set[str]) -> None:
+        """
+        Forgets all docx files except for the given ones (e.g. docx files which have been removed from the input).
+        """
+        self.source_docx_files = {
+            name: source_docx_file
+            for name, source_docx_file in self.source_docx_files.items()
+            if name in docx_file_names
+        }
+
+    def get_unchanged_source_docx_file(self, path_to_docx_file: Path, pruefis: list[str]) -> SourceDocxFile | None:
+        """
+        Returns the recorded docx file if its content has not changed since it was scraped and if all given
+        Prüfidentifikatoren have been scraped from it. A Prüfidentifikator which moved from another docx file to the
+        given one has not been scraped from it yet. Returns None otherwise.
+        """
+        source_docx_file = self.source_docx_files.get(path_to_docx_file.name)
+        if source_docx_file is None or not set(pruefis).issubset(source_docx_file.pruefis):
+            return None
+        if not source_docx_file.is_valid_for(path_to_docx_file):
+            logger.info("The content of '%s' has changed since the last run.", path_to_docx_file.name)
+            return None
+        return source_docx_file
+
+    def add_output_file(self, path_to_output_file: Path) -> None:
+        """
+        Records the given (just written) file, which must be inside the output path.
+        """
+        relative_path = path_to_output_file.relative_to(self.output_path).as_posix()
+        self.output_files[relative_path] = OutputFile.from_path(path_to_output_file)
+
+    def has_valid_output_file(self, path_to_output_file: Path, required: bool = True) -> bool:
+        """
+        Checks if the given file has been recorded and has not changed since.
+        If the file is not required, a file which has not been recorded (i.e. not been written) is valid, too.
+        """
+        output_file = self.output_files.get(path_to_output_file.relative_to(self.output_path).as_posix())
+        if output_file is None:
+            return not required
+        return output_file.is_valid_for(path_to_output_file)
+
+
+def get_path_to_incremental_scraping_state(
+    command: IncrementalCommand, format_version: str, directory: Path = DEFAULT_INCREMENTAL_STATE_DIRECTORY
+) -> Path:
+    """
+    Returns the path of the incremental scraping state file of the given command and format version.
+    """
+    return directory / f"{format_version}_{command}_incremental_state.toml"
+
+
+def load_incremental_scraping_state(
+    command: IncrementalCommand,
+    format_version: str,
+    output_path: Path,
+    directory: Path = DEFAULT_INCREMENTAL_STATE_DIRECTORY,
+) -> IncrementalScrapingState:
+    """
+    Loads the incremental scraping state of the given command and format version.
+    If there is no (readable) state file or if it belongs to another output path or kohlrahbi version, an empty state
+    is returned, i.e. everything is scraped again.
+    """
+    empty_state = IncrementalScrapingState(output_path=str(output_path))
+    path_to_state_file = get_path_to_incremental_scraping_state(command, format_version, directory)
+    if not path_to_state_file.exists():
+        return empty_state
+    try:
+        with open(path_to_state_file, "rb") as file:
+            state = IncrementalScrapingState.model_validate(tomlkit.load(file).unwrap())
+    except (OSError, ValueError):
+        logger.warning("The incremental scraping state '%s' is broken and will be ignored.", path_to_state_file)
+        return empty_state
+    if state.kohlrahbi_version != version or state.output_path != str(output_path):
+        logger.info("The incremental scraping state '%s' is outdated and will be ignored.", path_to_state_file)
+        return empty_state
+    return state
+
+
+def save_incremental_scraping_state(
+    incremental_scraping_state: IncrementalScrapingState,
+    command: IncrementalCommand,
+    format_version: str,
+    directory: Path = DEFAULT_INCREMENTAL_STATE_DIRECTORY,
+) -> None:
+    """
+    Saves the incremental scraping state of the given command and format version.
+    """
+    path_to_state_file = get_path_to_incremental_scraping_state(command, format_version, directory)
+    path_to_state_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(path_to_state_file, "w", encoding="utf-8") as file:
+        tomlkit.dump(incremental_scraping_state.model_dump(), file)
+    logger.info("💾 Saved the incremental scraping state at %s.", path_to_state_file)
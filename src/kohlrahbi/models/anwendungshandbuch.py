@@ -7,13 +7,14 @@ structure.
 another segment group)
 """
 
+import hashlib
 import re
 from collections.abc import Callable, Sequence
 from typing import Annotated
 from uuid import UUID
 
-from more_itertools import last, split_when
-from pydantic import BaseModel, Field, StringConstraints, field_validator
+from pydantic import BaseModel, Field, StringConstraints, ValidationInfo, field_validator
+from pydantic_core import to_json
 
 from kohlrahbi.models.edifact_components import (
     DataElementFreeText,
@@ -107,6 +108,14 @@ class AhbLine(BaseModel):
             or (self.ahb_expression is not None and len(self.ahb_expression.strip()) > 0)
         )
 
+    def get_fingerprint(self) -> tuple[object, ...]:
+        """
+        Returns the values of all fields except for the guid.
+        Two lines are equal when ignoring their guids iff their fingerprints are equal. Comparing the fingerprints is
+        much cheaper than copying the lines just to reset their guids before comparing them.
+        """
+        return tuple(getattr(self, field_name) for field_name in _AHB_LINE_FIELD_NAMES_WITHOUT_GUID)
+
     def get_discriminator(self, include_name: bool = True) -> str:
         """
         Generate a unique yet readable discriminator for this given line.
@@ -124,6 +133,12 @@ class AhbLine(BaseModel):
         return result
 
 
+_AHB_LINE_FIELD_NAMES_WITHOUT_GUID: tuple[str, ...] = tuple(
+    field_name for field_name in AhbLine.model_fields if field_name != "guid"
+)
+_SORTED_AHB_LINE_FIELD_NAMES: tuple[str, ...] = tuple(sorted(AhbLine.model_fields))
+
+
 class AhbMetaInformation(BaseModel):
     """
     Meta information about an AHB like e.g. its title, Prüfidentifikator, possible sender and receiver roles
@@ -148,85 +163,75 @@ class AhbMetaInformation(BaseModel):
     )
 
 
-def _remove_grouped_ahb_lines_containing_section_name(
-    grouped_ahb_lines: list[list[AhbLine]], section_name: str
-) -> list[list[AhbLine]]:
-    """
-    Removes all groups of ahb lines that contain a line with the given section name and returns a new list instance.
-    """
-    return [goal for goal in grouped_ahb_lines if any(ahbl.section_name == section_name for ahbl in goal)]
+_SORTED_META_INFORMATION_FIELD_NAMES: tuple[str, ...] = tuple(sorted(AhbMetaInformation.model_fields))
 
 
-# pylint:disable=unused-argument
-def _check_that_nearly_all_lines_have_a_segment_group(  # type: ignore[no-untyped-def]
-    value: list[AhbLine],
-):
-    """
-    Loops over all provided ahb lines and checks that only at the beginning and the end there are lines without a
-    segment group. In between every line has to have a segment group specified. This is necessary for the navigation
-    to work because it primarily focuses and relies on correct SG information in the lines .
-    """
-    switches_from_no_sg_to_sg = list(
-        split_when(value, lambda x, y: x.segment_group_key is None and y.segment_group_key is not None)
-    )
-    switches_from_no_sg_to_sg = _remove_grouped_ahb_lines_containing_section_name(
-        grouped_ahb_lines=switches_from_no_sg_to_sg, section_name="Abschnitts-Kontrollsegment"
-    )
-    if len(switches_from_no_sg_to_sg) > 2:
-        raise ValueError(f"There is a None segment group in line {last(switches_from_no_sg_to_sg[1])}")
-
+#: Pass this key with a truthy value in the validation context (e.g.
+#: `FlatAnwendungshandbuch.model_validate_json(data, context={TRUSTED_LINES_CONTEXT_KEY: True})`) to skip the checks of
+#: `FlatAnwendungshandbuch.validate_lines`, e.g. for flat AHBs which kohlrahbi has written (and checked) itself.
+#: The fields of each line are validated nevertheless.
+TRUSTED_LINES_CONTEXT_KEY = "trusted_lines"
 
 _data_element_pattern = re.compile(r"^\d{4}$|^\d{5}$|^[A-Za-z]+\d{4}$")
-
-
-# pylint:disable=unused-argument
-def _check_that_line_has_either_none_or_d4_data_element(  # type: ignore[no-untyped-def]
-    value: AhbLine,
-):
-    """
-    checks that the given line has either a None data element or a data element that matches
-    \\d{4},\\ d{5} or [A-Za-z]+\\d{4}.
-    AhbLine(data_element = 0001), AhbLine(data_element = 00001) or AhbLine(data_element = R0001)
-    """
-    if value.data_element is None:
-        return
-    match = _data_element_pattern.match(value.data_element)
-    if match is None:
-        raise ValueError(f"The data_element '{value.data_element}' does not match {_data_element_pattern}")
-
-
 _segment_group_key_pattern = re.compile(r"^SG\d+$")
+_segment_code_pattern = re.compile(r"^[A-Z]+$")
+_section_name_of_groups_to_count = "Abschnitts-Kontrollsegment"
 
 
-# pylint:disable=unused-argument
-def _check_that_line_has_either_none_or_matching_sg(value: AhbLine):  # type: ignore[no-untyped-def]
+def _get_line_error(line: AhbLine) -> str | None:
     """
-    checks that the given line has a segment group key that is either None (for root) or matches SG\\d+
+    Returns the error message if the data element, segment group key or segment code of the line is invalid (see
+    `_check_lines`).
     """
-    if value.segment_group_key is None:
-        return
-    match = _segment_group_key_pattern.match(value.segment_group_key)
-    if match is None:
-        raise ValueError(
-            f"The segment_group_key '{value.segment_group_key}' does not match {_segment_group_key_pattern}"
-        )
+    if line.data_element is not None and _data_element_pattern.match(line.data_element) is None:
+        return f"The data_element '{line.data_element}' does not match {_data_element_pattern}"
+    if line.segment_group_key is not None and _segment_group_key_pattern.match(line.segment_group_key) is None:
+        return f"The segment_group_key '{line.segment_group_key}' does not match {_segment_group_key_pattern}"
+    if line.segment_code is not None and _segment_code_pattern.match(line.segment_code) is None:
+        return f"The segment_code '{line.segment_code}' does not match {_segment_code_pattern}"
+    return None
 
 
-_segment_code_pattern = re.compile(r"^[A-Z]+$")
-
-
-# pylint:disable=unused-argument
-def _check_that_line_has_either_none_az_segment_code(  # type: ignore[no-untyped-def]
-    value: AhbLine,
-):
+def _check_lines(lines: list[AhbLine]) -> None:
     """
-    checks that the given line has either a None segment code or a segment code that consists of all upper letters
+    Checks all lines of a flat AHB in a single pass:
+    1. The lines are split into groups, each of which starts where a line without segment group is followed by a line
+       with a segment group. Only groups which contain a line of the section "Abschnitts-Kontrollsegment" are counted;
+       there must not be more than two of them. This is necessary for the navigation to work because it primarily
+       focuses and relies on correct SG information in the lines.
+    2. Each line has either a None data element or one that matches \\d{4}, \\d{5} or [A-Za-z]+\\d{4}
+       (e.g. 0001, 00001 or R0001), a segment group key that is either None (for root) or matches SG\\d+ and either a
+       None segment code or one that consists of upper letters only.
+    Raises a ValueError for the first violation; a violation of 1. is raised before a violation of 2. in any line.
     """
-    if value.segment_code is None:
-        return
-    match = _segment_code_pattern.match(value.segment_code)
-    if match is None:
-        raise ValueError(f"The segment_code '{value.segment_code}' does not match {_segment_code_pattern}")
+    number_of_counted_groups = 0
+    last_line_of_second_counted_group: AhbLine | None = None
+    current_group_is_counted = False
+    first_line_error: str | None = None
+    previous_line: AhbLine | None = None
+    previous_segment_group_key: str | None = ""  # no group starts at the first line
+    for line in lines:
+        segment_group_key = line.segment_group_key
+        if previous_segment_group_key is None and segment_group_key is not None:
+            if current_group_is_counted:
+                number_of_counted_groups += 1
+                if number_of_counted_groups == 2:
+                    last_line_of_second_counted_group = previous_line
+            current_group_is_counted = False
+        if line.section_name == _section_name_of_groups_to_count:
+            current_group_is_counted = True
+        if first_line_error is None:
+            first_line_error = _get_line_error(line)
+        previous_line = line
+        previous_segment_group_key = segment_group_key
+    if current_group_is_counted:
+        number_of_counted_groups += 1
+        if number_of_counted_groups == 2:
+            last_line_of_second_counted_group = previous_line
+    if number_of_counted_groups > 2:
+        raise ValueError(f"There is a None segment group in line {last_line_of_second_counted_group}")
+    if first_line_error is not None:
+        raise ValueError(first_line_error)
 
 
 class FlatAnwendungshandbuch(BaseModel):
@@ -242,21 +247,44 @@ class FlatAnwendungshandbuch(BaseModel):
 
     @field_validator("lines")
     @classmethod
-    def validate_lines(cls, value: list[AhbLine]) -> list[AhbLine]:
+    def validate_lines(cls, value: list[AhbLine], info: ValidationInfo) -> list[AhbLine]:
         """
         The following checks are not baked into the AhbLine class itself, because they might be initialized
         with raw data that do not yet obey these strict validations. But as soon as we bundle them in a
-        FlatAnwendungshandbuch, the sanitization shall be applied.
+        FlatAnwendungshandbuch, the sanitization shall be applied (unless the lines are trusted, see
+        `TRUSTED_LINES_CONTEXT_KEY`).
         """
-        if value:
-            _check_that_nearly_all_lines_have_a_segment_group(value)
-
-        for ahb_line in value:
-            _check_that_line_has_either_none_or_d4_data_element(ahb_line)
-            _check_that_line_has_either_none_or_matching_sg(ahb_line)
-            _check_that_line_has_either_none_az_segment_code(ahb_line)
+        if info.context and info.context.get(TRUSTED_LINES_CONTEXT_KEY):
+            return value
+        _check_lines(value)
         return value
 
+    def get_content_digest(self) -> str:
+        """
+        Returns the SHA-256 hex digest of the meta information and the content of all lines, ignoring the line guids.
+        Two AHBs have the same digest iff they are equal except for their line guids (barring hash collisions), so an
+        unchanged AHB can be detected by comparing a single (stored) digest instead of all lines.
+        """
+        sha256 = hashlib.sha256(self.meta.model_dump_json().encode("utf-8"))
+        for line in self.lines:
+            sha256.update(repr(line.get_fingerprint()).encode("utf-8"))
+        return sha256.hexdigest()
+
+    def dump_sorted_json(self) -> str:
+        """
+        Returns the same JSON as
+        `json.dumps(self.model_dump(mode="json"), ensure_ascii=False, indent=2, sort_keys=True)`
+        but is considerably faster: The values are taken from the fields as they are (instead of a deep copy with JSON
+        compatible values) and are serialized by pydantic-core.
+        """
+        meta = {field_name: self.meta.__dict__[field_name] for field_name in _SORTED_META_INFORMATION_FIELD_NAMES}
+        lines = [
+            {field_name: line.__dict__[field_name] for field_name in _SORTED_AHB_LINE_FIELD_NAMES}
+            for line in self.lines
+        ]
+        # pydantic-core serializes the keys of dicts in insertion order, i.e. sorted
+        return to_json({"lines": lines, "meta": meta}, indent=2).decode("utf-8")
+
     def get_segment_groups(self) -> list[str | None]:
         """
         :return: a set with all segment groups in this AHB in the order in which they occur
@@ -270,12 +298,8 @@ class FlatAnwendungshandbuch(BaseModel):
         :param lines:
         :return: distinct segment groups, including None in the order in which they occur
         """
-        result: list[str | None] = []
-        for line in lines:
-            if line.segment_group_key not in result:
-                # an "in" check against a set would be faster but we want to preserve both order and readability
-                result.append(line.segment_group_key)
-        return result
+        # dicts preserve the insertion order, i.e. the order of the first occurrence
+        return list(dict.fromkeys(line.segment_group_key for line in lines))
 
     def sort_lines_by_segment_groups(self):  # type: ignore[no-untyped-def]
         """
@@ -286,12 +310,12 @@ class FlatAnwendungshandbuch(BaseModel):
     @staticmethod
     def _sorted_lines_by_segment_groups(ahb_lines: Sequence[AhbLine], sg_order: list[str | None]) -> list[AhbLine]:
         """
-        Calls sorted(...) on the provided list and returns a new list.
+        Regroups the provided lines by their segment group keys in the order given by sg_order and returns a new list.
         Its purpose is, that if a segment group in the AHB (read from top to bottom in the flat ahb/pdf) is interrupted
         by other segment groups, the lines belonging to the same group will be next to each other.
         This is useful to later use a groupby aggregation that only returns one group key per segment group.
 
-        The sort is stable such that the existing order inside the segment groups is maintained.
+        The regrouping is stable such that the existing order inside the segment groups is maintained.
 
         Note that this also means, that the order of the return lines no longer the same as in the flat AHB.
 
@@ -316,8 +340,16 @@ class FlatAnwendungshandbuch(BaseModel):
         """
 
         # this code is in a static method to make it easily accessible for fine-grained unit testing
-        result: list[AhbLine] = sorted(ahb_lines, key=lambda x: x.segment_group_key or "")
-        result.sort(key=lambda ahb_line: sg_order.index(ahb_line.segment_group_key))
+        # the lines are put into one bucket per segment group (in linear time) instead of being sorted
+        lines_by_segment_group: dict[str | None, list[AhbLine]] = {}
+        for ahb_line in ahb_lines:
+            lines_by_segment_group.setdefault(ahb_line.segment_group_key, []).append(ahb_line)
+        result: list[AhbLine] = []
+        # sg_order may contain a segment group more than once; only its first occurrence counts
+        for segment_group_key in dict.fromkeys(sg_order):
+            result.extend(lines_by_segment_group.pop(segment_group_key, ()))
+        if lines_by_segment_group:
+            raise ValueError(f"The segment groups {list(lines_by_segment_group)} are missing in the order {sg_order}")
         return result
 
 
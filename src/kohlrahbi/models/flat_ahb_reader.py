@@ -202,11 +202,10 @@ class FlatAhbCsvReader(FlatAhbReader):
             x = x.strip()
         if y is not None:
             y = y.strip()
-        if FlatAhbCsvReader._is_value_pool_entry(x) and not FlatAhbCsvReader._is_value_pool_entry(y):
+        if FlatAhbCsvReader._is_value_pool_entry(x):
+            # If both look like a value pool entry (this typically happens e.g. for date qualifiers or code lists), x is
+            # still the value pool entry. A y which looks like a value pool entry is never empty.
             return x, y or None
-        if FlatAhbCsvReader._is_value_pool_entry(x) and FlatAhbCsvReader._is_value_pool_entry(y):
-            # Both look like a value pool entry. This typically happens e.g. for date qualifiers or code lists
-            return x, y
         return y or None, x or None
 
     @staticmethod
@@ -50,12 +50,12 @@ class AhbLine(SQLModel, table=True):
     # yes, it's actually that bad already
 
     position_inside_ahb: int = Field(index=True)
-    ahb_id: UUID | None = Field(default=None, foreign_key="flatanwendungshandbuch.id")
+    ahb_id: UUID | None = Field(default=None, foreign_key="flatanwendungshandbuch.id", index=True)
     flatanwendungshandbuch: FlatAnwendungshandbuch | None = Relationship(back_populates="lines")
 
     # fields copy-pasted from original model:
     guid: UUID | None
-    segment_group_key: str | None
+    segment_group_key: str | None = Field(index=True)
     segment_code: str | None
     data_element: str | None
     segment_id: str | None
@@ -81,10 +81,10 @@ class AhbMetaInformation(SQLModel, table=True):
     flatanwendungshandbuch: FlatAnwendungshandbuch | None = Relationship(
         back_populates="meta", sa_relationship_kwargs={"uselist": False}
     )
-    ahb_id: UUID | None = Field(default=None, foreign_key="flatanwendungshandbuch.id")
+    ahb_id: UUID | None = Field(default=None, foreign_key="flatanwendungshandbuch.id", index=True)
 
     # copy-pasted fields from original model:
-    pruefidentifikator: str
+    pruefidentifikator: str = Field(index=True)
     maus_version: str | None
     description: str | None
     direction: str | None
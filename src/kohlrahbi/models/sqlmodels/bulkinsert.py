@@ -0,0 +1,160 @@
+"""
+bulk inserts of flat AHBs, conditions and packages into the tables of the sql models
+
+Instantiating the ORM objects one by one is slow for thousands of AHBs. Instead, the rows of each table are inserted
+with one executemany statement (SQLAlchemy Core) per table and batch. Transactions are left to the caller, such that
+e.g. all AHBs of a format version are inserted in a single transaction.
+"""
+
+try:
+    from sqlalchemy import Connection, delete, insert, select
+    from sqlmodel import col
+except ImportError as import_error:
+    import_error.msg += "; Did you install kohlrahbi[sqlmodels]?"
+    # sqlmodel is only an optional dependency when kohlrahbi is used to fill a database
+    raise
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from efoli import EdifactFormat, EdifactFormatVersion, get_format_of_pruefidentifikator
+
+from kohlrahbi.models import anwendungshandbuch
+from kohlrahbi.models.sqlmodels.anwendungshandbuch import AhbLine, AhbMetaInformation, FlatAnwendungshandbuch
+from kohlrahbi.models.sqlmodels.conditions import AhbCondition, AhbPackage
+
+
+def delete_flat_ahbs(
+    connection: Connection, pruefidentifikatoren: Sequence[str], edifact_format_version: EdifactFormatVersion
+) -> int:
+    """
+    Deletes the flat AHBs (incl. their meta information and lines) of the given Prüfidentifikatoren and format version.
+    Returns the number of deleted AHBs.
+    """
+    ahb_ids = list(
+        connection.scalars(
+            select(col(AhbMetaInformation.ahb_id)).where(
+                col(AhbMetaInformation.pruefidentifikator).in_(pruefidentifikatoren),
+                col(AhbMetaInformation.edifact_format_version) == edifact_format_version,
+            )
+        )
+    )
+    connection.execute(
+        delete(AhbMetaInformation).where(
+            col(AhbMetaInformation.pruefidentifikator).in_(pruefidentifikatoren),
+            col(AhbMetaInformation.edifact_format_version) == edifact_format_version,
+        )
+    )
+    if ahb_ids:
+        connection.execute(delete(AhbLine).where(col(AhbLine.ahb_id).in_(ahb_ids)))
+        connection.execute(delete(FlatAnwendungshandbuch).where(col(FlatAnwendungshandbuch.id).in_(ahb_ids)))
+    return len(ahb_ids)
+
+
+def insert_flat_ahbs(
+    connection: Connection,
+    flat_ahbs: Sequence[anwendungshandbuch.FlatAnwendungshandbuch],
+    edifact_format_version: EdifactFormatVersion,
+    replace_existing: bool = False,
+) -> int:
+    """
+    Inserts the given flat AHBs of the given format version with one executemany statement per table.
+    If `replace_existing` is set, the AHBs which already exist for the same Prüfidentifikator and format version are
+    replaced (otherwise, inserting them violates the constraint 'IX_pruefi_once_per_format_version').
+    Raises a ValueError if a Prüfidentifikator is not a valid one. Returns the number of inserted lines.
+    """
+    if replace_existing:
+        pruefidentifikatoren = [flat_ahb.meta.pruefidentifikator for flat_ahb in flat_ahbs]
+        delete_flat_ahbs(connection, pruefidentifikatoren, edifact_format_version)
+    ahb_rows: list[dict[str, Any]] = []
+    meta_rows: list[dict[str, Any]] = []
+    line_rows: list[dict[str, Any]] = []
+    for flat_ahb in flat_ahbs:
+        edifact_format = get_format_of_pruefidentifikator(flat_ahb.meta.pruefidentifikator)
+        if edifact_format is None:
+            raise ValueError(f"'{flat_ahb.meta.pruefidentifikator}' is not a pruefidentifikator")
+        ahb_id = uuid.uuid4()
+        ahb_rows.append({"id": ahb_id})
+        meta_rows.append(
+            {
+                **flat_ahb.meta.model_dump(),
+                "id": uuid.uuid4(),
+                "ahb_id": ahb_id,
+                "edifact_format": edifact_format,
+                "edifact_format_version": edifact_format_version,
+            }
+        )
+        line_rows.extend(
+            {**line.model_dump(), "id": uuid.uuid4(), "ahb_id": ahb_id, "position_inside_ahb": position_inside_ahb}
+            for position_inside_ahb, line in enumerate(flat_ahb.lines)
+        )
+    if ahb_rows:
+        connection.execute(insert(FlatAnwendungshandbuch), ahb_rows)
+        connection.execute(insert(AhbMetaInformation), meta_rows)
+    if line_rows:
+        connection.execute(insert(AhbLine), line_rows)
+    return len(line_rows)
+
+
+def replace_conditions(
+    connection: Connection,
+    conditions_dict: dict[EdifactFormat, dict[str, str]],
+    edifact_format_version: EdifactFormatVersion,
+) -> None:
+    """
+    Replaces the conditions of the given format version and of the EDIFACT formats in the given conditions dict
+    (see `AhbConditions`).
+    """
+    for edifact_format, conditions in conditions_dict.items():
+        connection.execute(
+            delete(AhbCondition).where(
+                col(AhbCondition.edifact_format) == edifact_format,
+                col(AhbCondition.edifact_format_version) == edifact_format_version,
+            )
+        )
+        if conditions:
+            connection.execute(
+                insert(AhbCondition),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "edifact_format": edifact_format,
+                        "edifact_format_version": edifact_format_version,
+                        "condition_key": condition_key,
+                        "condition_text": condition_text,
+                    }
+                    for condition_key, condition_text in conditions.items()
+                ],
+            )
+
+
+def replace_packages(
+    connection: Connection,
+    package_dict: dict[EdifactFormat, dict[str, str]],
+    edifact_format_version: EdifactFormatVersion,
+) -> None:
+    """
+    Replaces the packages of the given format version and of the EDIFACT formats in the given package dict
+    (see `AhbPackageTable`).
+    """
+    for edifact_format, packages in package_dict.items():
+        connection.execute(
+            delete(AhbPackage).where(
+                col(AhbPackage.edifact_format) == edifact_format,
+                col(AhbPackage.edifact_format_version) == edifact_format_version,
+            )
+        )
+        if packages:
+            connection.execute(
+                insert(AhbPackage),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "edifact_format": edifact_format,
+                        "edifact_format_version": edifact_format_version,
+                        "package_key": package_key,
+                        "package_expression": package_expression,
+                    }
+                    for package_key, package_expression in packages.items()
+                ],
+            )
@@ -0,0 +1,184 @@
+"""
+bulk loading of existing flat AHB JSON files (e.g. of the machine-readable AHB repository) into the sql model tables
+
+The files are read and validated in a process pool, and the AHBs are inserted in batches (see `bulkinsert`) with one
+transaction per batch. The next batch is validated while the current one is being inserted.
+"""
+
+try:
+    from sqlalchemy import Engine
+except ImportError as import_error:
+    import_error.msg += "; Did you install kohlrahbi[sqlmodels]?"
+    # sqlmodel is only an optional dependency when kohlrahbi is used to fill a database
+    raise
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from efoli import EdifactFormatVersion
+from pydantic import BaseModel, ValidationError
+
+from kohlrahbi.logger import logger
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.models.sqlmodels.bulkinsert import insert_flat_ahbs
+
+#: the default number of AHBs which are inserted in one transaction
+DEFAULT_BULK_LOAD_BATCH_SIZE = 100
+
+
+class FlatAhbBulkLoadResult(BaseModel):
+    """
+    The numbers of a bulk load of flat AHB JSON files
+    """
+
+    number_of_ahbs: int
+    number_of_lines: int
+    duration_in_seconds: float
+
+    @property
+    def ahbs_per_second(self) -> float:
+        """
+        the number of loaded AHBs per second
+        """
+        return self.number_of_ahbs / self.duration_in_seconds if self.duration_in_seconds > 0 else 0.0
+
+    @property
+    def lines_per_second(self) -> float:
+        """
+        the number of loaded AHB lines per second
+        """
+        return self.number_of_lines / self.duration_in_seconds if self.duration_in_seconds > 0 else 0.0
+
+
+def find_flat_ahb_json_files(directory_path: Path) -> list[Path]:
+    """
+    Returns the paths of all flat AHB JSON files (i.e. '<format>/flatahb/<pruefi>.json') below the given directory.
+    """
+    return sorted(directory_path.rglob("flatahb/*.json"))
+
+
+def get_format_version_of_path(path: Path) -> EdifactFormatVersion:
+    """
+    Returns the format version of the nearest parent directory which is named like a format version, e.g. 'FV2310' for
+    'FV2310/ORDERS/flatahb/17201.json'. Raises a ValueError if there is no such directory.
+    """
+    for parent in path.parents:
+        try:
+            return EdifactFormatVersion(parent.name)
+        except ValueError:
+            continue
+    raise ValueError(f"The format version of '{path}' cannot be derived from its path")
+
+
+def read_flat_ahb_json_file(path: Path) -> FlatAnwendungshandbuch:
+    """
+    Reads and validates the flat AHB JSON file at the given path. Raises a ValueError if it is not a valid flat AHB.
+    """
+    try:
+        return FlatAnwendungshandbuch.model_validate_json(path.read_bytes())
+    except ValidationError as validation_error:
+        raise ValueError(f"'{path}' is not a valid flat AHB: {validation_error}") from validation_error
+
+
+def _read_flat_ahb_json_files(
+    paths: Sequence[Path], executor: ProcessPoolExecutor | None, workers: int
+) -> Iterable[FlatAnwendungshandbuch]:
+    """
+    Starts to read the given files (in the process pool if there is one) and returns the AHBs in the order of the paths.
+    """
+    if executor is None:
+        return [read_flat_ahb_json_file(path) for path in paths]
+    # the files are submitted right away, but the results are only awaited when the iterable is consumed
+    return executor.map(read_flat_ahb_json_file, paths, chunksize=max(1, len(paths) // (4 * workers)))
+
+
+def _group_by_format_version(
+    format_versions: Sequence[EdifactFormatVersion],
+    flat_ahbs: Iterable[FlatAnwendungshandbuch],
+    keep_only_last_of_pruefi: bool,
+) -> dict[EdifactFormatVersion, list[FlatAnwendungshandbuch]]:
+    """
+    Groups the AHBs by their format versions. If `keep_only_last_of_pruefi` is set, only the last AHB of each
+    Prüfidentifikator (and format version) is kept.
+    """
+    flat_ahbs_by_format_version: dict[EdifactFormatVersion, list[FlatAnwendungshandbuch]] = {}
+    for format_version, flat_ahb in zip(format_versions, flat_ahbs, strict=True):
+        flat_ahbs_by_format_version.setdefault(format_version, []).append(flat_ahb)
+    if not keep_only_last_of_pruefi:
+        return flat_ahbs_by_format_version
+    return {
+        format_version: list(
+            {flat_ahb.meta.pruefidentifikator: flat_ahb for flat_ahb in flat_ahbs_of_format_version}.values()
+        )
+        for format_version, flat_ahbs_of_format_version in flat_ahbs_by_format_version.items()
+    }
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def load_flat_ahb_json_files(
+    engine: Engine,
+    json_file_paths: Sequence[Path],
+    edifact_format_version: EdifactFormatVersion | None = None,
+    batch_size: int = DEFAULT_BULK_LOAD_BATCH_SIZE,
+    workers: int = 1,
+    upsert: bool = False,
+) -> FlatAhbBulkLoadResult:
+    """
+    Loads the given flat AHB JSON files into the tables of the sql models (which have to exist already).
+    If no format version is given, it is derived from the path of each file (see `get_format_version_of_path`).
+    The AHBs are inserted in batches of `batch_size` AHBs, each in its own transaction. With more than one worker, the
+    files are validated in a process pool.
+    If `upsert` is set, the AHBs replace those of the same Prüfidentifikator and format version (already in the database
+    or earlier in the given files); otherwise, inserting them violates the constraint
+    'IX_pruefi_once_per_format_version' and the batch is rolled back.
+    """
+    if batch_size < 1:
+        raise ValueError(f"The batch size must be positive but was {batch_size}")
+    format_versions = [edifact_format_version or get_format_version_of_path(path) for path in json_file_paths]
+    batch_starts = range(0, len(json_file_paths), batch_size)
+    number_of_ahbs = 0
+    number_of_lines = 0
+    start_time = time.perf_counter()
+    executor: ProcessPoolExecutor | None = None
+    if workers > 1 and len(json_file_paths) > 1:
+        # the worker processes inherit the log level, so that e.g. `--verbose` still has an effect
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=logger.setLevel, initargs=(logger.level,))
+    try:
+        next_flat_ahbs = _read_flat_ahb_json_files(json_file_paths[:batch_size], executor, workers)
+        for batch_start in batch_starts:
+            flat_ahbs = next_flat_ahbs
+            next_batch_start = batch_start + batch_size
+            if next_batch_start < len(json_file_paths):
+                next_flat_ahbs = _read_flat_ahb_json_files(
+                    json_file_paths[next_batch_start : next_batch_start + batch_size], executor, workers
+                )
+            flat_ahbs_by_format_version = _group_by_format_version(
+                format_versions[batch_start:next_batch_start], flat_ahbs, keep_only_last_of_pruefi=upsert
+            )
+            with engine.begin() as connection:
+                for format_version, flat_ahbs_of_format_version in flat_ahbs_by_format_version.items():
+                    number_of_lines += insert_flat_ahbs(
+                        connection, flat_ahbs_of_format_version, format_version, replace_existing=upsert
+                    )
+                    number_of_ahbs += len(flat_ahbs_of_format_version)
+            logger.debug(
+                "Loaded %i of %i flat AHB files", min(next_batch_start, len(json_file_paths)), len(json_file_paths)
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    result = FlatAhbBulkLoadResult(
+        number_of_ahbs=number_of_ahbs,
+        number_of_lines=number_of_lines,
+        duration_in_seconds=time.perf_counter() - start_time,
+    )
+    logger.info(
+        "Loaded %i AHBs with %i lines in %.1fs (%.1f AHBs/s, %.1f lines/s)",
+        result.number_of_ahbs,
+        result.number_of_lines,
+        result.duration_in_seconds,
+        result.ahbs_per_second,
+        result.lines_per_second,
+    )
+    return result
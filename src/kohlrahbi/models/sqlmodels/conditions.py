@@ -0,0 +1,49 @@
+"""models for the conditions and packages of an EDIFACT format, as written to conditions.json and packages.json"""
+
+# pylint: disable=too-few-public-methods
+
+try:
+    from sqlalchemy import UniqueConstraint
+    from sqlmodel import Field, SQLModel
+except ImportError as import_error:
+    import_error.msg += "; Did you install kohlrahbi[sqlmodels]?"
+    # sqlmodel is only an optional dependency when kohlrahbi is used to fill a database
+    raise
+import uuid
+from uuid import UUID
+
+from efoli import EdifactFormat, EdifactFormatVersion
+
+
+class AhbCondition(SQLModel, table=True):
+    """
+    A condition of an EDIFACT format, e.g. condition_key '492' with the condition text of [492]
+    """
+
+    __table_args__ = (
+        UniqueConstraint(
+            "condition_key", "edifact_format", "edifact_format_version", name="IX_condition_once_per_format_version"
+        ),
+    )
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, description="optional key")
+    edifact_format: EdifactFormat = Field(index=True)
+    edifact_format_version: EdifactFormatVersion = Field(index=True)
+    condition_key: str
+    condition_text: str
+
+
+class AhbPackage(SQLModel, table=True):
+    """
+    A package of an EDIFACT format, e.g. package_key '10P' with the conditions expression of [10P]
+    """
+
+    __table_args__ = (
+        UniqueConstraint(
+            "package_key", "edifact_format", "edifact_format_version", name="IX_package_once_per_format_version"
+        ),
+    )
+    id: UUID = Field(primary_key=True, default_factory=uuid.uuid4, description="optional key")
+    edifact_format: EdifactFormat = Field(index=True)
+    edifact_format_version: EdifactFormatVersion = Field(index=True)
+    package_key: str
+    package_expression: str
@@ -0,0 +1,153 @@
+"""
+This module provides the output manifests of the AHB tables.
+Next to the exported files of each Prüfidentifikator (flatahb, csv, xlsx), a small manifest is stored which contains
+the content digest of the unfolded AHB from which the files were written and the hash of each written file.
+With the manifest, the decision whether the files of a Prüfidentifikator have to be written again is a comparison of two
+digests (instead of reading and validating the previously written flatahb JSON), and files which were modified or
+deleted since they were written are detected and written again.
+"""
+
+from pathlib import Path
+from typing import Self
+
+from efoli import get_format_of_pruefidentifikator
+from pydantic import BaseModel, Field, ValidationError
+
+from kohlrahbi.docxbodycache import get_sha256_of_file
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.logger import logger
+from kohlrahbi.version import version
+
+_FILE_EXTENSIONS: dict[AhbExportFileFormat, str] = {
+    AhbExportFileFormat.FLATAHB: "json",
+    AhbExportFileFormat.CSV: "csv",
+    AhbExportFileFormat.XLSX: "xlsx",
+}
+
+
+def get_output_directory_path_of_pruefi(output_directory_path: Path, pruefi: str) -> Path:
+    """
+    Returns the directory of the edifact format of the given Prüfidentifikator, in which all of its files are stored.
+    Raises a ValueError if the Prüfidentifikator is not a valid one.
+    """
+    edifact_format = get_format_of_pruefidentifikator(pruefi)
+    if edifact_format is None:
+        logger.warning("'%s' is not a pruefidentifikator", pruefi)
+        raise ValueError(f"'{pruefi}' is not a pruefidentifikator")
+    return output_directory_path / str(edifact_format)
+
+
+def get_output_file_path(output_directory_path: Path, pruefi: str, file_format: AhbExportFileFormat) -> Path:
+    """
+    Returns the path of the file of the given format which is exported for the given Prüfidentifikator, i.e.
+    'output_directory_path/<edifact_format>/<file_format>/<pruefidentifikator>.<extension>'.
+    Raises a ValueError if the Prüfidentifikator is not a valid one.
+    """
+    return (
+        get_output_directory_path_of_pruefi(output_directory_path, pruefi)
+        / str(file_format)
+        / f"{pruefi}.{_FILE_EXTENSIONS[file_format]}"
+    )
+
+
+def get_manifest_file_path(output_directory_path: Path, pruefi: str) -> Path:
+    """
+    Returns the path of the output manifest of the given Prüfidentifikator, i.e.
+    'output_directory_path/<edifact_format>/manifest/<pruefidentifikator>.json'.
+    Raises a ValueError if the Prüfidentifikator is not a valid one.
+    """
+    return get_output_directory_path_of_pruefi(output_directory_path, pruefi) / "manifest" / f"{pruefi}.json"
+
+
+class OutputFile(BaseModel):
+    """
+    The information needed to check that a file has not changed since it was written (or read).
+    It is also the base of the models which store information derived from the content of a docx file.
+    """
+
+    mtime_ns: int
+    size: int
+    sha256: str
+
+    @classmethod
+    def from_path(cls, path_to_file: Path, sha256: str | None = None) -> Self:
+        """
+        Creates the information for the current content of the given (e.g. just written) file.
+        If the hash of the file content is already known (e.g. from reading the file), it is not calculated again.
+        """
+        stat = path_to_file.stat()
+        if sha256 is None:
+            sha256 = get_sha256_of_file(path_to_file)
+        return cls(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=sha256)
+
+    def is_valid_for(self, path_to_file: Path) -> bool:
+        """
+        Checks if the given file still has the content it had when the information was created.
+        The hash is only calculated if the modification time or the size have changed.
+        """
+        try:
+            stat = path_to_file.stat()
+            if stat.st_mtime_ns == self.mtime_ns and stat.st_size == self.size:
+                return True
+            return get_sha256_of_file(path_to_file) == self.sha256
+        except OSError:
+            # e.g. the file has been deleted
+            return False
+
+
+class PruefiOutputManifest(BaseModel):
+    """
+    Describes which files have been exported for a Prüfidentifikator and from which content.
+    """
+
+    kohlrahbi_version: str = Field(
+        default=version, description="the files written by another kohlrahbi version are written again"
+    )
+    pruefidentifikator: str
+    content_digest: str = Field(description="the content digest of the unfolded AHB, see `UnfoldedAhb`")
+    source_docx_sha256: str | None = Field(default=None, description="the hash of the docx file the AHB is from")
+    files: dict[AhbExportFileFormat, OutputFile] = Field(default_factory=dict)
+
+    def is_in_sync(self, content_digest: str, file_format: AhbExportFileFormat, path_to_output_file: Path) -> bool:
+        """
+        Checks if the given file has been written from the content with the given digest (by the current kohlrahbi
+        version) and has not changed since.
+        """
+        if content_digest != self.content_digest or self.kohlrahbi_version != version:
+            return False
+        output_file = self.files.get(file_format)
+        return output_file is not None and output_file.is_valid_for(path_to_output_file)
+
+    def has_valid_files(self, file_types: tuple[AhbExportFileFormat, ...], output_directory_path: Path) -> bool:
+        """
+        Checks if the files of all given formats have been written (by the current kohlrahbi version) and have not
+        changed since.
+        """
+        return self.kohlrahbi_version == version and all(
+            file_format in self.files
+            and self.files[file_format].is_valid_for(
+                get_output_file_path(output_directory_path, self.pruefidentifikator, file_format)
+            )
+            for file_format in file_types
+        )
+
+
+def load_pruefi_output_manifest(path_to_manifest_file: Path) -> PruefiOutputManifest | None:
+    """
+    Loads the given output manifest. Returns None if there is no (readable) manifest file.
+    """
+    if not path_to_manifest_file.exists():
+        return None
+    try:
+        return PruefiOutputManifest.model_validate_json(path_to_manifest_file.read_bytes())
+    except (OSError, ValidationError):
+        logger.warning("The output manifest '%s' is broken and will be ignored.", path_to_manifest_file)
+        return None
+
+
+def save_pruefi_output_manifest(pruefi_output_manifest: PruefiOutputManifest, path_to_manifest_file: Path) -> None:
+    """
+    Saves the given output manifest.
+    """
+    path_to_manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    path_to_manifest_file.write_text(pruefi_output_manifest.model_dump_json(indent=2), encoding="utf-8")
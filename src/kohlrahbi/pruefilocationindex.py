@@ -0,0 +1,110 @@
+"""
+This module provides an index of the locations of the AHB tables of all Prüfidentifikatoren inside the docx files.
+The pruefi to file mapping (see `kohlrahbi.ahb.get_pruefi_to_file_mapping`) only tells which file contains a
+Prüfidentifikator. With this index, the extraction can jump directly to the tables of the Prüfidentifikator instead
+of reading the document from the start.
+The index is stored next to the pruefi to file mapping in the cache directory. Each entry stores the modification
+time, size and SHA-256 hash of the docx file, so that outdated entries are detected and ignored.
+"""
+
+from pathlib import Path
+
+import tomlkit
+from pydantic import BaseModel, Field
+
+from kohlrahbi.docxbody import DocumentBody
+from kohlrahbi.logger import logger
+from kohlrahbi.outputmanifest import OutputFile
+from kohlrahbi.read_functions import PruefiLocation, get_pruefi_locations
+from kohlrahbi.version import version
+
+DEFAULT_PRUEFI_LOCATION_INDEX_DIRECTORY = Path(__file__).parent / "cache"
+
+
+class DocxFilePruefiLocations(OutputFile):
+    """
+    The locations of the Prüfidentifikatoren of a single docx file together with the information needed to validate
+    them.
+    """
+
+    locations: dict[str, PruefiLocation] = Field(default_factory=dict)
+
+
+class PruefiLocationIndex(BaseModel):
+    """
+    The locations of the Prüfidentifikatoren of all docx files of a format version, by docx file name.
+    """
+
+    kohlrahbi_version: str = version
+    files: dict[str, DocxFilePruefiLocations] = Field(default_factory=dict)
+
+    def add_docx_file(self, path_to_docx_file: Path, document_body: DocumentBody, sha256: str | None = None) -> None:
+        """
+        Finds the locations of all Prüfidentifikatoren in the given document and adds them to the index.
+        If given, `sha256` is the hash of the docx file content which has been calculated while reading the document.
+        """
+        try:
+            locations = get_pruefi_locations(document_body)
+        except ValueError:
+            logger.warning("Could not locate the Prüfidentifikatoren in '%s'", path_to_docx_file.name, exc_info=True)
+            return
+        docx_file_pruefi_locations = DocxFilePruefiLocations.from_path(path_to_docx_file, sha256)
+        docx_file_pruefi_locations.locations = locations
+        self.files[path_to_docx_file.name] = docx_file_pruefi_locations
+
+    def get_locations(self, path_to_docx_file: Path) -> dict[str, PruefiLocation] | None:
+        """
+        Returns the locations of the Prüfidentifikatoren in the given docx file.
+        Returns None if the docx file is unknown or has changed since the index was created.
+        """
+        if self.kohlrahbi_version != version:
+            return None
+        docx_file_pruefi_locations = self.files.get(path_to_docx_file.name)
+        if docx_file_pruefi_locations is None:
+            return None
+        if not docx_file_pruefi_locations.is_valid_for(path_to_docx_file):
+            logger.info("The pruefi locations of '%s' are outdated and will be ignored.", path_to_docx_file.name)
+            return None
+        return docx_file_pruefi_locations.locations
+
+
+def get_path_to_pruefi_location_index(
+    format_version: str, directory: Path = DEFAULT_PRUEFI_LOCATION_INDEX_DIRECTORY
+) -> Path:
+    """
+    Returns the path of the pruefi location index file for the given format version.
+    """
+    return directory / f"{format_version}_pruefi_location_index.toml"
+
+
+def load_pruefi_location_index(
+    format_version: str, directory: Path = DEFAULT_PRUEFI_LOCATION_INDEX_DIRECTORY
+) -> PruefiLocationIndex:
+    """
+    Loads the pruefi location index of the given format version.
+    If there is no (readable) index file, an empty index is returned.
+    """
+    path_to_index_file = get_path_to_pruefi_location_index(format_version, directory)
+    if not path_to_index_file.exists():
+        return PruefiLocationIndex()
+    try:
+        with open(path_to_index_file, "rb") as file:
+            return PruefiLocationIndex.model_validate(tomlkit.load(file).unwrap())
+    except (OSError, ValueError):
+        logger.warning("The pruefi location index '%s' is broken and will be ignored.", path_to_index_file)
+        return PruefiLocationIndex()
+
+
+def save_pruefi_location_index(
+    pruefi_location_index: PruefiLocationIndex,
+    format_version: str,
+    directory: Path = DEFAULT_PRUEFI_LOCATION_INDEX_DIRECTORY,
+) -> None:
+    """
+    Saves the pruefi location index of the given format version.
+    """
+    path_to_index_file = get_path_to_pruefi_location_index(format_version, directory)
+    path_to_index_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(path_to_index_file, "w", encoding="utf-8") as file:
+        tomlkit.dump(pruefi_location_index.model_dump(), file)
+    logger.info("💾 Saved the pruefi location index at %s.", path_to_index_file)
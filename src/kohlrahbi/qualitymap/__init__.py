@@ -4,10 +4,11 @@ This module contains the functions to scrape the AHBs for quality maps.
 
 from pathlib import Path
 
-import docx
 from docx.document import Document
 from docx.table import Table
 
+from kohlrahbi.docxbody import DocumentBody, TableContent, as_document_body
+from kohlrahbi.docxbodycache import load_document_body
 from kohlrahbi.docxfilefinder import DocxFileFinder
 from kohlrahbi.logger import logger
 from kohlrahbi.qualitymap.qualitymaptable import QualityMapTable
@@ -21,7 +22,7 @@ def find_docx_files(input_path: Path) -> list[Path]:
     return docx_file_finder.get_docx_files_which_contain_quality_map()
 
 
-def is_quality_map_table(table: Table) -> bool:
+def is_quality_map_table(table: Table | TableContent) -> bool:
     """
     Checks if the given table is quality map table.
     """
@@ -31,7 +32,7 @@ def is_quality_map_table(table: Table) -> bool:
         return False
 
 
-def get_quality_map_table(document: Document) -> QualityMapTable | None:
+def get_quality_map_table(document: Document | DocumentBody) -> QualityMapTable | None:
     """
     Reads a docx file and extracts the quality map table.
     Returns None if no such table was found.
@@ -39,7 +40,7 @@ def get_quality_map_table(document: Document) -> QualityMapTable | None:
 
     # Iterate through the whole word document
     logger.info("🔁 Start iterating through paragraphs and tables")
-    for table in document.tables:
+    for table in as_document_body(document).tables:
         if is_quality_map_table(table=table):
             change_history_table = QualityMapTable.from_docx_quality_map_table(docx_table=table)
             return change_history_table
@@ -51,7 +52,7 @@ def process_docx_file(file_path: Path) -> QualityMapTable | None:
     """
     Read and process quality map from a .docx file.
     """
-    doc = docx.Document(str(file_path))
+    doc = load_document_body(file_path)
     logger.info("🤓 Start reading docx file '%s'", str(file_path))
     quality_map_table = get_quality_map_table(document=doc)
 
@@ -8,7 +8,7 @@ import pandas as pd
 from docx.table import Table
 from pydantic import BaseModel, ConfigDict
 
-from kohlrahbi.ahbtable.ahbsubtable import AhbSubTable
+from kohlrahbi.docxbody import TableContent, as_table_content
 from kohlrahbi.logger import logger
 
 
@@ -34,16 +34,14 @@ class QualityMapTable(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @classmethod
-    def from_docx_quality_map_table(cls, docx_table: Table) -> "QualityMapTable":
+    def from_docx_quality_map_table(cls, docx_table: Table | TableContent) -> "QualityMapTable":
         """
         Create a QualityMapTable object from a quality map table.
         """
 
         quality_map_rows: list[list[str]] = []
 
-        for row in docx_table.rows:
-            sanitized_cells = list(AhbSubTable.iter_visible_cells(row=row))
-
+        for sanitized_cells in as_table_content(docx_table).iter_visible_rows():
             is_header_row = sanitized_cells[0].text.strip() == "Qualität\n\nSegmentgruppe"
             if is_header_row:
                 continue
@@ -2,8 +2,8 @@
 A collection of functions to get information from AHB tables.
 """
 
-from collections.abc import Generator
-from typing import TypeGuard
+from collections.abc import Collection, Generator, Mapping
+from typing import TYPE_CHECKING, TypeGuard
 
 from docx.document import Document
 from docx.oxml.table import CT_Tbl
@@ -11,14 +11,34 @@ from docx.oxml.text.paragraph import CT_P
 from docx.table import Table, _Cell
 from docx.text.paragraph import Paragraph
 from efoli import EdifactFormat, get_format_of_pruefidentifikator
+from pydantic import BaseModel
 
 from kohlrahbi.ahbtable.ahbcondtions import AhbConditions
-from kohlrahbi.ahbtable.ahbpackagetable import AhbPackageTable
 from kohlrahbi.ahbtable.ahbsubtable import AhbSubTable
 from kohlrahbi.ahbtable.ahbtable import AhbTable
+from kohlrahbi.docxbody import DocumentBody, ParagraphContent, TableContent, as_document_body
 from kohlrahbi.logger import logger
 from kohlrahbi.seed import Seed
 
+if TYPE_CHECKING:
+    # the package table is based on pandas, which is not needed for the extraction of AHB tables
+    from kohlrahbi.ahbtable.ahbpackagetable import AhbPackageTable
+
+#: an item of the document body, either read by python-docx or taken from a (cached) DocumentBody
+DocumentItem = Paragraph | Table | ParagraphContent | TableContent
+
+
+class PruefiLocation(BaseModel):
+    """
+    The location of the AHB table of a Prüfidentifikator inside a docx file.
+    Both values are indices of the paragraphs and tables of the document body in document order (see DocumentBody).
+    """
+
+    #: the index of the (first) table with header which contains the Prüfidentifikator
+    start: int
+    #: the index of the item at which the search for the continuation tables ends (exclusive)
+    stop: int
+
 
 def get_all_paragraphs_and_tables(parent: Document | _Cell) -> Generator[Paragraph | Table, None, None]:
     """
@@ -42,45 +62,49 @@ def get_all_paragraphs_and_tables(parent: Document | _Cell) -> Generator[Paragra
             yield Table(child, parent)
 
 
-def table_header_starts_with_text_edifact_struktur(table: Table) -> bool:
+def table_header_starts_with_text_edifact_struktur(table: Table | TableContent) -> bool:
     """
     Check if the table header starts with the text "EDIFACT Struktur".
     """
     return table.cell(row_idx=0, col_idx=0).text.strip() == "EDIFACT Struktur"
 
 
-def is_item_header_of_change_history_section(item: Paragraph | Table | None, style_name: str) -> TypeGuard[Paragraph]:
+def is_item_header_of_change_history_section(
+    item: DocumentItem | None, style_name: str
+) -> TypeGuard[Paragraph | ParagraphContent]:
     """
     Checks if the given item is a header of the change history section.
     """
     # checking the style is quite expensive for the CPU because it includes some xpath searches;
     # we should only check the style if the other (easier/cheap) checks returned True so it at least
-    return isinstance(item, Paragraph) and "Änderungshistorie" in item.text and "Heading" in style_name
+    return (
+        isinstance(item, Paragraph | ParagraphContent) and "Änderungshistorie" in item.text and "Heading" in style_name
+    )
 
 
-def is_item_text_paragraph(item: Paragraph | Table | None, style_name: str) -> TypeGuard[Paragraph]:
+def is_item_text_paragraph(item: DocumentItem | None, style_name: str) -> TypeGuard[Paragraph | ParagraphContent]:
     """
     Checks if the given item is a text paragraph.
     """
-    return isinstance(item, Paragraph) and "Heading" not in style_name
+    return isinstance(item, Paragraph | ParagraphContent) and "Heading" not in style_name
 
 
-def is_item_table_with_pruefidentifikatoren(item: Paragraph | Table | None) -> TypeGuard[Table]:
+def is_item_table_with_pruefidentifikatoren(item: DocumentItem | None) -> TypeGuard[Table | TableContent]:
     """
     Check if the item is a Table and contains Pruefidentifikatoren.
 
     Args:
-    item (Paragraph | Table | None): The item to check.
+    item (DocumentItem | None): The item to check.
 
     Returns:
     bool: True if the item is a Table and contains Pruefidentifikatoren, False otherwise.
     """
-    return isinstance(item, Table) and table_header_starts_with_text_edifact_struktur(table=item)
+    return isinstance(item, Table | TableContent) and table_header_starts_with_text_edifact_struktur(table=item)
 
 
 def is_item_headless_table(
-    value: tuple[Paragraph | Table | None, AhbTable | None],
-) -> TypeGuard[tuple[Table, AhbTable]]:
+    value: tuple[DocumentItem | None, AhbTable | None],
+) -> TypeGuard[tuple[Table | TableContent, AhbTable]]:
     """
     Checks if the given item is a headless table.
 
@@ -94,18 +118,21 @@ def is_item_headless_table(
     """
     item, ahb_table = value
     # return isinstance(item, Table) and seed is not None and ahb_table is not None
-    return isinstance(item, Table) and ahb_table is not None
+    return isinstance(item, Table | TableContent) and ahb_table is not None
 
 
-def get_ahb_table(document: Document, pruefi: str) -> AhbTable | None:
+def get_ahb_table(
+    document: Document | DocumentBody, pruefi: str, location: PruefiLocation | None = None
+) -> AhbTable | None:
     """
     Reads a docx file and extracts all information for a given Prüfidentifikator.
     If the Prüfidentifikator is not found or we reach the end of the AHB document
     - indicated by the section 'Änderungshistorie' - it returns None.
 
     Args:
-        document: AHB word document which is read by python-docx package
+        document: AHB word document which is read by python-docx package or its (cached) body
         pruefi (str): The Prüfidentifikator to search for
+        location: If known (see `get_pruefi_locations`), only this part of the document is read
 
     Returns:
         AhbTable or None: The extracted AHB table or None if not found
@@ -115,7 +142,11 @@ def get_ahb_table(document: Document, pruefi: str) -> AhbTable | None:
     seed: Seed | None = None
     searched_pruefi_is_found = False
 
-    for item in get_all_paragraphs_and_tables(document):
+    items = as_document_body(document).items
+    if location is not None:
+        items = items[location.start : location.stop]
+
+    for item in items:
         style_name = get_style_name(item)
 
         if is_item_text_paragraph(item, style_name):
@@ -141,17 +172,134 @@ def get_ahb_table(document: Document, pruefi: str) -> AhbTable | None:
     return None
 
 
-def get_style_name(item: Paragraph | Table) -> str:
+def get_ahb_tables(
+    document: Document | DocumentBody,
+    pruefis: Collection[str],
+    locations: Mapping[str, PruefiLocation] | None = None,
+) -> dict[str, AhbTable]:
+    """
+    Reads a docx file and extracts the AHB tables for all given Prüfidentifikatoren in one single pass.
+    The result is the same as calling `get_ahb_table` once per Prüfidentifikator, but the document body is walked
+    only once and each docx table is parsed at most once, no matter how many of the searched pruefis share it.
+
+    Args:
+        document: AHB word document which is read by python-docx package or its (cached) body
+        pruefis: The Prüfidentifikatoren to search for
+        locations: If the locations of all searched pruefis are known (see `get_pruefi_locations`),
+            only the part of the document between them is read
+
+    Returns:
+        dict[str, AhbTable]: The extracted AHB tables by Prüfidentifikator; pruefis that were not found are missing
+    """
+    searched_pruefis = set(pruefis)
+    # the sub tables are shared between all pruefis of the same docx table; each sub table is parsed only once
+    ahb_sub_tables: dict[str, list[AhbSubTable]] = {}
+    finished_pruefis: set[str] = set()
+    seed: Seed | None = None
+
+    items = as_document_body(document).items
+    if locations is not None and searched_pruefis and searched_pruefis <= locations.keys():
+        start = min(locations[pruefi].start for pruefi in searched_pruefis)
+        stop = max(locations[pruefi].stop for pruefi in searched_pruefis)
+        items = items[start:stop]
+
+    for item in items:
+        style_name = get_style_name(item)
+
+        if is_item_text_paragraph(item, style_name):
+            continue
+
+        if reached_end_of_document(style_name, item):
+            for pruefi in searched_pruefis - ahb_sub_tables.keys():
+                log_end_of_document(pruefi)
+            break
+
+        if is_item_table_with_pruefidentifikatoren(item):
+            seed = Seed.from_table(docx_table=item)
+            for pruefi in ahb_sub_tables.keys() - finished_pruefis:
+                if pruefi not in seed.pruefidentifikatoren:
+                    log_end_of_ahb_table(pruefi)
+                    finished_pruefis.add(pruefi)
+            if finished_pruefis == searched_pruefis:
+                break
+            newly_found_pruefis = [
+                pruefi
+                for pruefi in seed.pruefidentifikatoren
+                if pruefi in searched_pruefis and pruefi not in ahb_sub_tables
+            ]
+            if newly_found_pruefis:
+                ahb_sub_table = AhbSubTable.from_table_with_header(docx_table=item)
+                for pruefi in newly_found_pruefis:
+                    log_found_pruefi(pruefi)
+                    ahb_sub_tables[pruefi] = [ahb_sub_table]
+
+        elif isinstance(item, TableContent) and ahb_sub_tables.keys() - finished_pruefis:
+            assert seed is not None
+            ahb_sub_table = AhbSubTable.from_headless_table(docx_table=item, tmd=seed)
+            for pruefi in ahb_sub_tables.keys() - finished_pruefis:
+                ahb_sub_tables[pruefi].append(ahb_sub_table)
+
+    ahb_tables: dict[str, AhbTable] = {}
+    for pruefi in sorted(searched_pruefis):
+        if pruefi not in ahb_sub_tables:
+            log_pruefi_not_found(pruefi)
+            continue
+        # the sub table dataframes are shared between pruefis, so we must not sanitize them in place
+        ahb_table = AhbTable.from_ahb_sub_tables(ahb_sub_tables[pruefi])
+        ahb_table.sanitize()
+        ahb_tables[pruefi] = ahb_table
+    return ahb_tables
+
+
+def get_pruefi_locations(document: Document | DocumentBody) -> dict[str, PruefiLocation]:
+    """
+    Finds the locations of the AHB tables of all Prüfidentifikatoren in the given document.
+    The AHB table of a Prüfidentifikator starts at the first table with header which contains it and ends at the next
+    table with header which does not contain it or at the end of the AHB document, the same as in `get_ahb_table`.
+    """
+    items = as_document_body(document).items
+    starts: dict[str, int] = {}
+    locations: dict[str, PruefiLocation] = {}
+
+    for index, item in enumerate(items):
+        style_name = get_style_name(item)
+
+        if is_item_text_paragraph(item, style_name):
+            continue
+
+        if reached_end_of_document(style_name, item):
+            break
+
+        if is_item_table_with_pruefidentifikatoren(item):
+            seed = Seed.from_table(docx_table=item)
+            for pruefi in [pruefi for pruefi in starts if pruefi not in seed.pruefidentifikatoren]:
+                locations[pruefi] = PruefiLocation(start=starts.pop(pruefi), stop=index)
+            for pruefi in seed.pruefidentifikatoren:
+                if pruefi not in starts and pruefi not in locations:
+                    starts[pruefi] = index
+    else:
+        index = len(items)
+
+    for pruefi, start in starts.items():
+        locations[pruefi] = PruefiLocation(start=start, stop=index)
+    return locations
+
+
+def get_style_name(item: DocumentItem) -> str:
     """Extracts and normalizes the style name of a document item."""
+    if isinstance(item, ParagraphContent):
+        return item.style_name or "None"
+    if isinstance(item, TableContent):
+        return "None"
     return item.style.name if item.style else "None"
 
 
-def reached_end_of_document(style_name: str, item: Paragraph | Table | None) -> bool:
+def reached_end_of_document(style_name: str, item: DocumentItem | None) -> bool:
     """Checks if the current item marks the end of the document."""
     return is_item_header_of_change_history_section(item, style_name)
 
 
-def update_seed(item: Paragraph | Table | None, seed: Seed | None) -> Seed | None:
+def update_seed(item: DocumentItem | None, seed: Seed | None) -> Seed | None:
     """Updates the seed if the current item is a table with Prüfidentifikatoren."""
     if is_item_table_with_pruefidentifikatoren(item):
         return Seed.from_table(docx_table=item)
@@ -166,15 +314,19 @@ def should_end_search(pruefi: str, seed: Seed | None, searched_pruefi_is_found:
 
 
 def process_table(
-    item: Paragraph | Table | None,
+    item: DocumentItem | None,
     pruefi: str,
     searched_pruefi_is_found: bool,
     ahb_table: AhbTable | None,
     seed: Seed | None = None,
 ) -> tuple[bool, AhbTable]:
-    """Processes tables to find and build the AHB table."""
+    """
+    Processes tables to find and build the AHB table.
+    The seed is the seed of the current table with header (see `update_seed`); if it is not given, it is created here.
+    """
     if is_item_table_with_pruefidentifikatoren(item):
-        seed = Seed.from_table(docx_table=item)
+        if seed is None:
+            seed = Seed.from_table(docx_table=item)
         # pylint:disable=unsupported-membership-test
         if pruefi in seed.pruefidentifikatoren and not searched_pruefi_is_found:
             log_found_pruefi(pruefi)
@@ -184,7 +336,7 @@ def process_table(
 
     elif is_item_headless_table((item, ahb_table)):
         assert ahb_table is not None
-        assert isinstance(item, Table)
+        assert isinstance(item, Table | TableContent)
         assert seed is not None
         ahb_sub_table = AhbSubTable.from_headless_table(docx_table=item, tmd=seed)
         ahb_table.append_ahb_sub_table(ahb_sub_table=ahb_sub_table)
@@ -222,23 +374,25 @@ def log_pruefi_not_found(pruefi: str) -> None:
 
 
 def get_all_conditions_from_doc(
-    document: Document, edifact_format: EdifactFormat
-) -> tuple[AhbPackageTable | None, AhbConditions]:
+    document: Document | DocumentBody, edifact_format: EdifactFormat
+) -> tuple["AhbPackageTable | None", AhbConditions]:
     """
     Go through a given document and grasp all conditions and package tables for a given format.
     """
+    from kohlrahbi.ahbtable.ahbpackagetable import AhbPackageTable  # noqa: PLC0415 -- see TYPE_CHECKING import
+
     package_table: AhbPackageTable | None = None
     conditions_table = AhbConditions()
-    package_tables: list[Table] = []
-    conditions_tables: list[Table] = []
+    package_tables: list[Table | TableContent] = []
+    conditions_tables: list[Table | TableContent] = []
     seed = None
 
     # Iterate through the whole word document
     logger.info("🔁 Start iterating through paragraphs and tables")
     found_package_table = False
-    for item in get_all_paragraphs_and_tables(document):
+    for item in as_document_body(document).items:
         style_name = get_style_name(item)
-        if isinstance(item, Paragraph) and "Änderungshistorie" in item.text and "Heading" in style_name:
+        if isinstance(item, ParagraphContent) and "Änderungshistorie" in item.text and "Heading" in style_name:
             logger.info(
                 "Reached the end of the document, i.e. the section 'Änderungshistorie'.",
             )
@@ -248,9 +402,9 @@ def get_all_conditions_from_doc(
         if is_item_package_heading(item, style_name, edifact_format):
             found_package_table = True
             logger.info("🏁 Found Package Table for %s", edifact_format)
-        elif isinstance(item, Table) and found_package_table:
+        elif isinstance(item, TableContent) and found_package_table:
             package_tables.append(item)
-        elif found_package_table and not isinstance(item, Table):
+        elif found_package_table and not isinstance(item, TableContent):
             logger.info("We reached the end of the package table.")
             found_package_table = False
 
@@ -277,19 +431,19 @@ def get_all_conditions_from_doc(
     return package_table, conditions_table
 
 
-def is_last_row_unt_0062(item: Table | Paragraph) -> bool:
+def is_last_row_unt_0062(item: DocumentItem) -> bool:
     """
     Checks if the given table contains UNT segment in last row.
     """
-    return isinstance(item, Table) and "UNT\t0062" == item.cell(row_idx=-1, col_idx=0).text.strip()
+    return isinstance(item, Table | TableContent) and "UNT\t0062" == item.cell(row_idx=-1, col_idx=0).text.strip()
 
 
 def is_relevant_pruefi_table(
-    item: Paragraph | Table, seed: Seed | None, edifact_format: EdifactFormat
-) -> TypeGuard[Table]:
+    item: DocumentItem, seed: Seed | None, edifact_format: EdifactFormat
+) -> TypeGuard[Table | TableContent]:
     """compares new pruefis to last pruefi and thus checks whether new table"""
     return (
-        isinstance(item, Table)
+        isinstance(item, Table | TableContent)
         and seed is not None
         and is_pruefi_of_edifact_format(seed.pruefidentifikatoren, edifact_format)
     )
@@ -302,11 +456,11 @@ def is_pruefi_of_edifact_format(last_pruefis: list[str], edifact_format: Edifact
     )
 
 
-def is_item_package_heading(item: Paragraph | Table | None, style_name: str, edifact_format: EdifactFormat) -> bool:
+def is_item_package_heading(item: DocumentItem | None, style_name: str, edifact_format: EdifactFormat) -> bool:
     """
     Checks if the given item is the header of the package table.
     """
-    return isinstance(item, Paragraph) and (
+    return isinstance(item, Paragraph | ParagraphContent) and (
         (
             (style_name == "Heading 1")
             and "Übersicht der Pakete in der" in item.text
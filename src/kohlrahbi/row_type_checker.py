@@ -7,8 +7,11 @@ from docx.oxml.parser import OxmlElement
 from docx.shared import RGBColor
 from docx.table import _Cell
 
+from kohlrahbi.docxbody import CellContent, as_cell_content
 from kohlrahbi.enums import RowType
 
+_GREY = str(RGBColor(128, 128, 128))
+
 
 def set_table_header_bg_color(cell: _Cell, hex_color: str) -> _Cell:
     """
@@ -22,11 +25,11 @@ def set_table_header_bg_color(cell: _Cell, hex_color: str) -> _Cell:
     return cell
 
 
-def is_row_header(edifact_struktur_cell: _Cell) -> bool:
+def is_row_header(edifact_struktur_cell: _Cell | CellContent) -> bool:
     """Checks if the current row is a header.
 
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
 
     Returns:
         bool:
@@ -37,55 +40,58 @@ def is_row_header(edifact_struktur_cell: _Cell) -> bool:
     return False
 
 
-def is_row_segmentname(edifact_struktur_cell: _Cell) -> bool:
+def is_row_segmentname(edifact_struktur_cell: _Cell | CellContent) -> bool:
     """Checks if the current row contains just a segment name.
        Example: "Nachrichten-Kopfsegment"
 
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
 
     Returns:
         bool:
     """
+    edifact_struktur_cell = as_cell_content(edifact_struktur_cell)
     try:
-        colour_is_grey: bool = edifact_struktur_cell.paragraphs[0].runs[0].font.color.rgb == RGBColor(128, 128, 128)
+        colour_is_grey: bool = edifact_struktur_cell.paragraphs[0].first_run_color == _GREY
         return colour_is_grey
     except IndexError:
         return False
 
 
-def is_row_segmentgruppe(edifact_struktur_cell: _Cell, left_indent_position: int) -> bool:
+def is_row_segmentgruppe(edifact_struktur_cell: _Cell | CellContent, left_indent_position: int) -> bool:
     """Checks if the current row is a segmentgruppe.
        Example: "SG2"
 
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
         left_indent_position (int): Position of the left indent
 
     Returns:
         bool:
     """
+    edifact_struktur_cell = as_cell_content(edifact_struktur_cell)
     return (
-        edifact_struktur_cell.paragraphs[0].paragraph_format.left_indent != left_indent_position
+        edifact_struktur_cell.paragraphs[0].left_indent != left_indent_position
         and "\t" not in edifact_struktur_cell.text
         and not edifact_struktur_cell.text == ""
     )
 
 
-def is_row_segment(edifact_struktur_cell: _Cell, left_indent_position: int) -> bool:
+def is_row_segment(edifact_struktur_cell: _Cell | CellContent, left_indent_position: int) -> bool:
     """Checks if the current row is a segment.
        Example: "UNH", "SG2\tNAD"
 
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
         left_indent_position (int): Position of the left indent
 
     Returns:
         bool:
     """
+    edifact_struktur_cell = as_cell_content(edifact_struktur_cell)
     # |   UNH    |
     if (
-        edifact_struktur_cell.paragraphs[0].paragraph_format.left_indent == left_indent_position
+        edifact_struktur_cell.paragraphs[0].left_indent == left_indent_position
         and "\t" not in edifact_struktur_cell.text
         and not edifact_struktur_cell.text == ""
     ):
@@ -93,7 +99,7 @@ def is_row_segment(edifact_struktur_cell: _Cell, left_indent_position: int) -> b
 
     # | SG2\tNAD |
     if (
-        not edifact_struktur_cell.paragraphs[0].paragraph_format.left_indent == left_indent_position
+        not edifact_struktur_cell.paragraphs[0].left_indent == left_indent_position
         and edifact_struktur_cell.text.count("\t") == 1
     ):
         return True
@@ -101,27 +107,25 @@ def is_row_segment(edifact_struktur_cell: _Cell, left_indent_position: int) -> b
     return False
 
 
-def is_row_datenelement(edifact_struktur_cell: _Cell, left_indent_position: int) -> bool:
+def is_row_datenelement(edifact_struktur_cell: _Cell | CellContent, left_indent_position: int) -> bool:
     """Checks if the current row is a datenelement.
        Example: "UNH\t00062", "SG2\tNAD\t3035"
 
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
         left_indent_position (int): Position of the left indent
 
     Returns:
         bool:
     """
+    edifact_struktur_cell = as_cell_content(edifact_struktur_cell)
     # |   UNH\t0062 |
-    if (
-        edifact_struktur_cell.paragraphs[0].paragraph_format.left_indent == left_indent_position
-        and "\t" in edifact_struktur_cell.text
-    ):
+    if edifact_struktur_cell.paragraphs[0].left_indent == left_indent_position and "\t" in edifact_struktur_cell.text:
         return True
 
     # | SG2\tNAD\t3035 |
     if (
-        not edifact_struktur_cell.paragraphs[0].paragraph_format.left_indent == left_indent_position
+        not edifact_struktur_cell.paragraphs[0].left_indent == left_indent_position
         and edifact_struktur_cell.text.count("\t") == 2
     ):
         return True
@@ -129,11 +133,11 @@ def is_row_datenelement(edifact_struktur_cell: _Cell, left_indent_position: int)
     return False
 
 
-def is_row_empty(edifact_struktur_cell: _Cell) -> bool:
+def is_row_empty(edifact_struktur_cell: _Cell | CellContent) -> bool:
     """Checks if the current row is empty.
        Example: ""
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
 
     Returns:
         bool:
@@ -141,11 +145,11 @@ def is_row_empty(edifact_struktur_cell: _Cell) -> bool:
     return edifact_struktur_cell.text == ""
 
 
-def get_row_type(edifact_struktur_cell: _Cell, left_indent_position: int) -> RowType:
+def get_row_type(edifact_struktur_cell: _Cell | CellContent, left_indent_position: int) -> RowType:
     """Defines the type of the current row.
 
     Args:
-        edifact_struktur_cell (_Cell): Indicator cell
+        edifact_struktur_cell (_Cell | CellContent): Indicator cell
         left_indent_position (int): Position of the left indent
 
     Raises:
@@ -154,6 +158,7 @@ def get_row_type(edifact_struktur_cell: _Cell, left_indent_position: int) -> Row
     Returns:
         RowType: Type of the current row
     """
+    edifact_struktur_cell = as_cell_content(edifact_struktur_cell)
     if is_row_header(edifact_struktur_cell=edifact_struktur_cell):
         return RowType.HEADER
 
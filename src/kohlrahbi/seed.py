@@ -2,9 +2,13 @@
 This module provides a class to collect information which of need for all parsing functions
 """
 
+import weakref
+from typing import cast
+
 from docx.table import Table
 from pydantic import BaseModel, Field
 
+from kohlrahbi.docxbody import TableContent, as_cell_content
 from kohlrahbi.enums import RowType
 from kohlrahbi.table_header import PruefiMetaData, TableHeader, get_tabstop_positions
 
@@ -27,11 +31,30 @@ class Seed(BaseModel):
     # to decouple the data structure of Elixir from the input data
     # more information can be found on https://www.attrs.org/en/stable/init.html#initialization
     @classmethod
-    def from_table(cls, docx_table: Table) -> "Seed":
+    def from_table(cls, docx_table: Table | TableContent) -> "Seed":
         """Prepare DataFrame for a new table with new Prüfidentifikatoren
 
+        The header of each table (of a document body) is parsed only once, no matter how often the seed of the table is
+        requested (e.g. while searching the pruefis, locating them and extracting their AHB tables).
+        Every call returns a new seed though, because the last two row types are the state of parsing a single table.
+
         Args:
-            item (Union[Paragraph, Table]): A paragraph or table from the docx
+            docx_table (Table | TableContent): A table from the docx
+        """
+        if not isinstance(docx_table, TableContent):
+            return cls._from_table_header(docx_table)
+        seed = _seeds_by_table_id.get(id(docx_table))
+        if seed is None:
+            seed = cls._from_table_header(docx_table)
+            _seeds_by_table_id[id(docx_table)] = seed
+            # the id of a table may be reused once the table is garbage collected, so the seed must be forgotten then
+            weakref.finalize(docx_table, _seeds_by_table_id.pop, id(docx_table), None)
+        return seed.model_copy(update={"last_two_row_types": [RowType.EMPTY, RowType.EMPTY]})
+
+    @classmethod
+    def _from_table_header(cls, docx_table: Table | TableContent) -> "Seed":
+        """
+        Parses the header of the given table.
         """
 
         # the header cell with all pruefi information is the last cell in the first row
@@ -45,12 +68,12 @@ class Seed(BaseModel):
         pruefidentifikatoren = table_header.get_pruefidentifikatoren()
 
         # edifact struktur cell
-        edifact_struktur_indicator_paragraph = docx_table.cell(row_idx=4, col_idx=0).paragraphs[0]
-        edifact_struktur_left_indent_position = edifact_struktur_indicator_paragraph.paragraph_format.left_indent
+        edifact_struktur_indicator_paragraph = as_cell_content(docx_table.cell(row_idx=4, col_idx=0)).paragraphs[0]
+        edifact_struktur_left_indent_position = cast(int, edifact_struktur_indicator_paragraph.left_indent)
 
         # middle cell
-        middle_cell_indicator_paragraph = docx_table.cell(row_idx=4, col_idx=1).paragraphs[0]
-        middle_cell_left_indent_position = middle_cell_indicator_paragraph.paragraph_format.left_indent
+        middle_cell_indicator_paragraph = as_cell_content(docx_table.cell(row_idx=4, col_idx=1)).paragraphs[0]
+        middle_cell_left_indent_position = cast(int, middle_cell_indicator_paragraph.left_indent)
         tabstop_positions = get_tabstop_positions(middle_cell_indicator_paragraph)
 
         # metadata
@@ -78,3 +101,7 @@ class Seed(BaseModel):
             last_two_row_types=last_two_row_types,
             metadata=metadata,
         )
+
+
+# the seeds of all tables which are alive, by the id of the table, see `Seed.from_table`
+_seeds_by_table_id: dict[int, Seed] = {}
@@ -11,6 +11,8 @@ from docx.text.paragraph import Paragraph
 from more_itertools import first, last
 from pydantic import BaseModel, Field
 
+from kohlrahbi.docxbody import CellContent, ParagraphContent, as_cell_content
+
 
 class HeaderSection(StrEnum):
     """
@@ -22,17 +24,19 @@ class HeaderSection(StrEnum):
     PRUEFIDENTIFIKATOR = "pruefidentifikator"
 
 
-def get_tabstop_positions(paragraph: Paragraph) -> list[int]:
+def get_tabstop_positions(paragraph: Paragraph | ParagraphContent) -> list[int]:
     """Find all tabstop positions in a given paragraph.
 
     Mainly the tabstop positions of cells from the middle column are determined
 
     Args:
-        paragraph (Paragraph):
+        paragraph (Paragraph | ParagraphContent):
 
     Returns:
         list[int]: All tabstop positions in the given paragraph
     """
+    if isinstance(paragraph, ParagraphContent):
+        return list(paragraph.tab_stops)
     tabstop_positions: list[int] = []
     for tabstop in paragraph.paragraph_format.tab_stops:
         tabstop_positions.append(tabstop.position)
@@ -97,10 +101,11 @@ class TableHeader(BaseModel):
     pruefi_meta_data: list[PruefiMetaData] = Field(default_factory=list)
 
     @classmethod
-    def from_header_cell(cls, row_cell: _Cell) -> "TableHeader":
+    def from_header_cell(cls, row_cell: _Cell | CellContent) -> "TableHeader":
         """
         Create a TableHeader instance from a list of strings.
         """
+        row_cell = as_cell_content(row_cell)
 
         if not row_cell.paragraphs[-1].text.startswith("Prüfidentifikator"):
             raise ValueError("The last paragraph should start with 'Prüfidentifikator'")
@@ -139,7 +144,9 @@ class TableHeader(BaseModel):
 
                 for tabstop_position, text in zip(initial_tabstop_positions, splitted_text, strict=False):
                     pruefi = tabstop_mapper[tabstop_position]
-                    collector[pruefi][section_type.value] += text + " "
+                    collector[pruefi][section_type.value] = (
+                        cast(str, collector[pruefi][section_type.value]) + text + " "
+                    )
 
         pruefi_meta_data = [
             PruefiMetaData(
@@ -158,7 +165,7 @@ class TableHeader(BaseModel):
         return cls(pruefi_meta_data=pruefi_meta_data)
 
     @staticmethod
-    def initialize_collector(paragraph: Paragraph) -> dict[str, dict[str, str | int]]:
+    def initialize_collector(paragraph: Paragraph | ParagraphContent) -> dict[str, dict[str, str | int]]:
         """Initialize the collector"""
         current_tabstop_positions = get_tabstop_positions(paragraph=paragraph)
         splitted_text = paragraph.text.split("\t")
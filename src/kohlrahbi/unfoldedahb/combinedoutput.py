@@ -0,0 +1,61 @@
+"""
+This module provides the base class of the writers which combine the unfolded AHBs of many Prüfidentifikatoren into
+one output (e.g. one xlsx workbook per EDIFACT format), as opposed to the files which are written per Prüfidentifikator.
+"""
+
+from abc import ABC, abstractmethod
+from types import TracebackType
+
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.unfoldedahb.unfoldedahbtable import UnfoldedAhb
+
+# the names are defined here (and not next to the writers) so that they are known without the optional dependencies
+#: the file name of the sqlite bundle in the output directory, see `kohlrahbi.unfoldedahb.sqlitebundle`
+SQLITE_BUNDLE_FILE_NAME = "ahbs.sqlite"
+#: the directory of the parquet dataset in the output directory, see `kohlrahbi.unfoldedahb.parquetdataset`
+PARQUET_DATASET_DIRECTORY_NAME = "ahb_lines"
+
+
+class CombinedOutputWriter(ABC):
+    """
+    Writes the unfolded AHBs of many Prüfidentifikatoren into a combined output. The output is only complete after
+    `close` has been called, so use the writer as context manager: If the context is left with an exception, `abort`
+    is called instead, such that the output of a previous run is not replaced by an incomplete one.
+    The unfolded AHBs are added in the process which owns the writer, so the writers cannot be shared with worker
+    processes.
+    """
+
+    def __enter__(self) -> "CombinedOutputWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @abstractmethod
+    def add_unfolded_ahb(self, unfolded_ahb: UnfoldedAhb, flat_ahb: FlatAnwendungshandbuch | None = None) -> None:
+        """
+        Adds the unfolded AHB to the combined output.
+        The flat AHB of the unfolded AHB can be passed if it has been converted already (see
+        `UnfoldedAhb.convert_to_flat_ahb`), so that the outputs which need it do not convert it again.
+        Raises a ValueError if the pruefidentifikator is not a valid one.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Completes (i.e. saves) the combined output.
+        """
+
+    @abstractmethod
+    def abort(self) -> None:
+        """
+        Discards everything which has been added since the writer was created and keeps the existing output.
+        """
@@ -0,0 +1,179 @@
+"""
+This module provides the export of the flat AHBs of all Prüfidentifikatoren of a format version into one Parquet
+dataset, which is partitioned by EDIFACT format (hive style, i.e. 'ahb_lines/edifact_format=<format>/...').
+Each row is an `AhbLine` (see `kohlrahbi.models.anwendungshandbuch`), plus the Prüfidentifikator and the format version.
+Other than thousands of flat AHB JSON files, the dataset can be memory-mapped and filtered (e.g. by pruefidentifikator)
+with any Arrow based library, e.g. `pandas.read_parquet(path, filters=[("pruefidentifikator", "==", "17201")])`.
+The lines of each Prüfidentifikator are written as one row group, so the files are written without holding all AHBs in
+memory, and a filter on the Prüfidentifikator only reads the matching row groups.
+The file of an EDIFACT format is written to a temporary file first. When the writer is closed, the rows of the existing
+file whose Prüfidentifikatoren (and format version) have not been written again (e.g. in a run restricted to some
+Prüfidentifikatoren) are appended row group by row group, and the temporary file replaces the existing one.
+"""
+
+from pathlib import Path
+
+try:
+    import pyarrow as pa  # type: ignore[import-untyped]
+    import pyarrow.compute as pc  # type: ignore[import-untyped]
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+except ImportError as import_error:
+    import_error.msg += "; Did you install kohlrahbi[parquet]?"
+    # pyarrow is only an optional dependency when kohlrahbi is used to export parquet datasets
+    raise
+from efoli import EdifactFormat, EdifactFormatVersion, get_format_of_pruefidentifikator
+
+from kohlrahbi.logger import logger
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.unfoldedahb.combinedoutput import PARQUET_DATASET_DIRECTORY_NAME, CombinedOutputWriter
+from kohlrahbi.unfoldedahb.unfoldedahbtable import UnfoldedAhb
+
+#: the name of the partitioning column, whose values are the names of the partition directories
+PARTITION_COLUMN_NAME = "edifact_format"
+
+#: the columns of the dataset; the guid of the flat AHB lines is omitted, because it is generated anew on each export.
+#: A line is identified by its pruefidentifikator and index instead.
+AHB_LINES_SCHEMA = pa.schema(
+    [
+        ("pruefidentifikator", pa.string()),
+        ("format_version", pa.string()),
+        ("index", pa.int64()),
+        ("segment_group_key", pa.string()),
+        ("segment_code", pa.string()),
+        ("data_element", pa.string()),
+        ("segment_id", pa.string()),
+        ("value_pool_entry", pa.string()),
+        ("name", pa.string()),
+        ("ahb_expression", pa.string()),
+        ("conditions", pa.string()),
+        ("section_name", pa.string()),
+    ]
+)
+
+_AHB_LINE_FIELD_NAMES = AHB_LINES_SCHEMA.names[2:]
+
+
+def get_parquet_dataset_path(output_directory_path: Path) -> Path:
+    """
+    Returns the path of the parquet dataset, i.e. 'output_directory_path/ahb_lines'.
+    """
+    return output_directory_path / PARQUET_DATASET_DIRECTORY_NAME
+
+
+def get_parquet_file_path(output_directory_path: Path, edifact_format: EdifactFormat) -> Path:
+    """
+    Returns the path of the parquet file of the given EDIFACT format, i.e.
+    'output_directory_path/ahb_lines/edifact_format=<edifact_format>/ahb_lines.parquet'.
+    """
+    return (
+        get_parquet_dataset_path(output_directory_path)
+        / f"{PARTITION_COLUMN_NAME}={edifact_format}"
+        / f"{PARQUET_DATASET_DIRECTORY_NAME}.parquet"
+    )
+
+
+def _get_temporary_parquet_file_path(parquet_file_path: Path) -> Path:
+    """
+    Returns the path of the file which is written before it replaces the given one. Its name starts with a dot, so that
+    it is ignored when the dataset is read.
+    """
+    return parquet_file_path.with_name(f".{parquet_file_path.name}.tmp")
+
+
+class ParquetDatasetWriter(CombinedOutputWriter):
+    """
+    Writes the flat AHBs of the unfolded AHBs into the parquet dataset, one file per EDIFACT format.
+    In the files of the EDIFACT formats for which unfolded AHBs are added, the rows of the added Prüfidentifikatoren are
+    replaced and all other rows are kept; the files of other EDIFACT formats are not touched.
+    """
+
+    def __init__(self, output_directory_path: Path, format_version: EdifactFormatVersion) -> None:
+        self.output_directory_path = output_directory_path
+        self.format_version = format_version
+        self._parquet_writers: dict[EdifactFormat, pq.ParquetWriter] = {}
+        self._added_pruefis: dict[EdifactFormat, list[str]] = {}
+
+    def _get_parquet_writer(self, edifact_format: EdifactFormat) -> pq.ParquetWriter:
+        """
+        Returns the writer of the (temporary) parquet file of the given EDIFACT format, which is created on first use.
+        """
+        parquet_writer = self._parquet_writers.get(edifact_format)
+        if parquet_writer is None:
+            parquet_file_path = get_parquet_file_path(self.output_directory_path, edifact_format)
+            parquet_file_path.parent.mkdir(parents=True, exist_ok=True)
+            parquet_writer = pq.ParquetWriter(_get_temporary_parquet_file_path(parquet_file_path), AHB_LINES_SCHEMA)
+            self._parquet_writers[edifact_format] = parquet_writer
+            self._added_pruefis[edifact_format] = []
+        return parquet_writer
+
+    def add_unfolded_ahb(self, unfolded_ahb: UnfoldedAhb, flat_ahb: FlatAnwendungshandbuch | None = None) -> None:
+        """
+        Writes the lines of the flat AHB of the unfolded AHB as a new row group into the file of its EDIFACT format.
+        Raises a ValueError if the pruefidentifikator is not a valid one.
+        """
+        pruefidentifikator = unfolded_ahb.meta_data.pruefidentifikator
+        edifact_format = get_format_of_pruefidentifikator(pruefidentifikator)
+        if edifact_format is None:
+            raise ValueError(f"'{pruefidentifikator}' is not a pruefidentifikator")
+        lines = (flat_ahb or unfolded_ahb.convert_to_flat_ahb()).lines
+        columns: dict[str, list[str | int | None]] = {
+            "pruefidentifikator": [pruefidentifikator] * len(lines),
+            "format_version": [str(self.format_version)] * len(lines),
+        }
+        for field_name in _AHB_LINE_FIELD_NAMES:
+            columns[field_name] = [getattr(line, field_name) for line in lines]
+        self._get_parquet_writer(edifact_format).write_table(pa.table(columns, schema=AHB_LINES_SCHEMA))
+        self._added_pruefis[edifact_format].append(pruefidentifikator)
+        logger.info("The lines of %s have been added to the parquet dataset", pruefidentifikator)
+
+    def _append_kept_rows(self, edifact_format: EdifactFormat) -> None:
+        """
+        Appends the rows of the existing file of the given EDIFACT format whose Prüfidentifikatoren (and format version)
+        have not been added, one row group at a time.
+        """
+        parquet_file_path = get_parquet_file_path(self.output_directory_path, edifact_format)
+        if not parquet_file_path.exists():
+            return
+        try:
+            existing_parquet_file = pq.ParquetFile(parquet_file_path)
+        except (OSError, pa.ArrowException):
+            logger.warning("The parquet file '%s' is broken and will be replaced.", parquet_file_path)
+            return
+        with existing_parquet_file:
+            if not existing_parquet_file.schema_arrow.equals(AHB_LINES_SCHEMA):
+                logger.warning("The parquet file '%s' has another schema and will be replaced.", parquet_file_path)
+                return
+            added_pruefis = pa.array(self._added_pruefis[edifact_format], type=pa.string())
+            for row_group_index in range(existing_parquet_file.num_row_groups):
+                row_group = existing_parquet_file.read_row_group(row_group_index)
+                is_replaced = pc.and_(
+                    pc.is_in(row_group["pruefidentifikator"], value_set=added_pruefis),
+                    pc.equal(row_group["format_version"], str(self.format_version)),
+                )
+                kept_rows = row_group.filter(pc.invert(is_replaced))
+                if kept_rows.num_rows > 0:
+                    self._parquet_writers[edifact_format].write_table(kept_rows)
+
+    def close(self) -> None:
+        """
+        Completes the files of all EDIFACT formats (see `_append_kept_rows`) and replaces the existing ones.
+        """
+        for edifact_format, parquet_writer in self._parquet_writers.items():
+            self._append_kept_rows(edifact_format)
+            parquet_writer.close()
+            parquet_file_path = get_parquet_file_path(self.output_directory_path, edifact_format)
+            _get_temporary_parquet_file_path(parquet_file_path).replace(parquet_file_path)
+            logger.info("The parquet file for %s is saved at %s", edifact_format, parquet_file_path.absolute())
+        self._parquet_writers.clear()
+        self._added_pruefis.clear()
+
+    def abort(self) -> None:
+        """
+        Removes the temporary files of all EDIFACT formats, so the existing files are kept.
+        """
+        for edifact_format, parquet_writer in self._parquet_writers.items():
+            parquet_writer.close()
+            parquet_file_path = get_parquet_file_path(self.output_directory_path, edifact_format)
+            _get_temporary_parquet_file_path(parquet_file_path).unlink(missing_ok=True)
+        self._parquet_writers.clear()
+        self._added_pruefis.clear()
@@ -0,0 +1,134 @@
+"""
+This module provides the export of the flat AHBs of all Prüfidentifikatoren into one SQLite file ('ahbs.sqlite'), whose
+tables are those of the sql models (see `kohlrahbi.models.sqlmodels`). The conditions and packages of the EDIFACT
+formats are written into the same file by the conditions command.
+The rows are inserted with bulk inserts (see `kohlrahbi.models.sqlmodels.bulkinsert`) in a single transaction, which is
+committed when the writer is closed. The AHBs (conditions, packages) which are written again replace the existing ones
+of the same Prüfidentifikator (EDIFACT format) and format version, all other rows of the file are kept.
+"""
+
+from pathlib import Path
+
+try:
+    from sqlalchemy import Connection, Engine, RootTransaction, create_engine
+    from sqlmodel import SQLModel
+except ImportError as import_error:
+    import_error.msg += "; Did you install kohlrahbi[sqlmodels]?"
+    # sqlmodel is only an optional dependency when kohlrahbi is used to fill a database
+    raise
+from efoli import EdifactFormat, EdifactFormatVersion
+
+from kohlrahbi.logger import logger
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.models.sqlmodels.bulkinsert import insert_flat_ahbs, replace_conditions, replace_packages
+from kohlrahbi.unfoldedahb.combinedoutput import SQLITE_BUNDLE_FILE_NAME, CombinedOutputWriter
+from kohlrahbi.unfoldedahb.unfoldedahbtable import UnfoldedAhb
+
+
+def get_sqlite_bundle_file_path(output_directory_path: Path) -> Path:
+    """
+    Returns the path of the sqlite bundle, i.e. 'output_directory_path/ahbs.sqlite'.
+    """
+    return output_directory_path / SQLITE_BUNDLE_FILE_NAME
+
+
+def create_sqlite_bundle_engine(output_directory_path: Path) -> Engine:
+    """
+    Returns an engine for the sqlite bundle in the given output directory. The file and the tables are created if they
+    do not exist yet.
+    """
+    sqlite_bundle_file_path = get_sqlite_bundle_file_path(output_directory_path)
+    sqlite_bundle_file_path.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{sqlite_bundle_file_path}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+class SqliteBundleWriter(CombinedOutputWriter):
+    """
+    Writes the flat AHBs of the unfolded AHBs into the sqlite bundle. Nothing is visible in the file before the writer
+    has been closed; if it is aborted, the transaction is rolled back.
+    """
+
+    def __init__(self, output_directory_path: Path, format_version: EdifactFormatVersion) -> None:
+        self.output_directory_path = output_directory_path
+        self.format_version = format_version
+        self._engine: Engine | None = None
+        self._connection: Connection | None = None
+        self._transaction: RootTransaction | None = None
+
+    def _get_connection(self) -> Connection:
+        """
+        Returns the connection to the sqlite bundle, in which the transaction is begun on first use.
+        """
+        if self._connection is None:
+            self._engine = create_sqlite_bundle_engine(self.output_directory_path)
+            self._connection = self._engine.connect()
+            self._transaction = self._connection.begin()
+        return self._connection
+
+    def add_unfolded_ahb(self, unfolded_ahb: UnfoldedAhb, flat_ahb: FlatAnwendungshandbuch | None = None) -> None:
+        """
+        Inserts the flat AHB of the unfolded AHB into the sqlite bundle (replacing the one of a previous run).
+        Raises a ValueError if the pruefidentifikator is not a valid one.
+        """
+        if flat_ahb is None:
+            flat_ahb = unfolded_ahb.convert_to_flat_ahb()
+        insert_flat_ahbs(self._get_connection(), [flat_ahb], self.format_version, replace_existing=True)
+        logger.info("The flat AHB of %s has been added to the sqlite bundle", unfolded_ahb.meta_data.pruefidentifikator)
+
+    def close(self) -> None:
+        """
+        Commits the transaction and closes the sqlite bundle.
+        """
+        self._end_transaction(commit=True)
+
+    def abort(self) -> None:
+        """
+        Rolls back the transaction and closes the sqlite bundle.
+        """
+        self._end_transaction(commit=False)
+
+    def _end_transaction(self, commit: bool) -> None:
+        """
+        Commits or rolls back the transaction (if it has been begun) and closes the connection.
+        """
+        if self._connection is None:
+            return
+        assert self._transaction is not None and self._engine is not None
+        try:
+            if commit:
+                self._transaction.commit()
+            else:
+                self._transaction.rollback()
+        finally:
+            self._connection.close()
+            self._engine.dispose()
+            self._connection = None
+            self._transaction = None
+            self._engine = None
+        if commit:
+            logger.info(
+                "The sqlite bundle is saved at %s", get_sqlite_bundle_file_path(self.output_directory_path).absolute()
+            )
+
+
+def write_conditions_to_sqlite_bundle(
+    output_directory_path: Path,
+    format_version: EdifactFormatVersion,
+    conditions_dict: dict[EdifactFormat, dict[str, str]],
+    package_dict: dict[EdifactFormat, dict[str, str]],
+) -> None:
+    """
+    Writes the conditions and packages of the EDIFACT formats into the sqlite bundle in a single transaction,
+    replacing those of a previous run.
+    """
+    engine = create_sqlite_bundle_engine(output_directory_path)
+    with engine.begin() as connection:
+        replace_conditions(connection, conditions_dict, format_version)
+        replace_packages(connection, package_dict, format_version)
+    engine.dispose()
+    logger.info(
+        "The conditions and packages are saved in the sqlite bundle at %s",
+        get_sqlite_bundle_file_path(output_directory_path).absolute(),
+    )
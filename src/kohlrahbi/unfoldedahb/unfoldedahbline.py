@@ -2,14 +2,17 @@
 This module contains the UnfoldedAhbLine class.
 """
 
-from pydantic import BaseModel
+from dataclasses import dataclass
 
 
-# pylint: disable=too-few-public-methods
-class UnfoldedAhbLine(BaseModel):
+# pylint: disable=too-few-public-methods, too-many-instance-attributes
+@dataclass(slots=True, kw_only=True)
+class UnfoldedAhbLine:
     """
     This class represents one unfolded line of the AHB.
     Unfolded means that we separate segment_name and segment_gruppe as well as code and qualifier
+    It is a plain (slotted) dataclass, because an AHB has thousands of lines, which are all created by kohlrahbi itself.
+    Pydantic does not validate them again when they are part of an UnfoldedAhb, but still (de)serializes them.
 
     Example:
 
@@ -2,38 +2,58 @@
 This module contains the UnfoldedAhbTable class.
 """
 
-import copy
-import json
+import hashlib
 import re
+from bisect import bisect_left
+from collections.abc import Iterator
+from enum import Enum, auto
 from functools import lru_cache
 from pathlib import Path
-from uuid import uuid4
+from typing import TYPE_CHECKING
+from uuid import UUID, uuid4
 
-import pandas as pd
-from efoli import EdifactFormat, get_format_of_pruefidentifikator
-from more_itertools import first_true, peekable
 from pydantic import BaseModel
 
 from kohlrahbi.ahbtable.ahbtable import AhbTable, _column_letter_width_mapping
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
 from kohlrahbi.logger import logger
-from kohlrahbi.models.anwendungshandbuch import AhbLine, AhbMetaInformation, FlatAnwendungshandbuch
+from kohlrahbi.models.anwendungshandbuch import (
+    TRUSTED_LINES_CONTEXT_KEY,
+    AhbLine,
+    AhbMetaInformation,
+    FlatAnwendungshandbuch,
+)
 from kohlrahbi.models.flat_ahb_reader import FlatAhbCsvReader
+from kohlrahbi.outputmanifest import get_manifest_file_path, get_output_file_path
 from kohlrahbi.unfoldedahb.unfoldedahbline import UnfoldedAhbLine
 from kohlrahbi.unfoldedahb.unfoldedahbtablemetadata import UnfoldedAhbTableMetaData
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 _segment_group_pattern = re.compile(r"^SG\d+$")
 _segment_id_pattern = re.compile(r"^\d{5}$")
 
+#: the columns of the exported CSV and XLSX files
+EXPORT_COLUMN_NAMES: tuple[str, ...] = (
+    "Segmentname",
+    "Segmentgruppe",
+    "Segment",
+    "Datenelement",
+    "Segment ID",
+    "Code",
+    "Qualifier",
+    "Beschreibung",
+    "Bedingungsausdruck",
+    "Bedingung",
+)
+
 
 def _lines_are_equal_when_ignoring_guid(line1: AhbLine, line2: AhbLine) -> bool:
     """
     returns true iff the line1 and line2 are equal except for their guid
     """
-    line1_copy = copy.deepcopy(line1)
-    line2_copy = copy.deepcopy(line2)
-    line1_copy.guid = None
-    line2_copy.guid = None
-    return line1_copy == line2_copy
+    return line1.get_fingerprint() == line2.get_fingerprint()
 
 
 @lru_cache
@@ -60,22 +80,100 @@ def _keep_guids_of_unchanged_lines_stable(
     """
     Modifies the instance of updated_ahb such that the guids of all lines that are unchanged are the same as in the
     existing_ahb. Only applies if metadata of both AHBs match.
+    For each updated line, the first unchanged existing line after the previous match is searched. The existing lines
+    are indexed by their fingerprint once, so that the lines do not have to be compared pairwise (which is O(n^2)).
+    """
+    if updated_ahb.meta != existing_ahb.meta:
+        return
+    existing_positions_by_fingerprint: dict[tuple[object, ...], list[int]] = {}
+    # the position of the first existing line that is equal to the existing line at a given position (incl. the guid)
+    first_positions_by_fingerprint_and_guid: dict[tuple[tuple[object, ...], UUID | None], int] = {}
+    for existing_index, existing_line in enumerate(existing_ahb.lines):
+        fingerprint = existing_line.get_fingerprint()
+        existing_positions_by_fingerprint.setdefault(fingerprint, []).append(existing_index)
+        first_positions_by_fingerprint_and_guid.setdefault((fingerprint, existing_line.guid), existing_index)
+
+    existing_ahb_search_start_index = 0
+    for updated_line in updated_ahb.lines:
+        fingerprint = updated_line.get_fingerprint()
+        existing_positions = existing_positions_by_fingerprint.get(fingerprint)
+        if existing_positions is None:
+            continue
+        position_index = bisect_left(existing_positions, existing_ahb_search_start_index)
+        if position_index == len(existing_positions):
+            continue
+        existing_line_match = existing_ahb.lines[existing_positions[position_index]]
+        updated_line.guid = existing_line_match.guid
+        # if we found a line match, we can start the next search at the next line in the next loop iteration
+        existing_ahb_search_start_index = (
+            first_positions_by_fingerprint_and_guid[(fingerprint, existing_line_match.guid)] + 1
+        )
+
+
+class _AhbRowKind(Enum):
+    """
+    The kind of a row of an AHB table, which decides how the row is unfolded (see `UnfoldedAhb.from_ahb_table`).
+    """
+
+    SECTION_NAME = auto()  #: only the column "Segment Gruppe" is filled, e.g. "Nachrichten-Kopfsegment"
+    SEGMENT_OPENING_LINE = auto()  #: a segment without data element, e.g. "SG3    CTA    Muss"
+    SEGMENT = auto()  #: the data element is a segment ID, e.g. "00009"
+    DATENELEMENT = auto()  #: e.g. "SG3    CTA    3139    IC    Informationskontakt"
+    VALUE_POOL_ENTRY = auto()  #: only a code and its description (w/o segment (group) and data element)
+    OTHER = auto()  #: e.g. a segment group without segment, which is not unfolded any further
+
+
+def _classify_ahb_rows(ahb_table: AhbTable) -> tuple[list[_AhbRowKind], list[bool]]:
     """
-    if updated_ahb.meta == existing_ahb.meta:
-        existing_ahb_search_start_index = 0
-        for update_index, updated_line in enumerate(updated_ahb.lines.copy()):
-            if (
-                existing_line_match := first_true(  # ⚠ performance wise this goes like O(n^2)
-                    existing_ahb.lines[existing_ahb_search_start_index:],
-                    pred=lambda x: _lines_are_equal_when_ignoring_guid(
-                        x,
-                        updated_line,  # noqa: B023 -- consumed synchronously within the same iteration
-                    ),
+    Returns the kind of each row of the AHB table and whether the row (which is no section name) opens a segment group.
+    The columns are read once for all rows, such that the rows need not be converted to dictionaries.
+    """
+    rows = ahb_table.rows.rows
+    segment_gruppe_index = ahb_table.rows.column_index("Segment Gruppe")
+    segment_index = ahb_table.rows.column_index("Segment")
+    datenelement_index = ahb_table.rows.column_index("Datenelement")
+    codes_und_qualifier_index = ahb_table.rows.column_index("Codes und Qualifier")
+    segment_gruppen = [row[segment_gruppe_index] for row in rows]
+    segment_values = [row[segment_index] for row in rows]
+    datenelemente = [row[datenelement_index] for row in rows]
+    codes_und_qualifier = [row[codes_und_qualifier_index] for row in rows]
+
+    row_kinds = [
+        (
+            # same as `AhbTable.line_contains_only_segment_gruppe`: all other values are empty or whitespace
+            _AhbRowKind.SECTION_NAME
+            if not segment.strip()
+            and not datenelement.strip()
+            and not code.strip()
+            and not "".join(row[:segment_gruppe_index]).strip()
+            and not "".join(row[segment_gruppe_index + 1 :]).strip()
+            else (
+                _AhbRowKind.SEGMENT_OPENING_LINE
+                if segment and not datenelement
+                else (
+                    _AhbRowKind.SEGMENT
+                    if datenelement and _segment_id_pattern.match(datenelement)
+                    else (
+                        _AhbRowKind.DATENELEMENT
+                        if datenelement
+                        else (
+                            _AhbRowKind.VALUE_POOL_ENTRY
+                            if not segment_gruppe and not segment and code
+                            else _AhbRowKind.OTHER
+                        )
+                    )
                 )
-            ):
-                updated_ahb.lines[update_index].guid = existing_line_match.guid
-                # if we found a line match, we can start the next search at the next line in the next loop iteration
-                existing_ahb_search_start_index = existing_ahb.lines.index(existing_line_match) + 1
+            )
+        )
+        for row, segment_gruppe, segment, datenelement, code in zip(
+            rows, segment_gruppen, segment_values, datenelemente, codes_und_qualifier, strict=True
+        )
+    ]
+    segment_group_rows = [
+        not segment and segment_gruppe.startswith("SG") and _segment_group_pattern.match(segment_gruppe) is not None
+        for segment_gruppe, segment in zip(segment_gruppen, segment_values, strict=True)
+    ]
+    return row_kinds, segment_group_rows
 
 
 class UnfoldedAhb(BaseModel):
@@ -97,107 +195,103 @@ class UnfoldedAhb(BaseModel):
         unfolded_ahb_lines: list[UnfoldedAhbLine] = []
         current_section_name: str = ""
         current_segment_id: str | None = None
-        # we need to peek one iteration in front of us
-        iterable_ahb_table = peekable(ahb_table.table.iterrows())
-
-        for index, series in enumerate(iterable_ahb_table):
-            row = series[1]
 
-            current_section_name = UnfoldedAhb._get_section_name(
-                segment_gruppe_or_section_name=row["Segment Gruppe"], last_section_name=current_section_name
-            )
+        segment_gruppe_index = ahb_table.rows.column_index("Segment Gruppe")
+        segment_index = ahb_table.rows.column_index("Segment")
+        datenelement_index = ahb_table.rows.column_index("Datenelement")
+        codes_und_qualifier_index = ahb_table.rows.column_index("Codes und Qualifier")
+        beschreibung_index = ahb_table.rows.column_index("Beschreibung")
+        bedingung_index = ahb_table.rows.column_index("Bedingung")
+        pruefi_index = ahb_table.rows.column_index(pruefi)
+        row_kinds, segment_group_rows = _classify_ahb_rows(ahb_table)
+
+        for index, (row, row_kind, is_segment_group) in enumerate(
+            zip(ahb_table.rows.rows, row_kinds, segment_group_rows, strict=True)
+        ):
+            segment_gruppe = row[segment_gruppe_index]
+            if not (segment_gruppe.startswith("SG") or segment_gruppe == ""):
+                current_section_name = segment_gruppe
 
-            if UnfoldedAhb._is_section_name(ahb_row=row):
+            if row_kind is _AhbRowKind.SECTION_NAME:
                 current_segment_id = None
                 continue
 
-            if UnfoldedAhb._is_segment_group(ahb_row=row):
+            if is_segment_group:
                 value_pool_entry, description = FlatAhbCsvReader.separate_value_pool_entry_and_name(
-                    row["Codes und Qualifier"], row["Beschreibung"]
+                    row[codes_und_qualifier_index], row[beschreibung_index]
                 )
                 unfolded_ahb_lines.append(
                     UnfoldedAhbLine(
                         index=index,
                         segment_name=current_section_name,
-                        segment_gruppe=row["Segment Gruppe"] or None,
-                        segment=row["Segment"] or None,
-                        datenelement=row["Datenelement"] or None,
+                        segment_gruppe=segment_gruppe or None,
+                        segment=row[segment_index] or None,
+                        datenelement=row[datenelement_index] or None,
                         code=value_pool_entry,
                         qualifier="",
                         beschreibung=description,
-                        bedingung_ausdruck=row[pruefi] or None,
-                        bedingung=row["Bedingung"],
+                        bedingung_ausdruck=row[pruefi_index] or None,
+                        bedingung=row[bedingung_index],
                         segment_id=current_segment_id,
                     )
                 )
 
-            if UnfoldedAhb._is_segment_opening_line(ahb_row=row):
-                current_segment_id = row["Segment ID"] or None
+            if row_kind is _AhbRowKind.SEGMENT_OPENING_LINE:
+                current_segment_id = row[ahb_table.rows.column_index("Segment ID")] or None
                 unfolded_ahb_lines.append(
                     UnfoldedAhbLine(
                         index=index,
                         segment_name=current_section_name,
-                        segment_gruppe=row["Segment Gruppe"] or None,
-                        segment=row["Segment"] or None,
+                        segment_gruppe=segment_gruppe or None,
+                        segment=row[segment_index] or None,
                         datenelement=None,
                         code=None,
                         qualifier="",
                         beschreibung=None,
-                        bedingung_ausdruck=row[pruefi] or None,
-                        bedingung=row["Bedingung"],
+                        bedingung_ausdruck=row[pruefi_index] or None,
+                        bedingung=row[bedingung_index],
                         segment_id=current_segment_id,
                     )
                 )
-                continue
-
-            if UnfoldedAhb._is_just_segment(ahb_row=row):
+            elif row_kind is _AhbRowKind.SEGMENT:
                 value_pool_entry, description = FlatAhbCsvReader.separate_value_pool_entry_and_name(
-                    row["Codes und Qualifier"], row["Beschreibung"]
+                    row[codes_und_qualifier_index], row[beschreibung_index]
                 )
                 unfolded_ahb_lines.append(
                     UnfoldedAhbLine(
                         index=index,
                         segment_name=current_section_name,
-                        segment_gruppe=row["Segment Gruppe"] or None,
-                        segment=row["Segment"] or None,
-                        datenelement=_split_data_element_and_segment_id(row["Datenelement"])[0],
+                        segment_gruppe=segment_gruppe or None,
+                        segment=row[segment_index] or None,
+                        datenelement=_split_data_element_and_segment_id(row[datenelement_index])[0],
                         segment_id=current_segment_id,
                         code=value_pool_entry,
                         qualifier="",
                         beschreibung=description,
-                        bedingung_ausdruck=row[pruefi] or None,
-                        bedingung=row["Bedingung"],
+                        bedingung_ausdruck=row[pruefi_index] or None,
+                        bedingung=row[bedingung_index],
                     )
                 )
-                continue
-
-            if UnfoldedAhb._is_dataelement(ahb_row=row):
+            elif row_kind is _AhbRowKind.DATENELEMENT:
                 value_pool_entry, description = FlatAhbCsvReader.separate_value_pool_entry_and_name(
-                    row["Codes und Qualifier"], row["Beschreibung"]
+                    row[codes_und_qualifier_index], row[beschreibung_index]
                 )
-
-                if _segment_group_pattern.match(row["Segment Gruppe"]):
-                    segment_group_key = row["Segment Gruppe"]
-                else:
-                    segment_group_key = None
-
                 unfolded_ahb_lines.append(
                     UnfoldedAhbLine(
                         index=index,
                         segment_name=current_section_name,
-                        segment_gruppe=segment_group_key,
-                        segment=row["Segment"] or None,
-                        datenelement=row["Datenelement"] or None,
+                        segment_gruppe=segment_gruppe if _segment_group_pattern.match(segment_gruppe) else None,
+                        segment=row[segment_index] or None,
+                        datenelement=row[datenelement_index] or None,
                         code=value_pool_entry,
                         qualifier="",
                         beschreibung=description,
-                        bedingung_ausdruck=row[pruefi] or None,
-                        bedingung=row["Bedingung"],
+                        bedingung_ausdruck=row[pruefi_index] or None,
+                        bedingung=row[bedingung_index],
                         segment_id=current_segment_id,
                     )
                 )
-                continue
-            if any(unfolded_ahb_lines) and UnfoldedAhb._is_just_value_pool_entry(ahb_row=row):
+            elif row_kind is _AhbRowKind.VALUE_POOL_ENTRY and unfolded_ahb_lines:
                 unfolded_ahb_lines.append(
                     UnfoldedAhbLine(
                         index=index,
@@ -205,11 +299,11 @@ class UnfoldedAhb(BaseModel):
                         segment_gruppe=unfolded_ahb_lines[-1].segment_gruppe,
                         segment=unfolded_ahb_lines[-1].segment,
                         datenelement=unfolded_ahb_lines[-1].datenelement,
-                        code=row["Codes und Qualifier"],
+                        code=row[codes_und_qualifier_index],
                         qualifier="",
-                        beschreibung=row["Beschreibung"],
-                        bedingung_ausdruck=row[pruefi] or None,
-                        bedingung=row["Bedingung"],
+                        beschreibung=row[beschreibung_index],
+                        bedingung_ausdruck=row[pruefi_index] or None,
+                        bedingung=row[bedingung_index],
                     )
                 )
 
@@ -227,86 +321,6 @@ class UnfoldedAhb(BaseModel):
             ),
         )
 
-    @staticmethod
-    def _get_section_name(segment_gruppe_or_section_name: str, last_section_name: str) -> str:
-        """
-        This function reads the section name if there is one.
-        If the given string 'segment_gruppe_or_section_name' does not contain a section name,
-        the 'last_section_name' will be returned.
-        """
-        if not (segment_gruppe_or_section_name.startswith("SG") or segment_gruppe_or_section_name == ""):
-            return segment_gruppe_or_section_name
-        return last_section_name
-
-    @staticmethod
-    def _is_section_name(ahb_row: pd.Series) -> bool:
-        """
-        Checks if the current AHB row is a section name.
-        It uses the same logic as the function 'line_contains_only_segment_gruppe'
-        So to avoid duplicate code, this function just calls the other function.
-        """
-        return AhbTable.line_contains_only_segment_gruppe(ahb_row)
-
-    @staticmethod
-    def _is_segment_group(ahb_row: pd.Series) -> bool:
-        """Checks if the current AHB row is a segment group."""
-
-        if _segment_group_pattern.match(ahb_row["Segment Gruppe"]) and not ahb_row["Segment"]:
-            return True
-        return False
-
-    @staticmethod
-    def _is_segment_opening_line(ahb_row: pd.Series) -> bool:
-        """Checks if the current AHB row is a segment opening line.
-        Example:
-
-        SG3    CTA                                         Muss    Muss    Muss
-        SG3    CTA    3139    IC    Informationskontakt    X       X       X
-
-        The first line in the example is a segment opening line
-        """
-
-        if ahb_row["Segment"] and not ahb_row["Datenelement"]:
-            return True
-        return False
-
-    @staticmethod
-    def _is_just_segment(ahb_row: pd.Series) -> bool:
-        """
-        Checks if the given AHB row is a segment
-        """
-
-        if (
-            _segment_group_pattern.match(ahb_row["Segment Gruppe"])
-            and ahb_row["Segment"]
-            and not ahb_row["Datenelement"]
-        ):
-            return True
-        if ahb_row["Datenelement"] is not None and _segment_id_pattern.match(ahb_row["Datenelement"]):
-            return True
-        return False
-
-    @staticmethod
-    def _is_dataelement(ahb_row: pd.Series) -> bool:
-        """
-        Checks if the given AHB row is a dataelement
-        """
-        if ahb_row["Datenelement"]:
-            return True
-        return False
-
-    @staticmethod
-    def _is_just_value_pool_entry(ahb_row: pd.Series) -> bool:
-        """
-        Checks if the given AHB row contains only a value pool entry (w/o Segment (group) and data element)
-        """
-        return (
-            (not ahb_row["Segment Gruppe"])
-            and (not ahb_row["Segment"])
-            and (not ahb_row["Datenelement"])
-            and ahb_row["Codes und Qualifier"]
-        )
-
     def convert_to_flat_ahb(self) -> FlatAnwendungshandbuch:
         """
         Converts the unfolded AHB to a flat AHB.
@@ -316,27 +330,26 @@ class UnfoldedAhb(BaseModel):
             description=self.meta_data.beschreibung,
             direction=self.meta_data.kommunikation_von,
         )
-        lines: list[AhbLine] = []
-
-        for unfolded_ahb_line in self.unfolded_ahb_lines:
-            if _line_is_flatahb_line(unfolded_ahb_line):
-                lines.append(
-                    AhbLine(
-                        guid=uuid4(),
-                        segment_group_key=unfolded_ahb_line.segment_gruppe,
-                        segment_code=unfolded_ahb_line.segment,
-                        data_element=unfolded_ahb_line.datenelement,
-                        segment_id=unfolded_ahb_line.segment_id,
-                        value_pool_entry=unfolded_ahb_line.code,
-                        name=unfolded_ahb_line.beschreibung or unfolded_ahb_line.qualifier,
-                        ahb_expression=unfolded_ahb_line.bedingung_ausdruck,
-                        conditions=unfolded_ahb_line.bedingung,
-                        section_name=unfolded_ahb_line.segment_name,
-                        index=unfolded_ahb_line.index,
-                    )
-                )
+        # the lines are validated all at once (together with the flat AHB) instead of one by one
+        lines: list[dict[str, object]] = [
+            {
+                "guid": uuid4(),
+                "segment_group_key": unfolded_ahb_line.segment_gruppe,
+                "segment_code": unfolded_ahb_line.segment,
+                "data_element": unfolded_ahb_line.datenelement,
+                "segment_id": unfolded_ahb_line.segment_id,
+                "value_pool_entry": unfolded_ahb_line.code,
+                "name": unfolded_ahb_line.beschreibung or unfolded_ahb_line.qualifier,
+                "ahb_expression": unfolded_ahb_line.bedingung_ausdruck,
+                "conditions": unfolded_ahb_line.bedingung,
+                "section_name": unfolded_ahb_line.segment_name,
+                "index": unfolded_ahb_line.index,
+            }
+            for unfolded_ahb_line in self.unfolded_ahb_lines
+            if _line_is_flatahb_line(unfolded_ahb_line)
+        ]
         try:
-            return FlatAnwendungshandbuch(meta=meta, lines=lines)
+            return FlatAnwendungshandbuch.model_validate({"meta": meta, "lines": lines})
         except ValueError:
             logger.error(
                 "Could not convert the unfolded AHB to a flat AHB for Prüfidentifikator '%s'",
@@ -344,19 +357,34 @@ class UnfoldedAhb(BaseModel):
             )
             raise
 
+    def get_content_digest(self) -> str:
+        """
+        returns the SHA-256 hex digest of the unfolded AHB.
+        All export formats are derived from the unfolded AHB. Hence, the files written from unfolded AHBs with the same
+        digest are the same (except for the guids of the flat AHB lines, which are kept stable anyway).
+        """
+        return hashlib.sha256(self.model_dump_json().encode("utf-8")).hexdigest()
+
+    def get_manifest_file_path(self, output_directory_path: Path) -> Path:
+        """
+        returns the filepath to where the output manifest (see `kohlrahbi.outputmanifest`) of this AHB is stored
+        raises a value error when the pruefidentifikator is not a valid one
+        """
+        return get_manifest_file_path(output_directory_path, self.meta_data.pruefidentifikator)
+
     def get_flatahb_json_file_path(self, output_directory_path: Path) -> Path:
         """
         returns the filepath to where the flat ahb json will be dumped when using dump_flatahb_json()
         raises a value error when the pruefidentifikator is not a valid one
         """
-        edifact_format = self._get_format()
-        flatahb_output_directory_path = output_directory_path / str(edifact_format) / "flatahb"
-        file_path = flatahb_output_directory_path / f"{self.meta_data.pruefidentifikator}.json"
-        return file_path
+        return get_output_file_path(
+            output_directory_path, self.meta_data.pruefidentifikator, AhbExportFileFormat.FLATAHB
+        )
 
-    def dump_flatahb_json(self, output_directory_path: Path) -> None:
+    def dump_flatahb_json(self, output_directory_path: Path, flat_ahb: FlatAnwendungshandbuch | None = None) -> None:
         """
-        Converts the unfolded AHB to a flat AHB and writes it to a json file.
+        Converts the unfolded AHB to a flat AHB (unless its flat AHB is given) and writes it to a json file.
+        The guids of the given flat AHB may be changed (see `_keep_guids_of_unchanged_lines_stable`).
         The file will be stored in the directory:
             'output_directory_path/<edifact_format>/flatahb/<pruefidentifikator>.json'
         """
@@ -366,46 +394,53 @@ class UnfoldedAhb(BaseModel):
             return
         flatahb_directory = file_path.parent
         flatahb_directory.mkdir(parents=True, exist_ok=True)
-        flat_ahb = self.convert_to_flat_ahb()
+        if flat_ahb is None:
+            flat_ahb = self.convert_to_flat_ahb()
         if file_path.exists():
             with open(file_path, encoding="utf-8") as file:
                 file_content = file.read()
-                existing_flat_ahb = FlatAnwendungshandbuch.model_validate_json(file_content)
+                # the existing file has been written (and checked) by kohlrahbi; only its guids are needed
+                existing_flat_ahb = FlatAnwendungshandbuch.model_validate_json(
+                    file_content, context={TRUSTED_LINES_CONTEXT_KEY: True}
+                )
             _keep_guids_of_unchanged_lines_stable(flat_ahb, existing_flat_ahb)
-        json_dict = flat_ahb.model_dump(mode="json")
         with open(file_path, "w", encoding="utf-8") as file:
-            json.dump(json_dict, file, ensure_ascii=False, indent=2, sort_keys=True)
+            file.write(flat_ahb.dump_sorted_json())
         logger.info(
             "The flatahb file for %s is saved at %s",
             self.meta_data.pruefidentifikator,
             file_path.absolute(),
         )
         del flat_ahb
-        del json_dict
         if "existing_flat_ahb" in locals():
             del existing_flat_ahb
 
-    def convert_to_dataframe(self) -> pd.DataFrame:
+    def iter_export_rows(self) -> Iterator[tuple[str | None, ...]]:
+        """
+        Yields the values of the lines which are exported (as CSV or XLSX), in the order of `EXPORT_COLUMN_NAMES`.
+        """
+        for unfolded_ahb_line in self.unfolded_ahb_lines:
+            if _line_is_flatahb_line(unfolded_ahb_line):
+                yield (
+                    unfolded_ahb_line.segment_name,
+                    unfolded_ahb_line.segment_gruppe,
+                    unfolded_ahb_line.segment,
+                    unfolded_ahb_line.datenelement,
+                    unfolded_ahb_line.segment_id,
+                    unfolded_ahb_line.code,
+                    unfolded_ahb_line.qualifier,
+                    unfolded_ahb_line.beschreibung,
+                    unfolded_ahb_line.bedingung_ausdruck,
+                    unfolded_ahb_line.bedingung,
+                )
+
+    def convert_to_dataframe(self) -> "pd.DataFrame":
         """
         Converts the unfolded AHB to a pandas dataframe.
         """
-        unfolded_ahb_lines = [
-            {
-                "Segmentname": unfolded_ahb_line.segment_name,
-                "Segmentgruppe": unfolded_ahb_line.segment_gruppe,
-                "Segment": unfolded_ahb_line.segment,
-                "Datenelement": unfolded_ahb_line.datenelement,
-                "Segment ID": unfolded_ahb_line.segment_id,
-                "Code": unfolded_ahb_line.code,
-                "Qualifier": unfolded_ahb_line.qualifier,
-                "Beschreibung": unfolded_ahb_line.beschreibung,
-                "Bedingungsausdruck": unfolded_ahb_line.bedingung_ausdruck,
-                "Bedingung": unfolded_ahb_line.bedingung,
-            }
-            for unfolded_ahb_line in self.unfolded_ahb_lines
-            if _line_is_flatahb_line(unfolded_ahb_line)
-        ]
+        import pandas as pd  # noqa: PLC0415 -- pandas is only needed for the export
 
+        unfolded_ahb_lines = [dict(zip(EXPORT_COLUMN_NAMES, row, strict=True)) for row in self.iter_export_rows()]
         df = pd.DataFrame(unfolded_ahb_lines)
         df.fillna(value="", inplace=True)
         return df
@@ -415,10 +450,7 @@ class UnfoldedAhb(BaseModel):
         returns the filepath to where the CSV will be dumped when using dump_csv()
         raises a value error when the pruefidentifikator is not a valid one
         """
-        edifact_format = self._get_format()
-        csv_output_directory_path = output_directory_path / str(edifact_format) / "csv"
-        file_path = csv_output_directory_path / f"{self.meta_data.pruefidentifikator}.csv"
-        return file_path
+        return get_output_file_path(output_directory_path, self.meta_data.pruefidentifikator, AhbExportFileFormat.CSV)
 
     def dump_csv(self, path_to_output_directory: Path) -> None:
         """
@@ -438,23 +470,12 @@ class UnfoldedAhb(BaseModel):
         logger.info("The csv file for %s is saved at %s", self.meta_data.pruefidentifikator, csv_file_path.absolute())
         del df
 
-    def _get_format(self) -> EdifactFormat:
-        """extract the edifact format from the metadata pruefidentifikator"""
-        edifact_format = get_format_of_pruefidentifikator(self.meta_data.pruefidentifikator)
-        if edifact_format is None:
-            logger.warning("'%s' is not a pruefidentifikator", self.meta_data.pruefidentifikator)
-            raise ValueError(f"'{self.meta_data.pruefidentifikator}' is not a pruefidentifikator")
-        return edifact_format
-
     def get_xlsx_file_path(self, output_directory_path: Path) -> Path:
         """
         returns the filepath to where the xlsx will be dumped when using dump_xlsx()
         raises a value error when the pruefidentifikator is not a valid one
         """
-        edifact_format = self._get_format()
-        xlsx_output_directory_path: Path = output_directory_path / str(edifact_format) / "xlsx"
-        file_path = xlsx_output_directory_path / f"{self.meta_data.pruefidentifikator}.xlsx"
-        return file_path
+        return get_output_file_path(output_directory_path, self.meta_data.pruefidentifikator, AhbExportFileFormat.XLSX)
 
     def dump_xlsx(self, path_to_output_directory: Path) -> None:
         """
@@ -470,6 +491,8 @@ class UnfoldedAhb(BaseModel):
         xlsx_output_directory_path.mkdir(parents=True, exist_ok=True)
 
         df = self.convert_to_dataframe()
+        import pandas as pd  # noqa: PLC0415 -- pandas is only needed for the export
+
         try:
             # https://github.com/PyCQA/pylint/issues/3060
             # pylint: disable=abstract-class-instantiated
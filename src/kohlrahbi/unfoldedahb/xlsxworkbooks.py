@@ -0,0 +1,110 @@
+"""
+This module provides the export of the unfolded AHBs of all Prüfidentifikatoren of an EDIFACT format into one xlsx
+workbook with one worksheet per Prüfidentifikator (as an alternative to one xlsx file per Prüfidentifikator).
+The workbooks are written in the constant_memory mode of xlsxwriter: each row is flushed to a temporary file as soon as
+the next row is written. Hence, the memory does not grow with the number of Prüfidentifikatoren in the workbooks.
+"""
+
+from pathlib import Path
+from typing import Any
+
+from efoli import EdifactFormat, get_format_of_pruefidentifikator
+from xlsxwriter import Workbook  # type: ignore[import-untyped]
+
+from kohlrahbi.ahbtable.ahbtable import _column_letter_width_mapping
+from kohlrahbi.logger import logger
+from kohlrahbi.models.anwendungshandbuch import FlatAnwendungshandbuch
+from kohlrahbi.unfoldedahb.combinedoutput import CombinedOutputWriter
+from kohlrahbi.unfoldedahb.unfoldedahbtable import EXPORT_COLUMN_NAMES, UnfoldedAhb
+
+#: the file name of the workbook in the directory of each EDIFACT format
+XLSX_WORKBOOK_FILE_NAME = "ahbs.xlsx"
+
+# the header and the index are formatted like those of a dataframe exported with `to_excel`
+_HEADER_FORMAT_PROPERTIES = {"bold": True, "border": 1, "align": "center", "valign": "top"}
+
+
+def get_xlsx_workbook_file_path(output_directory_path: Path, edifact_format: EdifactFormat) -> Path:
+    """
+    Returns the path of the workbook of the given EDIFACT format, i.e.
+    'output_directory_path/<edifact_format>/ahbs.xlsx'.
+    """
+    return output_directory_path / str(edifact_format) / XLSX_WORKBOOK_FILE_NAME
+
+
+class XlsxWorkbookPerFormatWriter(CombinedOutputWriter):
+    """
+    Writes the unfolded AHBs into one workbook per EDIFACT format. The workbooks are only complete after `close` has
+    been called, so use the writer as context manager.
+    The worksheets are written in the order in which the unfolded AHBs are added. Like the xlsx file per
+    Prüfidentifikator, each worksheet is named after its Prüfidentifikator and contains the columns of the CSV export.
+    """
+
+    def __init__(self, output_directory_path: Path) -> None:
+        self.output_directory_path = output_directory_path
+        self._workbooks: dict[EdifactFormat, Workbook] = {}
+        # the header format and the wrap format of each workbook
+        self._cell_formats: dict[EdifactFormat, tuple[Any, Any]] = {}
+
+    def _get_workbook(self, edifact_format: EdifactFormat) -> Workbook:
+        """
+        Returns the workbook of the given EDIFACT format, which is created on first use.
+        """
+        workbook = self._workbooks.get(edifact_format)
+        if workbook is None:
+            workbook_file_path = get_xlsx_workbook_file_path(self.output_directory_path, edifact_format)
+            workbook_file_path.parent.mkdir(parents=True, exist_ok=True)
+            workbook = Workbook(workbook_file_path, {"constant_memory": True})
+            self._workbooks[edifact_format] = workbook
+            self._cell_formats[edifact_format] = (
+                workbook.add_format(_HEADER_FORMAT_PROPERTIES),
+                workbook.add_format({"text_wrap": True}),
+            )
+        return workbook
+
+    def add_unfolded_ahb(
+        self,
+        unfolded_ahb: UnfoldedAhb,
+        flat_ahb: FlatAnwendungshandbuch | None = None,  # pylint: disable=unused-argument
+    ) -> None:
+        """
+        Writes the unfolded AHB into a new worksheet of the workbook of its EDIFACT format (the flat AHB is not needed).
+        Raises a ValueError if the pruefidentifikator is not a valid one.
+        """
+        pruefidentifikator = unfolded_ahb.meta_data.pruefidentifikator
+        edifact_format = get_format_of_pruefidentifikator(pruefidentifikator)
+        if edifact_format is None:
+            raise ValueError(f"'{pruefidentifikator}' is not a pruefidentifikator")
+        worksheet = self._get_workbook(edifact_format).add_worksheet(pruefidentifikator)
+        header_format, wrap_format = self._cell_formats[edifact_format]
+        for column_letter, column_width in _column_letter_width_mapping.items():
+            worksheet.set_column(f"{column_letter}:{column_letter}", column_width, wrap_format)
+        # in constant_memory mode, the rows have to be written in order
+        worksheet.write_row(0, 1, EXPORT_COLUMN_NAMES, header_format)
+        for row_index, row in enumerate(unfolded_ahb.iter_export_rows()):
+            worksheet.write_number(row_index + 1, 0, row_index, header_format)
+            for column_index, value in enumerate(row, start=1):
+                if value:
+                    worksheet.write_string(row_index + 1, column_index, value)
+        logger.info("The xlsx worksheet for %s has been written", pruefidentifikator)
+
+    def close(self) -> None:
+        """
+        Closes (i.e. saves) all workbooks.
+        """
+        for edifact_format, workbook in self._workbooks.items():
+            workbook.close()
+            logger.info(
+                "The xlsx workbook for %s is saved at %s",
+                edifact_format,
+                get_xlsx_workbook_file_path(self.output_directory_path, edifact_format).absolute(),
+            )
+        self._workbooks.clear()
+        self._cell_formats.clear()
+
+    def abort(self) -> None:
+        """
+        Discards all workbooks. The workbook files are only written by `close`, so the existing ones are kept.
+        """
+        self._workbooks.clear()
+        self._cell_formats.clear()
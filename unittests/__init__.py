@@ -23,6 +23,8 @@ def strip_ansi(text: str) -> str:
 
 path_to_test_edi_energy_mirror_repo: Path = Path(__file__).parent / "test-edi-energy-mirror-repo"
 path_to_test_files_fv2310 = path_to_test_edi_energy_mirror_repo / "edi_energy_de" / Path("FV2310")
+#: a small AHB docx file, from whose Prüfidentifikatoren e.g. the tests of the output formats create their outputs
+path_to_orders_ahb_docx_file = next(path_to_test_files_fv2310.glob("ORDERSORDRSPAHBMaBiS*.docx"))
 # list of pruefis to check against in test_current_state
 # One representative pruefi per EDIFACT format for regression testing.
 # This keeps the test suite fast while covering all formats.
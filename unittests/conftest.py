@@ -4,6 +4,10 @@ import docx
 import docx.table
 import pytest
 
+from kohlrahbi.docxbodycache import read_document_body
+from kohlrahbi.read_functions import get_ahb_tables
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+from unittests import path_to_orders_ahb_docx_file
 from unittests.cellparagraph import CellParagraph
 
 
@@ -22,6 +26,24 @@ def _disable_rich_color(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("NO_COLOR", "1")
 
 
+@pytest.fixture(name="pruefis", scope="session")
+def pruefis_fixture() -> list[str]:
+    """
+    the Prüfidentifikatoren of the `unfolded_ahbs`
+    """
+    return ["17201", "17202", "17203"]
+
+
+@pytest.fixture(name="unfolded_ahbs", scope="session")
+def unfolded_ahbs_fixture(pruefis: list[str]) -> list[UnfoldedAhb]:
+    """
+    the unfolded AHBs of the `pruefis` from the ORDERS AHB docx file (in the order of the `pruefis`)
+    """
+    document_body = read_document_body(path_to_orders_ahb_docx_file)
+    ahb_tables = get_ahb_tables(document=document_body, pruefis=pruefis)
+    return [UnfoldedAhb.from_ahb_table(ahb_table=ahb_tables[pruefi], pruefi=pruefi) for pruefi in pruefis]
+
+
 @pytest.fixture
 def get_ahb_table_with_multiple_paragraphs() -> Callable[[list[CellParagraph]], docx.table.Table]:
     def _setup_ahb_table(body_cell_paragraphs: list[CellParagraph]) -> docx.table.Table:
@@ -1,10 +1,24 @@
+import threading
 from pathlib import Path
+from typing import Any
 
 import pytest
 from freezegun import freeze_time
 
-from kohlrahbi.ahb import find_pruefidentifikatoren, get_ahb_documents_path, save_pruefi_map_to_toml
-from unittests import path_to_test_edi_energy_mirror_repo, path_to_test_files_fv2310
+from kohlrahbi import ahb
+from kohlrahbi.ahb import (
+    AhbDocxFileScrapingResult,
+    find_pruefidentifikatoren,
+    get_ahb_documents_path,
+    group_pruefis_by_file,
+    list_files_in_subdirs,
+    outputwriter,
+    process_docx_files,
+    save_pruefi_map_to_toml,
+)
+from kohlrahbi.docxbodycache import CachedDocumentBody, get_sha256_of_file, load_cached_document_body
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from unittests import path_to_orders_ahb_docx_file, path_to_test_edi_energy_mirror_repo, path_to_test_files_fv2310
 
 
 @pytest.mark.snapshot
@@ -47,3 +61,89 @@ class TestAhb:
             actual_pruefi_map = f.read()
         assert actual_pruefi_map == expected_pruefi_map
         expected_output_path.unlink()
+
+    def test_list_files_in_subdirs_omits_combined_outputs(self, tmp_path: Path) -> None:
+        output_file_paths = [
+            tmp_path / "ORDERS" / "flatahb" / "17201.json",
+            tmp_path / "ORDERS" / "ahbs.xlsx",
+            tmp_path / "ahbs.sqlite",
+            tmp_path / "ahb_lines" / "edifact_format=ORDERS" / "ahb_lines.parquet",
+            tmp_path / "ahb_lines" / "edifact_format=ORDERS" / ".ahb_lines.parquet.tmp",
+        ]
+        for output_file_path in output_file_paths:
+            output_file_path.parent.mkdir(parents=True, exist_ok=True)
+            output_file_path.touch()
+
+        assert list_files_in_subdirs(tmp_path) == [("17201", output_file_paths[0])]
+
+    def test_group_pruefis_by_file(self) -> None:
+        """
+        test group_pruefis_by_file.
+        """
+        pruefi_to_file_mapping = {
+            "17201": "file1.docx",
+            "29001": "file2.docx",
+            "17202": "file1.docx",
+            "37001": "",
+        }
+        assert group_pruefis_by_file(pruefi_to_file_mapping) == {
+            "file1.docx": ["17201", "17202"],
+            "file2.docx": ["29001"],
+        }
+
+    @pytest.mark.parametrize("workers", [pytest.param(1, id="sequential"), pytest.param(2, id="parallel")])
+    def test_process_docx_files(self, workers: int, tmp_path: Path) -> None:
+        """
+        test process_docx_files with and without a process pool.
+        """
+        comdis_docx_file = next(path_to_test_files_fv2310.glob("COMDISAHB*.docx"))
+        orders_docx_file = path_to_orders_ahb_docx_file
+        missing_docx_file = path_to_test_files_fv2310 / "missing.docx"
+        pruefis_by_docx_file = {
+            comdis_docx_file: ["29001", "29002"],
+            orders_docx_file: ["17201"],
+            missing_docx_file: ["99999"],
+        }
+
+        outcomes = dict(process_docx_files(pruefis_by_docx_file, tmp_path, (AhbExportFileFormat.CSV,), workers=workers))
+
+        assert outcomes.keys() == pruefis_by_docx_file.keys()
+        assert outcomes[comdis_docx_file] == AhbDocxFileScrapingResult(
+            processed=["29001", "29002"], source_docx_sha256=get_sha256_of_file(comdis_docx_file)
+        )
+        assert outcomes[orders_docx_file] == AhbDocxFileScrapingResult(
+            processed=["17201"], source_docx_sha256=get_sha256_of_file(orders_docx_file)
+        )
+        assert isinstance(outcomes[missing_docx_file], Exception)
+        assert sorted(path.stem for path in tmp_path.rglob("*.csv")) == ["17201", "29001", "29002"]
+
+    def test_process_docx_files_writes_while_the_next_docx_file_is_read(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        test that the files of a docx file are written while the next docx file is read, i.e. that the output writer
+        does not wait at the boundary of two docx files.
+        """
+        comdis_docx_file = next(path_to_test_files_fv2310.glob("COMDISAHB*.docx"))
+        orders_docx_file = path_to_orders_ahb_docx_file
+        orders_docx_file_is_read = threading.Event()
+        written_after_orders_docx_file_is_read: list[bool] = []
+
+        def _load_cached_document_body(path: Path) -> CachedDocumentBody:
+            if path == orders_docx_file:
+                orders_docx_file_is_read.set()
+            return load_cached_document_body(path)
+
+        def _write_unfolded_ahb(*args: Any) -> None:
+            written_after_orders_docx_file_is_read.append(orders_docx_file_is_read.wait(timeout=10))
+            write_unfolded_ahb(*args)
+
+        write_unfolded_ahb = outputwriter.write_unfolded_ahb
+        monkeypatch.setattr(ahb, "load_cached_document_body", _load_cached_document_body)
+        monkeypatch.setattr(outputwriter, "write_unfolded_ahb", _write_unfolded_ahb)
+        pruefis_by_docx_file = {comdis_docx_file: ["29001"], orders_docx_file: ["17201"]}
+
+        outcomes = dict(process_docx_files(pruefis_by_docx_file, tmp_path, (AhbExportFileFormat.CSV,)))
+
+        assert all(isinstance(outcome, AhbDocxFileScrapingResult) for outcome in outcomes.values())
+        assert written_after_orders_docx_file_is_read == [True, True]
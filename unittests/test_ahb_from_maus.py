@@ -592,6 +592,22 @@ class TestAhb:
         actual = FlatAnwendungshandbuch._sorted_lines_by_segment_groups(unsorted_input, sg_order)
         assert actual == expected_result
 
+    def test_sorted_segment_groups_with_missing_segment_group(self) -> None:
+        lines = [
+            AhbLine(
+                segment_group_key=segment_group_key,
+                guid=None,
+                segment_code=None,
+                data_element=None,
+                value_pool_entry=None,
+                ahb_expression=None,
+                name=None,
+            )
+            for segment_group_key in ["Foo", "Bar"]
+        ]
+        with pytest.raises(ValueError, match="'Bar'"):
+            FlatAnwendungshandbuch._sorted_lines_by_segment_groups(lines, ["Foo"])
+
     @pytest.mark.parametrize(
         "original,expected",
         [
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer
+
+
+class TestAhbRowBuffer:
+    """
+    All tests regarding the AhbRowBuffer class
+    """
+
+    def test_to_dataframe_equals_dataframe_built_row_by_row(self) -> None:
+        columns = ["Segment Gruppe", "Segment", "Beschreibung", "Bedingung"]
+        ahb_rows = AhbRowBuffer(columns=columns)
+        ahb_rows.append_empty_row()
+        ahb_rows.set(ahb_rows.last_row_index, "Segment", "UNH")
+        ahb_rows.append_empty_row()
+        ahb_rows.set(ahb_rows.last_row_index, "Bedingung", "[1]")
+
+        expected = pd.DataFrame(columns=columns, dtype="str")
+        for row in ahb_rows.rows:
+            expected = pd.concat([expected, pd.DataFrame([row], columns=columns, dtype="str")], ignore_index=True)
+
+        actual = ahb_rows.to_dataframe()
+
+        assert actual.equals(expected)
+        assert actual.dtypes.equals(expected.dtypes)
+
+    def test_empty_buffer_to_dataframe(self) -> None:
+        columns = ["Segment Gruppe", "Segment"]
+        actual = AhbRowBuffer(columns=columns).to_dataframe()
+        assert actual.equals(pd.DataFrame(columns=columns, dtype="str"))
+
+    def test_from_dataframe_roundtrip(self) -> None:
+        dataframe = pd.DataFrame({"Segment": ["UNH", ""], "Bedingung": ["", "[1]"]}, dtype="str")
+        ahb_rows = AhbRowBuffer.from_dataframe(dataframe)
+        assert ahb_rows.get(1, "Bedingung") == "[1]"
+        assert ahb_rows.to_dataframe().equals(dataframe)
@@ -50,7 +50,29 @@ class TestAhbTable:
                         "Bedingung": ["", "", ""],
                     }
                 ),
-            )
+                id="split segment gruppe",
+            ),
+            pytest.param(
+                pd.DataFrame(
+                    {
+                        "Segment Gruppe": ["SG8", "Referenz auf die ID einer", "Messlokation"],
+                        "Segment": ["SEQ", "", ""],
+                        "Codes und Qualifier": ["Z50", "", ""],
+                        "11042": ["X", "", ""],
+                        "Bedingung": ["", "", ""],
+                    }
+                ),
+                pd.DataFrame(
+                    {
+                        "Segment Gruppe": ["SG8", "Referenz auf die ID einer Messlokation"],
+                        "Segment": ["SEQ", ""],
+                        "Codes und Qualifier": ["Z50", ""],
+                        "11042": ["X", ""],
+                        "Bedingung": ["", ""],
+                    }
+                ),
+                id="split segment gruppe in the last rows",
+            ),
         ],
     )
     def test_sanitize_ahb_table_dataframe(self, ahb_table_dataframe, expected_ahb_table_dataframe) -> None:  # type: ignore[no-untyped-def]
@@ -658,3 +680,28 @@ class TestAhbTable:
             actual_csv = file.read()
         expected_csv = ",Segment Gruppe,Segment,Datenelement,Codes und Qualifier,Beschreibung,11042,Bedingung\n0,SG8,SEQ,1229,Z50,Messdatenregistriergerätedaten,,A\n1,Referenz auf die ID einer,,,,,,B\n2,Messlokation,,,,,,C\n3,SG8,,,,,,D\n"
         assert actual_csv == expected_csv
+
+    def test_create_ahb_table_from_table_dataframe(self) -> None:
+        """
+        test that an AHB table can still be created with a DataFrame `table` (as before its rows were stored in a
+        row buffer)
+        """
+        ahb_table_dataframe = pd.DataFrame(
+            {
+                "Segment Gruppe": ["SG8", ""],
+                "Segment": ["SEQ", "SEQ"],
+                "Codes und Qualifier": ["Z50", ""],
+                "11042": ["X", ""],
+            }
+        )
+
+        ahb_table = AhbTable(table=ahb_table_dataframe)
+
+        assert ahb_table.rows.rows == AhbTable.from_dataframe(ahb_table_dataframe).rows.rows
+        assert ahb_table.table.equals(ahb_table_dataframe)
+
+    def test_create_ahb_table_from_rows_and_table_dataframe(self) -> None:
+        ahb_table_dataframe = pd.DataFrame({"Segment Gruppe": ["SG8"], "Segment": ["SEQ"]})
+
+        with pytest.raises(ValueError, match="not both"):
+            AhbTable(rows=AhbTable.from_dataframe(ahb_table_dataframe).rows, table=ahb_table_dataframe)
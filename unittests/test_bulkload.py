@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pytest
+from efoli import EdifactFormatVersion
+from sqlalchemy import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, col, create_engine, func, select
+
+from kohlrahbi.models.sqlmodels.anwendungshandbuch import AhbLine, AhbMetaInformation
+from kohlrahbi.models.sqlmodels.bulkload import (
+    find_flat_ahb_json_files,
+    get_format_version_of_path,
+    load_flat_ahb_json_files,
+)
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+
+
+@pytest.fixture(name="flat_ahb_directory", scope="module")
+def flat_ahb_directory_fixture(tmp_path_factory: pytest.TempPathFactory, unfolded_ahbs: list[UnfoldedAhb]) -> Path:
+    """a directory with the structure of the machine-readable AHB repository, i.e. 'FV2310/ORDERS/flatahb/*.json'"""
+    flat_ahb_directory = tmp_path_factory.mktemp("machine-readable_anwendungshandbuecher")
+    for unfolded_ahb in unfolded_ahbs:
+        unfolded_ahb.dump_flatahb_json(flat_ahb_directory / "FV2310")
+    return flat_ahb_directory
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def _get_number_of_lines_by_pruefi(engine: Engine) -> dict[str, int]:
+    with Session(engine) as session:
+        rows = session.exec(
+            select(AhbMetaInformation.pruefidentifikator, func.count())
+            .join(AhbLine, col(AhbLine.ahb_id) == col(AhbMetaInformation.ahb_id))
+            .group_by(col(AhbMetaInformation.pruefidentifikator))
+        ).all()
+    return dict(rows)
+
+
+class TestBulkLoad:
+    @pytest.mark.parametrize("workers", [pytest.param(1, id="sequential"), pytest.param(2, id="process pool")])
+    def test_load_in_batches(self, pruefis: list[str], flat_ahb_directory: Path, engine: Engine, workers: int) -> None:
+        json_file_paths = find_flat_ahb_json_files(flat_ahb_directory)
+        assert [path.stem for path in json_file_paths] == pruefis
+
+        result = load_flat_ahb_json_files(engine, json_file_paths, batch_size=2, workers=workers)
+
+        number_of_lines_by_pruefi = _get_number_of_lines_by_pruefi(engine)
+        assert list(number_of_lines_by_pruefi) == pruefis
+        assert result.number_of_ahbs == len(pruefis)
+        assert result.number_of_lines == sum(number_of_lines_by_pruefi.values()) > 0
+        assert result.lines_per_second > result.ahbs_per_second > 0
+
+    def test_upsert(self, pruefis: list[str], flat_ahb_directory: Path, engine: Engine) -> None:
+        json_file_paths = find_flat_ahb_json_files(flat_ahb_directory)
+        load_flat_ahb_json_files(engine, json_file_paths)
+        expected_number_of_lines_by_pruefi = _get_number_of_lines_by_pruefi(engine)
+
+        with pytest.raises(IntegrityError):
+            load_flat_ahb_json_files(engine, json_file_paths[:1])
+        # the second file is loaded twice within the same batch
+        result = load_flat_ahb_json_files(engine, [*json_file_paths, json_file_paths[1]], upsert=True)
+
+        assert result.number_of_ahbs == len(pruefis)
+        assert _get_number_of_lines_by_pruefi(engine) == expected_number_of_lines_by_pruefi
+
+    def test_format_version_of_path(self) -> None:
+        assert get_format_version_of_path(Path("FV2310/ORDERS/flatahb/17201.json")) == EdifactFormatVersion.FV2310
+        with pytest.raises(ValueError):
+            get_format_version_of_path(Path("ORDERS/flatahb/17201.json"))
@@ -111,6 +111,24 @@ class TestCliPruefi:
                 {"exit_code": 0, "output_snippet": ""},
                 id="test assume yes",
             ),
+            pytest.param(
+                [
+                    "ahb",
+                    "-p",
+                    "17201",
+                    "-p",
+                    "29001",
+                    "--format-version",
+                    "FV2310",
+                    "--file-type",
+                    "csv",
+                    "--workers",
+                    "2",
+                    "-y",
+                ],
+                {"exit_code": 0, "output_snippet": ""},
+                id="test parallel workers",
+            ),
         ],
     )
     def test_cli_pruefi_with_valid_arguments(
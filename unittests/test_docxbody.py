@@ -0,0 +1,17 @@
+from kohlrahbi.docxbody import CellContent, ParagraphContent
+
+
+class TestCellContent:
+    def test_text_is_updated_when_a_paragraph_text_is_set(self) -> None:
+        cell = CellContent(paragraphs=[ParagraphContent(text="UNH\t0062"), ParagraphContent(text="Referenz")])
+        assert cell.text == "UNH\t0062\nReferenz"
+
+        cell.set_paragraph_text(-1, "Nachrichten-Referenznummer")
+
+        assert cell.text == "UNH\t0062\nNachrichten-Referenznummer"
+
+    def test_cached_text_is_not_part_of_the_content(self) -> None:
+        cell = CellContent(paragraphs=[ParagraphContent(text="UNH")])
+        assert cell.text == "UNH"
+        assert cell == CellContent(paragraphs=[ParagraphContent(text="UNH")])
+        assert cell.model_dump() == {"paragraphs": [ParagraphContent(text="UNH").model_dump()]}
@@ -0,0 +1,166 @@
+import gzip
+import os
+from pathlib import Path
+
+import docx
+import pytest
+from typer.testing import CliRunner
+
+from kohlrahbi import app, docxbodycache
+from kohlrahbi.docxbody import DocumentBody
+from kohlrahbi.docxbodycache import (
+    DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY,
+    DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE,
+    CachedDocumentBody,
+    get_cache_file_path,
+    get_document_body_cache_directory,
+    get_sha256_of_file,
+    load_cached_document_body,
+    load_document_body,
+)
+from kohlrahbi.read_functions import get_ahb_table
+from kohlrahbi.version import version
+from unittests import path_to_orders_ahb_docx_file
+
+
+class TestDocxBodyCache:
+    def test_cache_miss_writes_cache_entry(self, tmp_path: Path) -> None:
+        document_body = load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        cache_file_path = get_cache_file_path(
+            tmp_path, path_to_orders_ahb_docx_file, get_sha256_of_file(path_to_orders_ahb_docx_file)
+        )
+        assert cache_file_path.exists()
+        assert len(document_body.tables) > 0
+
+    def test_cache_hit_does_not_read_the_docx_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        expected = load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        def _fail(_: Path) -> DocumentBody:
+            raise AssertionError("the docx file must not be read again")
+
+        monkeypatch.setattr(docxbodycache, "read_document_body", _fail)
+        actual = load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+        assert actual == expected
+
+    @pytest.mark.parametrize("cached", [pytest.param(False, id="cache miss"), pytest.param(True, id="cache hit")])
+    def test_cached_document_body_hashes_the_docx_file_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, cached: bool
+    ) -> None:
+        if cached:
+            load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+        hashed_paths: list[Path] = []
+
+        def _get_sha256_of_file(path: Path) -> str:
+            hashed_paths.append(path)
+            return get_sha256_of_file(path)
+
+        monkeypatch.setattr(docxbodycache, "get_sha256_of_file", _get_sha256_of_file)
+        cached_document_body = load_cached_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        assert hashed_paths == [path_to_orders_ahb_docx_file]
+        assert cached_document_body.sha256 == get_sha256_of_file(path_to_orders_ahb_docx_file)
+        assert len(cached_document_body.body.tables) > 0
+
+    def test_outdated_cache_entry_is_rebuilt(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(docxbodycache, "version", "0.0.0-outdated")
+        load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+        monkeypatch.undo()
+
+        load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        cache_file_path = get_cache_file_path(
+            tmp_path, path_to_orders_ahb_docx_file, get_sha256_of_file(path_to_orders_ahb_docx_file)
+        )
+        cached_document_body = CachedDocumentBody.model_validate_json(gzip.decompress(cache_file_path.read_bytes()))
+        assert cached_document_body.kohlrahbi_version == version
+
+    def test_broken_cache_entry_is_rebuilt(self, tmp_path: Path) -> None:
+        cache_file_path = get_cache_file_path(
+            tmp_path, path_to_orders_ahb_docx_file, get_sha256_of_file(path_to_orders_ahb_docx_file)
+        )
+        cache_file_path.parent.mkdir(parents=True)
+        cache_file_path.write_bytes(b"not a gzip file")
+
+        document_body = load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        assert len(document_body.tables) > 0
+
+    def test_writing_a_cache_entry_removes_outdated_entries(self, tmp_path: Path) -> None:
+        sha256 = get_sha256_of_file(path_to_orders_ahb_docx_file)
+        cache_file_path = get_cache_file_path(tmp_path, path_to_orders_ahb_docx_file, sha256)
+        entry_of_other_version = tmp_path / "0.0.0-outdated" / cache_file_path.name
+        entry_without_version = tmp_path / f"{sha256}.json.gz"
+        entry_of_previous_content = get_cache_file_path(tmp_path, path_to_orders_ahb_docx_file, "0" * 64)
+        entry_of_other_docx_file = get_cache_file_path(tmp_path, Path("other.docx"), sha256)
+        outdated_entries = [entry_of_other_version, entry_without_version, entry_of_previous_content]
+        for cache_entry_path in [*outdated_entries, entry_of_other_docx_file]:
+            cache_entry_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_entry_path.write_bytes(b"")
+
+        load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        assert cache_file_path.exists()
+        assert not any(cache_entry_path.exists() for cache_entry_path in outdated_entries)
+        assert not entry_of_other_version.parent.exists()
+        assert entry_of_other_docx_file.exists()
+
+    @pytest.mark.parametrize(
+        "configured_cache_directory,expected",
+        [
+            pytest.param(None, DEFAULT_DOCUMENT_BODY_CACHE_DIRECTORY, id="default"),
+            pytest.param("/tmp/document_bodies", Path("/tmp/document_bodies"), id="configured"),
+            pytest.param("", None, id="disabled"),
+        ],
+    )
+    def test_get_document_body_cache_directory(
+        self, monkeypatch: pytest.MonkeyPatch, configured_cache_directory: str | None, expected: Path | None
+    ) -> None:
+        if configured_cache_directory is None:
+            monkeypatch.delenv(DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, raising=False)
+        else:
+            monkeypatch.setenv(DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, configured_cache_directory)
+
+        assert get_document_body_cache_directory() == expected
+
+    def test_configured_cache_directory_is_used_by_default(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv(DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, str(tmp_path))
+
+        load_document_body(path_to_orders_ahb_docx_file)
+
+        assert get_cache_file_path(
+            tmp_path, path_to_orders_ahb_docx_file, get_sha256_of_file(path_to_orders_ahb_docx_file)
+        ).exists()
+
+    @pytest.mark.parametrize(
+        "cli_options,expected",
+        [
+            pytest.param(["--document-body-cache-directory", "document_bodies"], "document_bodies", id="configured"),
+            pytest.param(["--no-document-body-cache"], "", id="disabled"),
+        ],
+    )
+    def test_cli_options_configure_the_cache_directory(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, cli_options: list[str], expected: str
+    ) -> None:
+        # the CLI sets the environment variable; monkeypatch restores it after the test
+        monkeypatch.setenv(DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, "not configured by the CLI")
+        monkeypatch.chdir(tmp_path)
+
+        response = CliRunner().invoke(app, [*cli_options, "conditions", "--help"])
+
+        assert response.exit_code == 0
+        configured_cache_directory = os.environ[DOCUMENT_BODY_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE]
+        assert configured_cache_directory == (str(tmp_path / expected) if expected else "")
+
+    def test_ahb_table_from_cached_body_equals_ahb_table_from_docx(self, tmp_path: Path) -> None:
+        load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+        cached_document_body = load_document_body(path_to_orders_ahb_docx_file, cache_directory=tmp_path)
+
+        actual = get_ahb_table(document=cached_document_body, pruefi="17201")
+        expected = get_ahb_table(document=docx.Document(str(path_to_orders_ahb_docx_file)), pruefi="17201")
+
+        assert actual is not None and expected is not None
+        assert actual.table.equals(expected.table)
+        assert actual.metadata == expected.metadata
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import docx
+import pytest
+
+from kohlrahbi.docxbody import DocumentBody
+from kohlrahbi.docxxmlreader import read_document_body_from_xml, read_document_body_streaming
+from unittests import path_to_orders_ahb_docx_file
+
+path_to_docx_files = Path(__file__).parent / "test-files" / "docx_files"
+
+docx_files_to_compare = [
+    pytest.param(path_to_orders_ahb_docx_file, id="ORDERS MaBiS AHB"),
+    pytest.param(path_to_docx_files / "UTILMD-11042-test.docx", id="UTILMD 11042"),
+]
+
+
+class TestDocxXmlReader:
+    @pytest.mark.parametrize("path_to_docx_file", docx_files_to_compare)
+    def test_xml_reader_reads_the_same_body_as_python_docx(self, path_to_docx_file: Path) -> None:
+        document = docx.Document(str(path_to_docx_file))
+
+        actual = read_document_body_from_xml(document)
+
+        assert actual == DocumentBody.from_docx_document(document)
+
+    @pytest.mark.parametrize("path_to_docx_file", docx_files_to_compare)
+    def test_streaming_reader_reads_the_same_body_as_python_docx(self, path_to_docx_file: Path) -> None:
+        actual = read_document_body_streaming(path_to_docx_file)
+
+        assert actual == DocumentBody.from_docx_document(docx.Document(str(path_to_docx_file)))
@@ -0,0 +1,131 @@
+import os
+import shutil
+from pathlib import Path
+
+from efoli import EdifactFormat
+
+from kohlrahbi.ahb import get_unchanged_docx_files, process_docx_files, update_incremental_scraping_state
+from kohlrahbi.conditions import get_unchanged_edifact_formats
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.incrementalstate import (
+    IncrementalScrapingState,
+    load_incremental_scraping_state,
+    save_incremental_scraping_state,
+)
+from unittests import path_to_orders_ahb_docx_file, path_to_test_files_fv2310
+
+
+class TestIncrementalScrapingState:
+    def test_save_and_load(self, tmp_path: Path) -> None:
+        state = IncrementalScrapingState(output_path=str(tmp_path / "output"))
+        state.add_source_docx_file(path_to_orders_ahb_docx_file, ["17202", "17201"])
+
+        save_incremental_scraping_state(state, "ahb", "FV2310", directory=tmp_path)
+
+        assert load_incremental_scraping_state("ahb", "FV2310", tmp_path / "output", directory=tmp_path) == state
+        assert state.source_docx_files[path_to_orders_ahb_docx_file.name].pruefis == ["17201", "17202"]
+
+    def test_state_of_other_output_path_is_ignored(self, tmp_path: Path) -> None:
+        state = IncrementalScrapingState(output_path=str(tmp_path / "output"))
+        state.add_source_docx_file(path_to_orders_ahb_docx_file, ["17201"])
+        save_incremental_scraping_state(state, "ahb", "FV2310", directory=tmp_path)
+
+        loaded_state = load_incremental_scraping_state("ahb", "FV2310", tmp_path / "other", directory=tmp_path)
+
+        assert loaded_state == IncrementalScrapingState(output_path=str(tmp_path / "other"))
+        assert load_incremental_scraping_state("conditions", "FV2310", tmp_path / "output", directory=tmp_path) == (
+            IncrementalScrapingState(output_path=str(tmp_path / "output"))
+        )
+
+    def test_pruefis_of_the_same_content_are_kept(self, tmp_path: Path) -> None:
+        docx_path = Path(shutil.copy(path_to_orders_ahb_docx_file, tmp_path))
+        state = IncrementalScrapingState(output_path=str(tmp_path))
+        state.add_source_docx_file(docx_path, ["17201"])
+        state.add_source_docx_file(docx_path, ["17202"])
+        assert state.source_docx_files[docx_path.name].pruefis == ["17201", "17202"]
+
+        with open(docx_path, "ab") as file:
+            file.write(b"\0")
+        state.add_source_docx_file(docx_path, ["17203"])
+        assert state.source_docx_files[docx_path.name].pruefis == ["17203"]
+
+    def test_unchanged_source_docx_file(self, tmp_path: Path) -> None:
+        docx_path = Path(shutil.copy(path_to_orders_ahb_docx_file, tmp_path))
+        state = IncrementalScrapingState(output_path=str(tmp_path))
+        state.add_source_docx_file(docx_path, ["17201", "17202"])
+
+        os.utime(docx_path, ns=(0, 0))
+        assert state.get_unchanged_source_docx_file(docx_path, ["17201"]) is not None
+        # a pruefi which moved into the file has not been scraped from it
+        assert state.get_unchanged_source_docx_file(docx_path, ["17201", "17203"]) is None
+
+        with open(docx_path, "ab") as file:
+            file.write(b"\0")
+        assert state.get_unchanged_source_docx_file(docx_path, ["17201"]) is None
+
+    def test_output_files(self, tmp_path: Path) -> None:
+        state = IncrementalScrapingState(output_path=str(tmp_path))
+        output_file_path = tmp_path / "ORDERS" / "conditions.json"
+        output_file_path.parent.mkdir()
+        output_file_path.write_text("[]", encoding="utf-8")
+
+        assert not state.has_valid_output_file(output_file_path)
+        assert state.has_valid_output_file(output_file_path, required=False)
+        state.add_output_file(output_file_path)
+        assert state.has_valid_output_file(output_file_path)
+
+        output_file_path.write_text("[{}]", encoding="utf-8")
+        assert not state.has_valid_output_file(output_file_path, required=False)
+
+
+class TestIncrementalAhbScraping:
+    def test_only_changed_docx_files_are_scraped_again(self, tmp_path: Path) -> None:
+        output_path = tmp_path / "output"
+        file_types = (AhbExportFileFormat.FLATAHB,)
+        pruefis_by_docx_file = {path_to_orders_ahb_docx_file: ["17201", "17202"]}
+        state = IncrementalScrapingState(output_path=str(output_path))
+        assert not get_unchanged_docx_files(pruefis_by_docx_file, output_path, file_types, state)
+
+        for path_to_ahb_docx_file, outcome in process_docx_files(pruefis_by_docx_file, output_path, file_types):
+            update_incremental_scraping_state(state, path_to_ahb_docx_file, outcome)
+
+        assert get_unchanged_docx_files(pruefis_by_docx_file, output_path, file_types, state) == [
+            path_to_orders_ahb_docx_file
+        ]
+        # another file format has not been written yet
+        file_types_with_csv = (AhbExportFileFormat.FLATAHB, AhbExportFileFormat.CSV)
+        assert not get_unchanged_docx_files(pruefis_by_docx_file, output_path, file_types_with_csv, state)
+        # deleted outputs are written again
+        (output_path / "ORDERS" / "flatahb" / "17202.json").unlink()
+        assert not get_unchanged_docx_files(pruefis_by_docx_file, output_path, file_types, state)
+
+    def test_failed_docx_files_are_scraped_again(self, tmp_path: Path) -> None:
+        state = IncrementalScrapingState(output_path=str(tmp_path))
+        state.add_source_docx_file(path_to_orders_ahb_docx_file, ["17201"])
+
+        update_incremental_scraping_state(state, path_to_orders_ahb_docx_file, FileNotFoundError())
+
+        assert not state.source_docx_files
+
+
+class TestIncrementalConditionsScraping:
+    def test_unchanged_edifact_formats(self, tmp_path: Path) -> None:
+        format_to_files_mapping = {EdifactFormat.ORDERS: [path_to_orders_ahb_docx_file.name]}
+        pruefis_by_file = {path_to_orders_ahb_docx_file.name: ["17201"]}
+        state = IncrementalScrapingState(output_path=str(tmp_path))
+        state.add_source_docx_file(path_to_orders_ahb_docx_file, ["17201"])
+        path_to_conditions = tmp_path / "ORDERS" / "conditions.json"
+        path_to_conditions.parent.mkdir()
+        path_to_conditions.write_text("[]", encoding="utf-8")
+        state.add_output_file(path_to_conditions)
+
+        unchanged_edifact_formats = get_unchanged_edifact_formats(
+            format_to_files_mapping, pruefis_by_file, path_to_test_files_fv2310, tmp_path, state
+        )
+        assert unchanged_edifact_formats == [EdifactFormat.ORDERS]
+
+        # the conditions of a format have to be collected again, if one of its files has been removed
+        state.source_docx_files["removed.docx"] = state.source_docx_files[path_to_orders_ahb_docx_file.name]
+        assert not get_unchanged_edifact_formats(
+            format_to_files_mapping, pruefis_by_file, path_to_test_files_fv2310, tmp_path, state
+        )
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+
+from kohlrahbi.ahb.outputwriter import write_unfolded_ahb
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.outputmanifest import load_pruefi_output_manifest, save_pruefi_output_manifest
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+
+all_file_types = (AhbExportFileFormat.FLATAHB, AhbExportFileFormat.CSV, AhbExportFileFormat.XLSX)
+
+
+@pytest.fixture(name="unfolded_ahb")
+def unfolded_ahb_fixture(unfolded_ahbs: list[UnfoldedAhb]) -> UnfoldedAhb:
+    """
+    the unfolded AHB of 17201
+    """
+    return unfolded_ahbs[0]
+
+
+def _forbid_dumping(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _fail(*_: object) -> None:
+        raise AssertionError("the file must not be written again")
+
+    for dump_method_name in ["dump_flatahb_json", "dump_csv", "dump_xlsx"]:
+        monkeypatch.setattr(UnfoldedAhb, dump_method_name, _fail)
+
+
+class TestOutputManifest:
+    def test_manifest_is_written(self, unfolded_ahb: UnfoldedAhb, tmp_path: Path) -> None:
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types, source_docx_sha256="abc")
+
+        manifest = load_pruefi_output_manifest(tmp_path / "ORDERS" / "manifest" / "17201.json")
+        assert manifest is not None
+        assert manifest.source_docx_sha256 == "abc"
+        assert manifest.files.keys() == set(all_file_types)
+
+    def test_unchanged_ahb_is_not_written_again(
+        self, unfolded_ahb: UnfoldedAhb, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+        _forbid_dumping(monkeypatch)
+
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+
+    def test_modified_and_deleted_files_are_written_again(self, unfolded_ahb: UnfoldedAhb, tmp_path: Path) -> None:
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+        csv_file_path = tmp_path / "ORDERS" / "csv" / "17201.csv"
+        expected_csv = csv_file_path.read_text(encoding="utf-8")
+        csv_file_path.write_text("modified", encoding="utf-8")
+        xlsx_file_path = tmp_path / "ORDERS" / "xlsx" / "17201.xlsx"
+        xlsx_file_path.unlink()
+
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+
+        assert csv_file_path.read_text(encoding="utf-8") == expected_csv
+        assert xlsx_file_path.exists()
+
+    def test_output_of_another_kohlrahbi_version_is_written_again(
+        self, unfolded_ahb: UnfoldedAhb, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+        manifest_file_path = tmp_path / "ORDERS" / "manifest" / "17201.json"
+        manifest = load_pruefi_output_manifest(manifest_file_path)
+        assert manifest is not None and manifest.has_valid_files(all_file_types, tmp_path)
+        manifest.kohlrahbi_version = "0.0.1"
+        save_pruefi_output_manifest(manifest, manifest_file_path)
+        assert not manifest.has_valid_files(all_file_types, tmp_path)
+        dumped_csv_file_paths: list[Path] = []
+        monkeypatch.setattr(UnfoldedAhb, "dump_csv", lambda _, output_path: dumped_csv_file_paths.append(output_path))
+
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+
+        assert dumped_csv_file_paths == [tmp_path]
+
+    def test_output_without_manifest_is_adopted_if_the_flat_ahb_is_unchanged(
+        self, unfolded_ahb: UnfoldedAhb, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+        manifest_file_path = tmp_path / "ORDERS" / "manifest" / "17201.json"
+        manifest_file_path.write_text("not a manifest", encoding="utf-8")
+        _forbid_dumping(monkeypatch)
+
+        write_unfolded_ahb(unfolded_ahb, tmp_path, all_file_types)
+
+        assert load_pruefi_output_manifest(manifest_file_path) is not None
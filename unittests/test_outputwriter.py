@@ -0,0 +1,67 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from kohlrahbi.ahb import outputwriter
+from kohlrahbi.ahb.outputwriter import AhbOutputWriter
+from kohlrahbi.enums.ahbexportfileformat import AhbExportFileFormat
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+
+
+class TestAhbOutputWriter:
+    def test_all_submitted_unfolded_ahbs_are_written(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path
+    ) -> None:
+        written_pruefis: list[str] = []
+        file_types = (AhbExportFileFormat.FLATAHB, AhbExportFileFormat.CSV)
+
+        with AhbOutputWriter(tmp_path, file_types, on_written=written_pruefis.append) as output_writer:
+            futures = [output_writer.submit(unfolded_ahb, "sha256") for unfolded_ahb in unfolded_ahbs]
+
+        assert all(future.done() and future.exception() is None for future in futures)
+        assert sorted(written_pruefis) == pruefis
+        for pruefi in pruefis:
+            assert (tmp_path / "ORDERS" / "flatahb" / f"{pruefi}.json").exists()
+            assert (tmp_path / "ORDERS" / "csv" / f"{pruefi}.csv").exists()
+            assert (tmp_path / "ORDERS" / "manifest" / f"{pruefi}.json").exists()
+
+    def test_submit_blocks_while_too_many_are_pending(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        release_writes = threading.Event()
+        monkeypatch.setattr(outputwriter, "write_unfolded_ahb", lambda *_: release_writes.wait())
+        submitted_pruefis: list[str] = []
+
+        with AhbOutputWriter(tmp_path, (AhbExportFileFormat.FLATAHB,), threads=1, max_pending=2) as output_writer:
+
+            def submit_all() -> None:
+                for unfolded_ahb in unfolded_ahbs:
+                    output_writer.submit(unfolded_ahb)
+                    submitted_pruefis.append(unfolded_ahb.meta_data.pruefidentifikator)
+
+            submitting_thread = threading.Thread(target=submit_all)
+            submitting_thread.start()
+            submitting_thread.join(timeout=0.5)
+            assert submitting_thread.is_alive()
+            assert submitted_pruefis == pruefis[:2]
+
+            release_writes.set()
+            submitting_thread.join()
+        assert submitted_pruefis == pruefis
+
+    def test_errors_are_raised_by_the_future(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def write_unfolded_ahb(*_: object) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr(outputwriter, "write_unfolded_ahb", write_unfolded_ahb)
+        written_pruefis: list[str] = []
+
+        with AhbOutputWriter(tmp_path, (AhbExportFileFormat.FLATAHB,), on_written=written_pruefis.append) as writer:
+            future = writer.submit(unfolded_ahbs[0])
+            with pytest.raises(OSError, match="disk full"):
+                future.result()
+        # a failed write does not block the writer
+        assert written_pruefis == pruefis[:1]
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+import pytest
+from efoli import EdifactFormat, EdifactFormatVersion
+
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+from kohlrahbi.unfoldedahb.parquetdataset import (
+    ParquetDatasetWriter,
+    get_parquet_dataset_path,
+    get_parquet_file_path,
+)
+
+
+class TestParquetDatasetWriter:
+    def test_rows_equal_the_lines_of_the_flat_ahbs(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path
+    ) -> None:
+        with ParquetDatasetWriter(tmp_path, EdifactFormatVersion.FV2310) as parquet_dataset:
+            for unfolded_ahb in unfolded_ahbs:
+                parquet_dataset.add_unfolded_ahb(unfolded_ahb)
+
+        # one row group per pruefi
+        assert pq.ParquetFile(get_parquet_file_path(tmp_path, EdifactFormat.ORDERS)).num_row_groups == len(pruefis)
+        dataset = pq.read_table(
+            get_parquet_dataset_path(tmp_path), filters=[("pruefidentifikator", "==", "17202")], memory_map=True
+        ).to_pylist()
+        expected_lines = unfolded_ahbs[1].convert_to_flat_ahb().lines
+        assert len(dataset) == len(expected_lines) > 0
+        for row, expected_line in zip(dataset, expected_lines, strict=True):
+            assert row.pop("pruefidentifikator") == "17202"
+            assert row.pop("format_version") == "FV2310"
+            assert row.pop("edifact_format") == "ORDERS"
+            assert row == expected_line.model_dump(exclude={"guid"})
+
+    def test_invalid_pruefi(self, unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path) -> None:
+        unfolded_ahb = unfolded_ahbs[0].model_copy(deep=True)
+        unfolded_ahb.meta_data.pruefidentifikator = "invalid"
+
+        with ParquetDatasetWriter(tmp_path, EdifactFormatVersion.FV2310) as parquet_dataset, pytest.raises(ValueError):
+            parquet_dataset.add_unfolded_ahb(unfolded_ahb)
+
+    def test_rows_of_other_pruefis_are_kept(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        with ParquetDatasetWriter(tmp_path, EdifactFormatVersion.FV2310) as parquet_dataset:
+            for unfolded_ahb in unfolded_ahbs:
+                parquet_dataset.add_unfolded_ahb(unfolded_ahb)
+        expected_rows = pq.read_table(get_parquet_dataset_path(tmp_path)).sort_by("pruefidentifikator").to_pylist()
+        flat_ahb = unfolded_ahbs[1].convert_to_flat_ahb()
+
+        def _fail(*_: object) -> None:
+            raise AssertionError("the given flat AHB must be used")
+
+        monkeypatch.setattr(UnfoldedAhb, "convert_to_flat_ahb", _fail)
+        # e.g. a run restricted to a single pruefi
+        with ParquetDatasetWriter(tmp_path, EdifactFormatVersion.FV2310) as parquet_dataset:
+            parquet_dataset.add_unfolded_ahb(unfolded_ahbs[1], flat_ahb)
+
+        parquet_file = pq.ParquetFile(get_parquet_file_path(tmp_path, EdifactFormat.ORDERS))
+        assert parquet_file.num_row_groups == len(pruefis)
+        assert parquet_file.read_row_group(0)["pruefidentifikator"][0].as_py() == "17202"
+        actual_rows = pq.read_table(get_parquet_dataset_path(tmp_path)).sort_by("pruefidentifikator").to_pylist()
+        assert actual_rows == expected_rows
+        assert [path.name for path in get_parquet_file_path(tmp_path, EdifactFormat.ORDERS).parent.iterdir()] == [
+            "ahb_lines.parquet"
+        ]
+
+    def test_aborted_run_keeps_the_existing_file(self, unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path) -> None:
+        with ParquetDatasetWriter(tmp_path, EdifactFormatVersion.FV2310) as parquet_dataset:
+            parquet_dataset.add_unfolded_ahb(unfolded_ahbs[0])
+        parquet_file_path = get_parquet_file_path(tmp_path, EdifactFormat.ORDERS)
+        expected_content = parquet_file_path.read_bytes()
+
+        with (
+            pytest.raises(RuntimeError),
+            ParquetDatasetWriter(tmp_path, EdifactFormatVersion.FV2310) as parquet_dataset,
+        ):
+            parquet_dataset.add_unfolded_ahb(unfolded_ahbs[1])
+            raise RuntimeError("the run is aborted")
+
+        assert parquet_file_path.read_bytes() == expected_content
+        assert list(parquet_file_path.parent.iterdir()) == [parquet_file_path]
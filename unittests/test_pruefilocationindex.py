@@ -0,0 +1,61 @@
+import os
+import shutil
+from pathlib import Path
+
+from kohlrahbi.docxbody import DocumentBody
+from kohlrahbi.docxbodycache import read_document_body
+from kohlrahbi.pruefilocationindex import (
+    PruefiLocationIndex,
+    get_path_to_pruefi_location_index,
+    load_pruefi_location_index,
+    save_pruefi_location_index,
+)
+from unittests import path_to_orders_ahb_docx_file
+
+
+class TestPruefiLocationIndex:
+    @staticmethod
+    def _create_index(docx_path: Path) -> PruefiLocationIndex:
+        pruefi_location_index = PruefiLocationIndex()
+        pruefi_location_index.add_docx_file(docx_path, read_document_body(docx_path))
+        return pruefi_location_index
+
+    def test_save_and_load(self, tmp_path: Path) -> None:
+        pruefi_location_index = self._create_index(path_to_orders_ahb_docx_file)
+
+        save_pruefi_location_index(pruefi_location_index, "FV2310", directory=tmp_path)
+
+        assert get_path_to_pruefi_location_index("FV2310", directory=tmp_path).exists()
+        assert load_pruefi_location_index("FV2310", directory=tmp_path) == pruefi_location_index
+        locations = load_pruefi_location_index("FV2310", directory=tmp_path).get_locations(path_to_orders_ahb_docx_file)
+        assert locations is not None and "17201" in locations
+
+    def test_load_missing_index(self, tmp_path: Path) -> None:
+        assert load_pruefi_location_index("FV2310", directory=tmp_path) == PruefiLocationIndex()
+
+    def test_touched_file_is_still_valid(self, tmp_path: Path) -> None:
+        docx_path = Path(shutil.copy(path_to_orders_ahb_docx_file, tmp_path))
+        pruefi_location_index = self._create_index(docx_path)
+
+        os.utime(docx_path, ns=(0, 0))
+
+        assert pruefi_location_index.get_locations(docx_path) is not None
+
+    def test_changed_file_is_invalid(self, tmp_path: Path) -> None:
+        docx_path = Path(shutil.copy(path_to_orders_ahb_docx_file, tmp_path))
+        pruefi_location_index = self._create_index(docx_path)
+
+        with open(docx_path, "ab") as file:
+            file.write(b"\0")
+
+        assert pruefi_location_index.get_locations(docx_path) is None
+
+    def test_unknown_file(self) -> None:
+        assert PruefiLocationIndex().get_locations(path_to_orders_ahb_docx_file) is None
+
+    def test_document_without_pruefis(self) -> None:
+        pruefi_location_index = PruefiLocationIndex()
+
+        pruefi_location_index.add_docx_file(path_to_orders_ahb_docx_file, DocumentBody())
+
+        assert pruefi_location_index.get_locations(path_to_orders_ahb_docx_file) == {}
@@ -6,12 +6,19 @@ from docx import Document
 from docx.text.paragraph import Paragraph
 from efoli import EdifactFormat, EdifactFormatVersion
 
-from kohlrahbi.ahb import get_pruefi_to_file_mapping
+from kohlrahbi.ahb import extract_pruefis_from_docx, get_pruefi_to_file_mapping
 from kohlrahbi.ahbtable.ahbcondtions import AhbConditions
 from kohlrahbi.ahbtable.ahbpackagetable import AhbPackageTable
 from kohlrahbi.conditions import find_all_files_from_all_pruefis
-from kohlrahbi.read_functions import get_all_conditions_from_doc, is_item_package_heading
-from unittests import test_formats
+from kohlrahbi.docxbody import DocumentBody
+from kohlrahbi.read_functions import (
+    get_ahb_table,
+    get_ahb_tables,
+    get_all_conditions_from_doc,
+    get_pruefi_locations,
+    is_item_package_heading,
+)
+from unittests import path_to_orders_ahb_docx_file, test_formats
 
 
 def create_heading_paragraph(text: str, style: str) -> Paragraph:
@@ -62,6 +69,43 @@ class TestReadFunctions:
     ) -> None:
         assert is_item_package_heading(item, style_name, EdifactFormat.UTILMD) == expected_boolean
 
+    def test_get_ahb_tables_equals_get_ahb_table(self) -> None:
+        """
+        Extracting all pruefis of a document in one pass has to yield the same tables as extracting them one by one.
+        """
+        docx_path = path_to_orders_ahb_docx_file
+        pruefis = ["17201", "17202", "19204", "99999"]
+
+        ahb_tables = get_ahb_tables(document=docx.Document(str(docx_path)), pruefis=pruefis)
+
+        assert sorted(ahb_tables.keys()) == ["17201", "17202", "19204"]
+        for pruefi, ahb_table in ahb_tables.items():
+            # the parsing modifies the document, so we have to read it again for every single pruefi
+            expected_ahb_table = get_ahb_table(document=docx.Document(str(docx_path)), pruefi=pruefi)
+            assert expected_ahb_table is not None
+            assert ahb_table.metadata == expected_ahb_table.metadata
+            assert ahb_table.table.equals(expected_ahb_table.table)
+
+    def test_get_ahb_table_with_pruefi_location(self) -> None:
+        """
+        Reading only the located part of the document has to yield the same tables as reading the whole document.
+        """
+        docx_path = path_to_orders_ahb_docx_file
+        document_body = DocumentBody.from_docx_document(docx.Document(str(docx_path)))
+        locations = get_pruefi_locations(document=document_body)
+
+        assert sorted(locations.keys()) == sorted(extract_pruefis_from_docx(docx_path).keys())
+        for pruefi in ["17201", "19204"]:
+            assert locations[pruefi].start < locations[pruefi].stop
+            expected_ahb_table = get_ahb_table(document=docx.Document(str(docx_path)), pruefi=pruefi)
+            ahb_table = get_ahb_table(
+                document=DocumentBody.from_docx_document(docx.Document(str(docx_path))),
+                pruefi=pruefi,
+                location=locations[pruefi],
+            )
+            assert expected_ahb_table is not None and ahb_table is not None
+            assert ahb_table.table.equals(expected_ahb_table.table)
+
     @pytest.mark.parametrize(
         "edifact_format",
         [
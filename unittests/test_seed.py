@@ -0,0 +1,44 @@
+import pytest
+
+from kohlrahbi.docxbody import TableContent
+from kohlrahbi.docxbodycache import read_document_body
+from kohlrahbi.enums import RowType
+from kohlrahbi.read_functions import is_item_table_with_pruefidentifikatoren
+from kohlrahbi.seed import Seed
+from kohlrahbi.table_header import TableHeader
+from unittests import path_to_orders_ahb_docx_file
+
+
+@pytest.fixture(name="table_with_header")
+def table_with_header_fixture() -> TableContent:
+    document_body = read_document_body(path_to_orders_ahb_docx_file)
+    return next(table for table in document_body.tables if is_item_table_with_pruefidentifikatoren(table))
+
+
+class TestSeed:
+    def test_table_header_is_parsed_only_once_per_table(
+        self, table_with_header: TableContent, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        calls: list[object] = []
+        from_header_cell = TableHeader.from_header_cell
+
+        def _count_calls(row_cell: object) -> TableHeader:
+            calls.append(row_cell)
+            return from_header_cell(row_cell)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(TableHeader, "from_header_cell", _count_calls)
+
+        first_seed = Seed.from_table(docx_table=table_with_header)
+        second_seed = Seed.from_table(docx_table=table_with_header)
+
+        assert len(calls) == 1
+        assert first_seed == second_seed
+        assert first_seed.pruefidentifikatoren == ["17201", "17202", "17203", "17204", "17205"]
+
+    def test_seeds_of_the_same_table_do_not_share_the_row_types(self, table_with_header: TableContent) -> None:
+        first_seed = Seed.from_table(docx_table=table_with_header)
+        first_seed.last_two_row_types[0] = RowType.HEADER
+
+        second_seed = Seed.from_table(docx_table=table_with_header)
+
+        assert second_seed.last_two_row_types == [RowType.EMPTY, RowType.EMPTY]
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+from efoli import EdifactFormat, EdifactFormatVersion
+from sqlalchemy import inspect
+from sqlmodel import Session, col, func, select
+
+from kohlrahbi.models.sqlmodels.anwendungshandbuch import AhbLine, AhbMetaInformation, FlatAnwendungshandbuch
+from kohlrahbi.models.sqlmodels.conditions import AhbCondition, AhbPackage
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+from kohlrahbi.unfoldedahb.sqlitebundle import (
+    SqliteBundleWriter,
+    create_sqlite_bundle_engine,
+    write_conditions_to_sqlite_bundle,
+)
+
+
+class TestSqliteBundle:
+    def test_flat_ahbs_are_inserted_and_replaced(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path
+    ) -> None:
+        with SqliteBundleWriter(tmp_path, EdifactFormatVersion.FV2310) as sqlite_bundle:
+            for unfolded_ahb in unfolded_ahbs:
+                sqlite_bundle.add_unfolded_ahb(unfolded_ahb)
+        # a second run for a single pruefi replaces its AHB and keeps the others
+        with SqliteBundleWriter(tmp_path, EdifactFormatVersion.FV2310) as sqlite_bundle:
+            sqlite_bundle.add_unfolded_ahb(unfolded_ahbs[1])
+
+        engine = create_sqlite_bundle_engine(tmp_path)
+        with Session(engine) as session:
+            assert session.exec(select(func.count()).select_from(FlatAnwendungshandbuch)).one() == len(pruefis)
+            metas = session.exec(select(AhbMetaInformation).order_by(col(AhbMetaInformation.pruefidentifikator))).all()
+            assert [meta.pruefidentifikator for meta in metas] == pruefis
+            assert all(meta.edifact_format == EdifactFormat.ORDERS for meta in metas)
+            assert all(meta.edifact_format_version == EdifactFormatVersion.FV2310 for meta in metas)
+            lines = session.exec(
+                select(AhbLine).where(AhbLine.ahb_id == metas[1].ahb_id).order_by(col(AhbLine.position_inside_ahb))
+            ).all()
+        expected_lines = unfolded_ahbs[1].convert_to_flat_ahb().lines
+        assert len(lines) == len(expected_lines) > 0
+        for line, expected_line in zip(lines, expected_lines, strict=True):
+            assert line.segment_group_key == expected_line.segment_group_key
+            assert line.ahb_expression == expected_line.ahb_expression
+            assert line.index == expected_line.index
+        indexed_columns = {
+            column for index in inspect(engine).get_indexes("ahbline") for column in index["column_names"]
+        }
+        assert {"segment_group_key", "ahb_id"} <= indexed_columns
+        engine.dispose()
+
+    def test_aborted_run_is_rolled_back(self, unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path) -> None:
+        with SqliteBundleWriter(tmp_path, EdifactFormatVersion.FV2310) as sqlite_bundle:
+            sqlite_bundle.add_unfolded_ahb(unfolded_ahbs[0])
+
+        with pytest.raises(RuntimeError), SqliteBundleWriter(tmp_path, EdifactFormatVersion.FV2310) as sqlite_bundle:
+            sqlite_bundle.add_unfolded_ahb(unfolded_ahbs[0])
+            sqlite_bundle.add_unfolded_ahb(unfolded_ahbs[1])
+            raise RuntimeError("the run is aborted")
+
+        engine = create_sqlite_bundle_engine(tmp_path)
+        with Session(engine) as session:
+            metas = session.exec(select(AhbMetaInformation)).all()
+            assert [meta.pruefidentifikator for meta in metas] == [unfolded_ahbs[0].meta_data.pruefidentifikator]
+        engine.dispose()
+
+    def test_conditions_and_packages_are_replaced(self, tmp_path: Path) -> None:
+        write_conditions_to_sqlite_bundle(
+            tmp_path,
+            EdifactFormatVersion.FV2310,
+            {EdifactFormat.ORDERS: {"1": "Wenn vorhanden", "2": "Wenn nicht vorhanden"}},
+            {EdifactFormat.ORDERS: {"1P": "[1]"}},
+        )
+        write_conditions_to_sqlite_bundle(
+            tmp_path, EdifactFormatVersion.FV2310, {EdifactFormat.ORDERS: {"1": "Wenn vorhanden"}}, {}
+        )
+
+        engine = create_sqlite_bundle_engine(tmp_path)
+        with Session(engine) as session:
+            conditions = session.exec(select(AhbCondition)).all()
+            assert [(condition.condition_key, condition.condition_text) for condition in conditions] == [
+                ("1", "Wenn vorhanden")
+            ]
+            # the packages of a format are only replaced if the format has packages
+            assert [package.package_key for package in session.exec(select(AhbPackage)).all()] == ["1P"]
+        engine.dispose()
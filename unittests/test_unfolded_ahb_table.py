@@ -1,9 +1,46 @@
+import json
+from uuid import UUID
+
 import pytest
 
-from kohlrahbi.models.anwendungshandbuch import AhbLine, AhbMetaInformation, FlatAnwendungshandbuch
+from kohlrahbi.ahbtable.ahbrowbuffer import AhbRowBuffer
+from kohlrahbi.ahbtable.ahbtable import AhbTable
+from kohlrahbi.models.anwendungshandbuch import (
+    TRUSTED_LINES_CONTEXT_KEY,
+    AhbLine,
+    AhbMetaInformation,
+    FlatAnwendungshandbuch,
+)
 from kohlrahbi.unfoldedahb import UnfoldedAhbTableMetaData
 from kohlrahbi.unfoldedahb.unfoldedahbline import UnfoldedAhbLine
-from kohlrahbi.unfoldedahb.unfoldedahbtable import UnfoldedAhb, _line_is_flatahb_line
+from kohlrahbi.unfoldedahb.unfoldedahbtable import (
+    UnfoldedAhb,
+    _AhbRowKind,
+    _classify_ahb_rows,
+    _keep_guids_of_unchanged_lines_stable,
+    _line_is_flatahb_line,
+    are_equal_except_for_guids,
+)
+
+
+def _create_flat_ahb(*lines: tuple[str, int], pruefidentifikator: str = "55016") -> FlatAnwendungshandbuch:
+    """
+    creates a flat AHB with one line per given segment code and guid (as int)
+    """
+    return FlatAnwendungshandbuch(
+        meta=AhbMetaInformation(pruefidentifikator=pruefidentifikator),
+        lines=[
+            AhbLine(
+                guid=UUID(int=guid),
+                segment_group_key="SG4",
+                segment_code=segment_code,
+                value_pool_entry=None,
+                name=None,
+                index=0,
+            )
+            for segment_code, guid in lines
+        ],
+    )
 
 
 class TestUnfoldedAhbTable:
@@ -14,23 +51,33 @@ class TestUnfoldedAhbTable:
     def test_from_ahb_table(self) -> None:
         pass
 
-    def test_get_section_name(self) -> None:
-        pass
-
-    def test_is_section_name(self) -> None:
-        pass
-
-    def test_is_segment_group(self) -> None:
-        pass
-
-    def test_is_segment_opening_line(self) -> None:
-        pass
+    def test_classify_ahb_rows(self) -> None:
+        columns = ["Segment Gruppe", "Segment", "Datenelement", "Codes und Qualifier", "Beschreibung", "55016"]
+        rows = [
+            ["Nachrichten-Kopfsegment", "", "", "", "", ""],
+            ["", "", "", "", "  ", ""],
+            ["SG3", "", "", "", "", "Kann"],
+            ["SG3", "CTA", "", "", "", "Muss"],
+            ["SG3", "CTA", "3139", "IC", "Informationskontakt", "X"],
+            ["SG4", "", "00009", "", "", "Muss"],
+            ["", "", "", "Z01", "Beschreibung", "X"],
+            ["Referenz", "", "", "", "Beschreibung", ""],
+        ]
+        ahb_table = AhbTable(rows=AhbRowBuffer(columns=columns, rows=rows))
 
-    def test_is_just_segment(self) -> None:
-        pass
+        row_kinds, segment_group_rows = _classify_ahb_rows(ahb_table)
 
-    def test_is_dataelement(self) -> None:
-        pass
+        assert row_kinds == [
+            _AhbRowKind.SECTION_NAME,
+            _AhbRowKind.SECTION_NAME,
+            _AhbRowKind.OTHER,
+            _AhbRowKind.SEGMENT_OPENING_LINE,
+            _AhbRowKind.DATENELEMENT,
+            _AhbRowKind.SEGMENT,
+            _AhbRowKind.VALUE_POOL_ENTRY,
+            _AhbRowKind.OTHER,
+        ]
+        assert segment_group_rows == [False, False, True, False, False, True, False, False]
 
     def test_convert_to_flat_ahb(self) -> None:
         meta_data = UnfoldedAhbTableMetaData(
@@ -286,3 +333,48 @@ class TestUnfoldedAhbTable:
     )
     def test_line_is_flatahb_line(self, line: UnfoldedAhbLine, expected: bool) -> None:
         assert _line_is_flatahb_line(line) == expected
+
+    def test_keep_guids_of_unchanged_lines_stable(self) -> None:
+        existing_ahb = _create_flat_ahb(("IDE", 1), ("DTM", 2), ("STS", 3), ("DTM", 4))
+        updated_ahb = _create_flat_ahb(("DTM", 10), ("LOC", 11), ("IDE", 12), ("DTM", 13), ("DTM", 14))
+
+        _keep_guids_of_unchanged_lines_stable(updated_ahb, existing_ahb)
+
+        # the first DTM matches the first DTM; the IDE line is not searched before the previous match,
+        # and the third DTM has no unmatched successor anymore
+        assert [line.guid for line in updated_ahb.lines] == [UUID(int=guid) for guid in (2, 11, 12, 4, 14)]
+
+    @pytest.mark.parametrize(
+        ["other_ahb", "expected"],
+        [
+            pytest.param(_create_flat_ahb(("IDE", 3), ("DTM", 4)), True, id="other guids"),
+            pytest.param(_create_flat_ahb(("IDE", 1), ("STS", 2)), False, id="other segment"),
+            pytest.param(_create_flat_ahb(("IDE", 1)), False, id="missing line"),
+            pytest.param(_create_flat_ahb(("IDE", 1), ("DTM", 2), pruefidentifikator="55017"), False, id="other meta"),
+        ],
+    )
+    def test_are_equal_except_for_guids(self, other_ahb: FlatAnwendungshandbuch, expected: bool) -> None:
+        ahb = _create_flat_ahb(("IDE", 1), ("DTM", 2))
+
+        assert are_equal_except_for_guids(ahb, other_ahb) is expected
+        assert (ahb.get_content_digest() == other_ahb.get_content_digest()) is expected
+
+    def test_dump_sorted_json(self) -> None:
+        ahb = _create_flat_ahb(("IDE", 1), ("DTM", 2))
+        ahb.meta.description = 'Änderung "MSB" 💡   \x7f'
+        ahb.lines[0].name = "Zeile\n1\t\x01\\"
+        ahb.lines[1].guid = None
+
+        assert ahb.dump_sorted_json() == json.dumps(
+            ahb.model_dump(mode="json"), ensure_ascii=False, indent=2, sort_keys=True
+        )
+
+    def test_trusted_lines_are_not_checked(self) -> None:
+        ahb_dict = _create_flat_ahb(("IDE", 1), ("DTM", 2)).model_dump(mode="json")
+        ahb_dict["lines"][1]["segment_code"] = "dtm"
+
+        with pytest.raises(ValueError, match="The segment_code 'dtm' does not match"):
+            FlatAnwendungshandbuch.model_validate(ahb_dict)
+        flat_ahb = FlatAnwendungshandbuch.model_validate(ahb_dict, context={TRUSTED_LINES_CONTEXT_KEY: True})
+
+        assert [line.segment_code for line in flat_ahb.lines] == ["IDE", "dtm"]
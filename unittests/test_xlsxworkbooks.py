@@ -0,0 +1,34 @@
+from pathlib import Path
+
+import pytest
+from efoli import EdifactFormat
+from openpyxl import load_workbook  # type: ignore[import-untyped]
+
+from kohlrahbi.unfoldedahb import UnfoldedAhb
+from kohlrahbi.unfoldedahb.xlsxworkbooks import XlsxWorkbookPerFormatWriter, get_xlsx_workbook_file_path
+
+
+class TestXlsxWorkbookPerFormatWriter:
+    def test_worksheets_equal_the_xlsx_files_per_pruefi(
+        self, pruefis: list[str], unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path
+    ) -> None:
+        with XlsxWorkbookPerFormatWriter(tmp_path) as xlsx_workbooks:
+            for unfolded_ahb in unfolded_ahbs:
+                xlsx_workbooks.add_unfolded_ahb(unfolded_ahb)
+                unfolded_ahb.dump_xlsx(tmp_path)
+
+        workbook = load_workbook(get_xlsx_workbook_file_path(tmp_path, EdifactFormat.ORDERS))
+        assert workbook.sheetnames == pruefis
+        for pruefi in pruefis:
+            xlsx_file = load_workbook(tmp_path / "ORDERS" / "xlsx" / f"{pruefi}.xlsx")
+            actual_rows = list(workbook[pruefi].iter_rows(values_only=True))
+            expected_rows = list(xlsx_file[pruefi].iter_rows(values_only=True))
+            assert len(actual_rows) > 1
+            assert actual_rows == expected_rows
+
+    def test_invalid_pruefi(self, unfolded_ahbs: list[UnfoldedAhb], tmp_path: Path) -> None:
+        unfolded_ahb = unfolded_ahbs[0].model_copy(deep=True)
+        unfolded_ahb.meta_data.pruefidentifikator = "invalid"
+
+        with XlsxWorkbookPerFormatWriter(tmp_path) as xlsx_workbooks, pytest.raises(ValueError):
+            xlsx_workbooks.add_unfolded_ahb(unfolded_ahb)